@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Push-based balance updates via Solana accountSubscribe WebSocket
+"""
+
+import json
+import random
+import threading
+from datetime import datetime
+
+import solana_rpc
+
+try:
+    import websocket  # websocket-client
+except ImportError:
+    websocket = None
+
+USDC_MINT = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+
+# Reconnect backoff (seconds)
+BACKOFF_INITIAL = 1
+BACKOFF_MAX = 30
+PING_INTERVAL = 30  # Keep idle sockets alive
+
+
+def ws_url_for(rpc_url):
+    """Derive the RPC WebSocket URL from its HTTP URL"""
+    if rpc_url.startswith('https://'):
+        return 'wss://' + rpc_url[len('https://'):]
+    if rpc_url.startswith('http://'):
+        return 'ws://' + rpc_url[len('http://'):]
+    return rpc_url
+
+
+def find_token_account(wallet, mint=USDC_MINT):
+    """Resolve the token account address holding `mint` for `wallet`"""
+    result = solana_rpc.rpc_call(
+        "getTokenAccountsByOwner",
+        [wallet, {"mint": mint}, {"encoding": "jsonParsed"}],
+        timeout=10
+    )
+    accounts = (result or {}).get('value', [])
+    return accounts[0]['pubkey'] if accounts else None
+
+
+class AccountStream:
+    """
+    Subscribes to a wallet's USDC token account and calls
+    on_balance(balance, timestamp, slot) for every change the node pushes.
+
+    Runs in a daemon thread and reconnects with jittered exponential backoff.
+    `connected` is False whenever the socket is down, so callers can fall back
+    to polling until the subscription is live again.
+    """
+
+    def __init__(self, wallet, on_balance, ws_url=None, token_account=None, commitment='confirmed'):
+        self.wallet = wallet
+        self.on_balance = on_balance
+        self.ws_url = ws_url or ws_url_for(solana_rpc.get_client().url)
+        self.token_account = token_account
+        self.commitment = commitment
+        self.connected = False
+        self.balance = None
+        self.last_slot = None
+        self.updates = 0
+        self._ws = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'stream-{wallet[:8]}', daemon=True)
+
+    def start(self):
+        """Start streaming; returns False when websocket-client is not installed"""
+        if websocket is None:
+            print("websocket-client not installed - balance streaming disabled, polling only")
+            return False
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+        ws = self._ws
+        if ws is not None:
+            try:
+                ws.close()
+            except Exception:
+                pass
+
+    def _run(self):
+        backoff = BACKOFF_INITIAL
+        while not self._stop.is_set():
+            try:
+                if self.token_account is None:
+                    self.token_account = find_token_account(self.wallet)
+                    if self.token_account is None:
+                        raise RuntimeError(f"no USDC token account for {self.wallet}")
+                self._stream()
+                backoff = BACKOFF_INITIAL
+            except Exception as e:
+                if not self._stop.is_set():
+                    print(f"Balance stream for {self.wallet[:8]} dropped: {e}")
+            finally:
+                self.connected = False
+                self._ws = None
+
+            if self._stop.wait(backoff * random.uniform(0.5, 1.0)):
+                break
+            backoff = min(backoff * 2, BACKOFF_MAX)
+
+    def _stream(self):
+        ws = websocket.create_connection(self.ws_url, timeout=PING_INTERVAL)
+        self._ws = ws
+        try:
+            ws.send(json.dumps({
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "accountSubscribe",
+                "params": [self.token_account, {"encoding": "jsonParsed", "commitment": self.commitment}]
+            }))
+
+            while not self._stop.is_set():
+                try:
+                    raw = ws.recv()
+                except websocket.WebSocketTimeoutException:
+                    ws.ping()
+                    continue
+                if not raw:
+                    raise ConnectionError("socket closed")
+
+                message = json.loads(raw)
+                if message.get('id') == 1:
+                    if 'error' in message:
+                        raise RuntimeError(f"accountSubscribe: {message['error']}")
+                    self.connected = True
+                elif message.get('method') == 'accountNotification':
+                    self._handle_notification(message['params']['result'])
+        finally:
+            ws.close()
+
+    def _handle_notification(self, result):
+        slot = result.get('context', {}).get('slot')
+        try:
+            balance = result['value']['data']['parsed']['info']['tokenAmount']['uiAmount']
+        except (KeyError, TypeError):
+            return
+        if balance is None:
+            return
+
+        self.balance = balance
+        self.last_slot = slot
+        self.updates += 1
+        self.on_balance(balance, datetime.utcnow(), slot)
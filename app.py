@@ -3,30 +3,102 @@
 Ranger Finance Raise Tracker - Web Dashboard
 """
 
-from flask import Flask, jsonify, send_from_directory, request
+from flask import Flask, Response, g, jsonify, send_from_directory, request, stream_with_context
 from flask_cors import CORS
+import gzip
+import hashlib
 import json
-import subprocess
+import os
 import requests
 from datetime import datetime, timedelta
-from collections import defaultdict, deque
+from collections import OrderedDict, namedtuple
 import re
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+import solana_rpc
+from account_stream import AccountStream
+from signature_activity import SignatureActivity
+from swr_cache import SWRCache
+from history_store import to_unix
+from projection_engine import ProjectionEngine, surge_exponent
+import historical_curves
+import metrics
+import model_params
+import projection_engine
+import server_timing
+from server_timing import SlowLog, StageTimer
+from simulation import Simulator
+from tracker_state import BalanceHistory, TrackerRegistry
+
+try:
+    import orjson  # Optional: several times faster than json for the large payloads
+except ImportError:
+    orjson = None
+
+try:
+    import brotli  # Optional: smaller than gzip for JSON
+except ImportError:
+    brotli = None
 
 app = Flask(__name__, static_folder='static')
 CORS(app)
 
+# Operational metrics served at /metrics; upstream latency and errors are
+# recorded by solana_rpc and fetch_polymarket_odds (see metrics.py)
+REQUEST_LATENCY = metrics.Histogram(
+    'ranger_http_request_duration_seconds', 'Request latency by route', ('route', 'method', 'status')
+)
+CACHE_REQUESTS = metrics.Counter(
+    'ranger_cache_requests_total', 'Cache lookups by cache and result (hit or miss)', ('cache', 'result')
+)
+# Per-sale series are labelled (wallet, sale_end_time) and removed when the tracker
+# is evicted, so their number stays bounded by MAX_TRACKERS
+COLLECTOR_TICK = metrics.Histogram(
+    'ranger_collector_tick_duration_seconds', 'Time to build one /api/data snapshot', ('wallet', 'sale_end_time')
+)
+SNAPSHOT_STAGE = metrics.Histogram(
+    'ranger_snapshot_stage_duration_seconds', 'Time per snapshot build stage (see Server-Timing)', ('stage',)
+)
+TRACKERS = metrics.Gauge('ranger_trackers', 'Tracked sales with a running collector')
+HISTORY_SAMPLES = metrics.Gauge(
+    'ranger_balance_history_samples', 'Balance samples held per tracked sale', ('wallet', 'sale_end_time')
+)
+HISTORY_AGE = metrics.Gauge(
+    'ranger_balance_history_newest_age_seconds', 'Age of the newest balance sample', ('wallet', 'sale_end_time')
+)
+COLLECTOR_LAG = metrics.Gauge(
+    'ranger_collector_lag_seconds', 'How far past its scheduled poll the collector is', ('wallet', 'sale_end_time')
+)
+SNAPSHOT_AGE = metrics.Gauge(
+    'ranger_snapshot_age_seconds', 'Age of the published /api/data snapshot', ('wallet', 'sale_end_time')
+)
+
 # Default Configuration (can be overridden via query params)
 DEFAULT_WALLET = "9ApaAe39Z8GEXfqm7F7HL545N4J4tN7RhF8FhS88pRNp"
 USDC_MINT = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
 DEFAULT_SALE_END_TIME = datetime(2026, 1, 10, 16, 0, 0)
 DEFAULT_POLYMARKET_SLUG = "total-commitments-for-the-ranger-public-sale-on-metadao"
+POLYMARKET_GAMMA_URL = os.environ.get('POLYMARKET_GAMMA_URL', "https://gamma-api.polymarket.com")
 
 # Historical balance tracking for velocity calculations
-# Stores tuples of (timestamp, balance)
-balance_history = deque(maxlen=1000)  # Keep last 1000 data points
-balance_history_lock = threading.Lock()
+# Each tracked sale keeps its own history in its TrackerState; this one is
+# only the default for callers that pass no history (scripts, benchmarks)
+balance_history = BalanceHistory()
+
+# Optional push-based balance updates over the RPC WebSocket (accountSubscribe).
+# Polling stays on and takes over whenever the socket is down.
+STREAM_BALANCES = os.environ.get('STREAM_BALANCES', '0') == '1'
+
+# Upstream fetches run concurrently, each bounded by its own deadline (seconds).
+# A source that misses its deadline is served from its last good value and
+# reported in `stale_sources` instead of holding up the whole response.
+UPSTREAM_DEADLINES = {
+    'balance': 6,
+    'transactions': 8,
+    'polymarket': 4,
+}
+upstream_pool = ThreadPoolExecutor(max_workers=12, thread_name_prefix='upstream')
 
 # Historical patterns with time snapshots
 # Using known data at 5.5h and interpolating with exponential surge curve
@@ -102,104 +174,189 @@ PATTERN_WEIGHTS = {
 }
 # Total: 100%
 
+# Calibrated surge exponents and weights (calibrate.py) replace the defaults above
+model_params_data = model_params.load_params()
+if model_params_data:
+    model_params.apply_params(model_params_data, PATTERN_WEIGHTS)
+MODEL_PARAMS_VERSION = model_params_data['version'] if model_params_data else None
+
 def get_ranger_balance(wallet=None):
     """Fetch current USDC balance from Solana RPC"""
     wallet = wallet or DEFAULT_WALLET
-    cmd = f'''curl -s 'https://api.mainnet-beta.solana.com' -X POST -H "Content-Type: application/json" -d '{{"jsonrpc":"2.0","id":1,"method":"getTokenAccountsByOwner","params":["{wallet}",{{"mint":"{USDC_MINT}"}},{{"encoding":"jsonParsed"}}]}}'  '''
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
     try:
-        data = json.loads(result.stdout)
-        accounts = data.get('result', {}).get('value', [])
+        result = solana_rpc.rpc_call(
+            "getTokenAccountsByOwner",
+            [wallet, {"mint": USDC_MINT}, {"encoding": "jsonParsed"}],
+            timeout=5
+        )
+        accounts = (result or {}).get('value', [])
         if accounts:
             return accounts[0]['account']['data']['parsed']['info']['tokenAmount']['uiAmount']
-    except:
-        pass
+    except Exception as e:
+        # Counted per method in ranger_upstream_errors_total by the RPC client
+        print(f"Error fetching balance for {wallet[:8]}: {e}")
     return None
 
-def get_transaction_data(wallet=None):
-    """Fetch recent transaction data"""
-    wallet = wallet or DEFAULT_WALLET
-    cmd = f'''curl -s 'https://api.mainnet-beta.solana.com' -X POST -H "Content-Type: application/json" -d '{{"jsonrpc":"2.0","id":1,"method":"getSignaturesForAddress","params":["{wallet}",{{"limit":1000}}]}}'  '''
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+def get_transaction_data(wallet=None, activity=None):
+    """Fetch transaction activity, incrementally from `activity`'s last seen signature"""
+    activity = activity or SignatureActivity(wallet or DEFAULT_WALLET)
     try:
-        data = json.loads(result.stdout)
-        sigs = data.get('result', [])
-        successful = [s for s in sigs if s.get('err') is None]
-
-        hourly = defaultdict(int)
-        for tx in successful:
-            ts = tx.get('blockTime', 0)
-            if ts > 0:
-                dt = datetime.utcfromtimestamp(ts)
-                hour_key = dt.strftime('%Y-%m-%d %H:00')
-                hourly[hour_key] += 1
-
-        return {
-            'total': len(successful),
-            'hourly': dict(hourly)
-        }
-    except:
-        pass
+        return activity.poll()
+    except Exception as e:
+        print(f"Error fetching transactions for {activity.address[:8]}: {e}")
     return None
 
+def fetch_polymarket_odds(polymarket_slug):
+    """Fetch Polymarket odds for sale thresholds from the gamma API (raises on failure)"""
+    odds = {}
+    headers = {"Accept": "application/json"}
+
+    # Try the gamma API which is more accessible
+    gamma_url = f"{POLYMARKET_GAMMA_URL}/events?slug={polymarket_slug}"
+    with metrics.timed_upstream('polymarket', 'events', POLYMARKET_GAMMA_URL.split('://')[-1]):
+        response = requests.get(gamma_url, headers=headers, timeout=10)
+        response.raise_for_status()
+
+    data = response.json()
+    if data and len(data) > 0:
+        event = data[0]
+        markets = event.get('markets', [])
+
+        for market in markets:
+            question = market.get('question', '').lower()
+            # Extract threshold from question
+            match = re.search(r'over\s*\$?(\d+)m', question)
+            if match:
+                threshold = int(match.group(1))
+                # Get the YES price (outcomePrices[0] is typically YES)
+                prices_raw = market.get('outcomePrices', [])
+                # outcomePrices may be a JSON string, parse if needed
+                if isinstance(prices_raw, str):
+                    try:
+                        prices = json.loads(prices_raw)
+                    except:
+                        prices = []
+                else:
+                    prices = prices_raw
+                if prices and len(prices) > 0:
+                    try:
+                        yes_price = float(prices[0]) * 100  # Convert to percentage
+                        odds[threshold] = round(yes_price, 1)
+                    except:
+                        pass
+
+    return odds
+
+# Odds barely move within a few seconds, so serve them from a per-slug cache
+# and refresh in the background once they are older than the TTL
+POLYMARKET_TTL = int(os.environ.get('POLYMARKET_TTL', 30))
+polymarket_cache = SWRCache(fetch_polymarket_odds, ttl=POLYMARKET_TTL)
+
+# Estimated odds used only when Polymarket has never answered for a slug
+FALLBACK_POLYMARKET_ODDS = {
+    15: 100, 20: 100, 30: 99, 40: 98, 50: 87,
+    60: 83, 70: 74, 80: 64, 90: 56, 100: 45,
+    120: 31, 140: 16, 160: 10, 180: 8, 200: 6
+}
+
 def get_polymarket_odds(polymarket_slug=None):
-    """Fetch Polymarket odds for sale thresholds"""
-    polymarket_slug = polymarket_slug or DEFAULT_POLYMARKET_SLUG
+    """
+    Polymarket odds for sale thresholds, with where they came from.
 
-    odds = {}
+    Returns {'odds', 'source', 'age_seconds'}; source is 'live', 'cache',
+    'stale' (expired, refreshing in the background), 'fallback' (estimated
+    table) or 'none' (no slug configured).
+    """
+    polymarket_slug = polymarket_slug or DEFAULT_POLYMARKET_SLUG
 
     # Skip if no slug provided
     if not polymarket_slug:
-        return odds
+        return {'odds': {}, 'source': 'none', 'age_seconds': None}
 
-    # Try to fetch from Polymarket API (CLOB API)
     try:
-        headers = {"Accept": "application/json"}
-
-        # Try the gamma API which is more accessible
-        gamma_url = f"https://gamma-api.polymarket.com/events?slug={polymarket_slug}"
-        response = requests.get(gamma_url, headers=headers, timeout=10)
-
-        if response.status_code == 200:
-            data = response.json()
-            if data and len(data) > 0:
-                event = data[0]
-                markets = event.get('markets', [])
-
-                for market in markets:
-                    question = market.get('question', '').lower()
-                    # Extract threshold from question
-                    match = re.search(r'over\s*\$?(\d+)m', question)
-                    if match:
-                        threshold = int(match.group(1))
-                        # Get the YES price (outcomePrices[0] is typically YES)
-                        prices_raw = market.get('outcomePrices', [])
-                        # outcomePrices may be a JSON string, parse if needed
-                        if isinstance(prices_raw, str):
-                            try:
-                                prices = json.loads(prices_raw)
-                            except:
-                                prices = []
-                        else:
-                            prices = prices_raw
-                        if prices and len(prices) > 0:
-                            try:
-                                yes_price = float(prices[0]) * 100  # Convert to percentage
-                                odds[threshold] = round(yes_price, 1)
-                            except:
-                                pass
+        result = polymarket_cache.get(polymarket_slug)
+        CACHE_REQUESTS.inc(cache='polymarket', result='miss' if result.source == 'live' else 'hit')
+        if result.value:
+            return {'odds': result.value, 'source': result.source, 'age_seconds': round(result.age_seconds, 1)}
     except Exception as e:
         print(f"Error fetching Polymarket: {e}")
 
-    # If API fails, return cached/estimated odds
-    if not odds:
-        odds = {
-            15: 100, 20: 100, 30: 99, 40: 98, 50: 87,
-            60: 83, 70: 74, 80: 64, 90: 56, 100: 45,
-            120: 31, 140: 16, 160: 10, 180: 8, 200: 6
-        }
+    # If API fails, return estimated odds - marked as such
+    return {'odds': dict(FALLBACK_POLYMARKET_ODDS), 'source': 'fallback', 'age_seconds': None}
 
-    return odds
+def _remember_upstream(state, name, future):
+    """Keep the latest successful result, even one that arrives after its deadline"""
+    try:
+        value = future.result()
+    except Exception:
+        return
+    if value is not None:
+        state.remember(name, value)
+
+# Server-Timing stage name of each upstream source
+UPSTREAM_STAGES = {'balance': 'balance', 'transactions': 'signatures', 'polymarket': 'polymarket'}
+
+def _timed_upstream_job(durations, name, fn, *args):
+    start = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        durations[name] = (time.perf_counter() - start) * 1000
+
+def fetch_upstreams(state, timer=None):
+    """
+    Fetch balance, transaction data and Polymarket odds for one tracked sale concurrently.
+
+    Returns (results, stale_sources). A source that errors or misses its
+    deadline falls back to the tracker's last good value and is listed as stale.
+    With a StageTimer, each source's fetch time is added as a stage (the
+    time waited, for one that missed its deadline).
+    """
+    jobs = {
+        'balance': (get_ranger_balance, state.wallet),
+        'transactions': (get_transaction_data, state.wallet, state.activity),
+        'polymarket': (get_polymarket_odds, state.polymarket_slug),
+    }
+
+    durations = {}
+    futures = {}
+    for name, (fn, *args) in jobs.items():
+        future = upstream_pool.submit(_timed_upstream_job, durations, name, fn, *args)
+        future.add_done_callback(lambda f, name=name: _remember_upstream(state, name, f))
+        futures[name] = future
+
+    started = time.monotonic()
+    results = {}
+    stale_sources = []
+    for name, future in futures.items():
+        remaining = max(0, UPSTREAM_DEADLINES[name] - (time.monotonic() - started))
+        try:
+            value = future.result(timeout=remaining)
+        except Exception:
+            value = None
+
+        if value is None:
+            value = state.last_good_value(name)
+            stale_sources.append(name)
+        results[name] = value
+
+    if timer is not None:
+        waited = (time.monotonic() - started) * 1000
+        for name in jobs:
+            if name in durations:
+                timer.add(UPSTREAM_STAGES[name], durations[name], 'stale' if name in stale_sources else None)
+            else:
+                timer.add(UPSTREAM_STAGES[name], waited, 'deadline missed')
+    return results, stale_sources
+
+def cached_upstreams(state, balance):
+    """fetch_upstreams-shaped results from a pushed balance and the tracker's last good values"""
+    results = {
+        'balance': balance,
+        'transactions': state.last_good_value('transactions'),
+        'polymarket': state.last_good_value('polymarket'),
+    }
+    return results, []
 
 def estimate_pct_at_time(pct_at_5_5h, hours_remaining):
     """
@@ -218,7 +375,7 @@ def estimate_pct_at_time(pct_at_5_5h, hours_remaining):
 
     # Exponential factor - higher means more back-loaded surge
     # Solomon (11.4% at 5.5h) had very back-loaded surge
-    exp_factor = 2.5 if pct_at_5_5h < 15 else 2.0 if pct_at_5_5h < 25 else 1.5
+    exp_factor = surge_exponent(pct_at_5_5h)
 
     remaining_pct = 100 - pct_at_5_5h
     time_elapsed = 5.5 - hours_remaining
@@ -284,7 +441,7 @@ def calculate_projections(balance, hours_remaining):
     return sorted(projections, key=lambda x: x['projected'])
 
 
-def calculate_confidence(projections, balance, hours_remaining):
+def calculate_confidence(projections, balance, hours_remaining, historical_snapshots=None):
     """Calculate confidence score based on model agreement and time remaining"""
     if not projections:
         return {'score': 0, 'level': 'LOW', 'factors': []}
@@ -323,7 +480,8 @@ def calculate_confidence(projections, balance, hours_remaining):
         factors.append({'factor': 'Time Proximity', 'impact': '-10', 'detail': 'More than 4 hours remaining'})
 
     # Factor 3: Current raise relative to historical patterns
-    historical_snapshots = get_historical_at_time(hours_remaining)
+    if historical_snapshots is None:
+        historical_snapshots = get_historical_at_time(hours_remaining)
     if historical_snapshots:
         avg_historical = sum(s['amount'] for s in historical_snapshots) / len(historical_snapshots)
         ratio = balance / avg_historical if avg_historical > 0 else 0
@@ -371,52 +529,37 @@ def calculate_model_probabilities(projections):
 
     return probs
 
-def record_balance(balance):
-    """Record a balance data point for velocity tracking"""
-    with balance_history_lock:
-        balance_history.append((datetime.utcnow(), balance))
-
-def calculate_velocity(minutes_lookback):
-    """Calculate the rate of change over the specified time period"""
-    with balance_history_lock:
-        if len(balance_history) < 2:
-            return None
-
-        now = datetime.utcnow()
-        cutoff = now - timedelta(minutes=minutes_lookback)
+# Backfilled minute-by-minute curves of past sales (backfill.py); patterns
+# without one keep the surge power curve
+HISTORICAL_CURVES = historical_curves.load_curves() or {}
 
-        # Find data points within the lookback period
-        recent_points = [(ts, bal) for ts, bal in balance_history if ts >= cutoff]
+# Array-backed projections (same results, whole curves in one pass); needs numpy
+engine = ProjectionEngine(HISTORICAL_PATTERNS, PATTERN_WEIGHTS, curves=HISTORICAL_CURVES) if projection_engine.np is not None else None
 
-        if len(recent_points) < 2:
-            # Not enough data in this period, use all available data
-            recent_points = list(balance_history)
+# Monte Carlo distribution of the final raise, sampled once per collector tick
+# (see simulation.py for sample count, latency budget and worker settings)
+SIMULATION = os.environ.get('SIMULATION', '1') == '1'
+simulator = Simulator(engine) if SIMULATION and engine is not None else None
 
-        if len(recent_points) < 2:
-            return None
-
-        # Calculate velocity (change per hour)
-        oldest = recent_points[0]
-        newest = recent_points[-1]
-
-        time_diff_hours = (newest[0] - oldest[0]).total_seconds() / 3600
-        if time_diff_hours < 0.001:  # Less than 3.6 seconds
-            return None
+def record_balance(balance, timestamp=None, slot=None, history=None):
+    """Record a balance data point for velocity tracking"""
+    if history is None:
+        history = balance_history
+    history.record(balance, timestamp or datetime.utcnow(), slot)
 
-        balance_diff = newest[1] - oldest[1]
-        velocity_per_hour = balance_diff / time_diff_hours
-
-        return {
-            'velocity_per_hour': velocity_per_hour,
-            'velocity_per_minute': velocity_per_hour / 60,
-            'time_span_minutes': time_diff_hours * 60,
-            'balance_change': balance_diff,
-            'start_balance': oldest[1],
-            'end_balance': newest[1],
-            'data_points': len(recent_points)
-        }
+def calculate_velocity(minutes_lookback, history=None, now=None):
+    """
+    Rate of change over the trailing period: the least-squares slope of the
+    samples in the window (falling back to all samples when it has fewer than
+    two), plus the acceleration of a quadratic fit
+    """
+    if history is None:
+        history = balance_history
+    history.sync()
+    with history.lock:
+        return history.velocity.estimate(minutes_lookback, to_unix(now or datetime.utcnow()))
 
-def calculate_velocity_projection(current_balance, hours_remaining):
+def calculate_velocity_projection(current_balance, hours_remaining, history=None, now=None):
     """Calculate projected final raise based on different velocity timeframes"""
     velocities = {}
     projections = {}
@@ -431,7 +574,7 @@ def calculate_velocity_projection(current_balance, hours_remaining):
     ]
 
     for name, minutes in periods:
-        vel = calculate_velocity(minutes)
+        vel = calculate_velocity(minutes, history, now)
         if vel and vel['velocity_per_hour'] is not None:
             velocities[name] = vel
             # Project final based on this velocity
@@ -440,6 +583,7 @@ def calculate_velocity_projection(current_balance, hours_remaining):
                 'projected_final': current_balance + projected_additional,
                 'velocity_per_hour': vel['velocity_per_hour'],
                 'velocity_per_minute': vel['velocity_per_minute'],
+                'acceleration_per_hour2': vel['acceleration_per_hour2'],
                 'data_points': vel['data_points'],
                 'time_span_minutes': vel['time_span_minutes']
             }
@@ -464,47 +608,69 @@ def calculate_velocity_projection(current_balance, hours_remaining):
         'hours_remaining': hours_remaining
     }
 
-@app.route('/')
-def index():
-    return send_from_directory('static', 'index.html')
-
-@app.route('/api/data')
-def get_data():
-    # Get configuration from query params
-    wallet = request.args.get('wallet', DEFAULT_WALLET)
-    end_time_str = request.args.get('endTime', None)
-    polymarket_slug = request.args.get('polymarketSlug', DEFAULT_POLYMARKET_SLUG)
-
-    # Parse end time
-    if end_time_str:
-        try:
-            sale_end_time = datetime.fromisoformat(end_time_str.replace('Z', '+00:00')).replace(tzinfo=None)
-        except:
-            sale_end_time = DEFAULT_SALE_END_TIME
+def get_refresh_rate(hours_remaining):
+    """Determine refresh rate (seconds) based on time remaining"""
+    if hours_remaining <= 1:
+        return 5  # 5 seconds in last hour
+    elif hours_remaining <= 2:
+        return 10  # 10 seconds in last 2 hours
     else:
-        sale_end_time = DEFAULT_SALE_END_TIME
+        return 30  # 30 seconds otherwise
 
-    now = datetime.utcnow()
+def build_snapshot(state, record=True, upstream=None, now=None, timer=None):
+    """
+    Fetch upstream data and compute the full /api/data payload for one
+    TrackerState. Returns (payload, status).
+
+    With `record` False the polled balance is not added to the tracker's
+    history (a live balance stream is already recording every change).
+    `upstream` takes precomputed fetch_upstreams results instead of fetching,
+    and `now` replays the computation at another time (see backtest.py).
+    Each stage's wall time is added to `timer` when one is given.
+    """
+    timer = timer or StageTimer()
+    wallet, sale_end_time, polymarket_slug = state.wallet, state.sale_end_time, state.polymarket_slug
+    now = now or datetime.utcnow()
     time_remaining = sale_end_time - now
     hours_remaining = max(0, time_remaining.total_seconds() / 3600)
 
-    balance = get_ranger_balance(wallet)
-    tx_data = get_transaction_data(wallet)
-    polymarket_odds = get_polymarket_odds(polymarket_slug)
+    if upstream is None:
+        upstream = fetch_upstreams(state, timer)
+    upstream, stale_sources = upstream
+    balance = upstream['balance']
+    tx_data = upstream['transactions']
+    polymarket = upstream['polymarket'] or {}
+    polymarket_odds = polymarket.get('odds', {})
 
     if balance is None:
-        return jsonify({'error': 'Could not fetch balance', 'wallet': wallet}), 500
+        return {'error': 'Could not fetch balance', 'wallet': wallet}, 500
 
-    # Record balance for velocity tracking
-    record_balance(balance)
+    # Record balance for velocity tracking (a stale balance is not a new sample)
+    if record and 'balance' not in stale_sources:
+        record_balance(balance, now, history=state.history)
 
-    projections = calculate_projections(balance, hours_remaining)
-    model_probs = calculate_model_probabilities(projections)
-    confidence = calculate_confidence(projections, balance, hours_remaining)
-    historical_snapshots = get_historical_at_time(hours_remaining)
+    with timer.stage('projections'):
+        # One point is cheaper in pure Python; the engine is only needed to interpolate backfilled curves
+        if engine is not None and engine.curves:
+            projections, model_probs, historical_snapshots = engine.point(balance, hours_remaining)
+        else:
+            projections = calculate_projections(balance, hours_remaining)
+            model_probs = calculate_model_probabilities(projections)
+            historical_snapshots = get_historical_at_time(hours_remaining)
+    with timer.stage('confidence'):
+        confidence = calculate_confidence(projections, balance, hours_remaining, historical_snapshots)
 
     # Calculate velocity-based projections
-    velocity_data = calculate_velocity_projection(balance, hours_remaining)
+    with timer.stage('velocity'):
+        velocity_data = calculate_velocity_projection(balance, hours_remaining, state.history, now)
+
+    # Empirical distribution: probabilities for every threshold Polymarket lists, plus quantiles
+    simulation = None
+    if simulator is not None:
+        with timer.stage('simulation'):
+            simulation = simulator.run(
+                balance, round(hours_remaining, 2), velocity_data, list(model_probs) + list(polymarket_odds)
+            )
 
     # Calculate value opportunities
     opportunities = {}
@@ -530,13 +696,7 @@ def get_data():
                 'transactions': tx_data['hourly'][hour]
             })
 
-    # Determine refresh rate based on time remaining
-    if hours_remaining <= 1:
-        refresh_rate = 5  # 5 seconds in last hour
-    elif hours_remaining <= 2:
-        refresh_rate = 10  # 10 seconds in last 2 hours
-    else:
-        refresh_rate = 30  # 30 seconds otherwise
+    refresh_rate = get_refresh_rate(hours_remaining)
 
     # Calculate combined projection (historical patterns + velocity)
     historical_weighted = sum(p['projected'] * p['weight'] for p in projections)
@@ -548,7 +708,7 @@ def get_data():
     else:
         combined_projection = historical_weighted
 
-    return jsonify({
+    return {
         'timestamp': now.isoformat(),
         'hours_remaining': round(hours_remaining, 2),
         'minutes_remaining': int(hours_remaining * 60),
@@ -557,6 +717,10 @@ def get_data():
         'projections': projections,
         'model_probabilities': model_probs,
         'polymarket_odds': polymarket_odds,
+        'polymarket_status': {
+            'source': polymarket.get('source', 'none'),
+            'age_seconds': polymarket.get('age_seconds')
+        },
         'opportunities': opportunities,
         'hourly_activity': hourly_data,
         'sale_ended': hours_remaining <= 0,
@@ -564,20 +728,630 @@ def get_data():
         'velocity': velocity_data,
         'combined_projection': round(combined_projection, 0),
         'historical_projection': round(historical_weighted, 0),
-        'data_points_collected': len(balance_history),
+        'data_points_collected': len(state.history),
         'confidence': confidence,
+        'simulation': simulation,
         'historical_snapshots': historical_snapshots,
+        'stale_sources': stale_sources,
         'config': {
             'wallet': wallet,
             'sale_end_time': sale_end_time.isoformat(),
-            'polymarket_slug': polymarket_slug
+            'polymarket_slug': polymarket_slug,
+            'model_params_version': MODEL_PARAMS_VERSION,
+            'historical_curves': sorted(name for name in HISTORICAL_CURVES if name in HISTORICAL_PATTERNS) if engine is not None else []
+        }
+    }, 200
+
+def dumps_payload(payload):
+    """Serialize a response payload, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS).decode()
+    return app.json.dumps(payload)
+
+# One immutable, pre-serialized /api/data response per collector tick.
+# `etag` is unique across collector restarts and doubles as the `version`
+# clients send back as `since`; `encoded` caches the compressed bodies and
+# `deltas` the since-responses, so each is computed once per snapshot, not
+# once per viewer. `timing` holds the (name, ms, desc) stages of its build
+# and `timing_header` the same rendered for Server-Timing.
+Snapshot = namedtuple(
+    'Snapshot',
+    ['version', 'created_at', 'status', 'body', 'refresh_rate', 'etag', 'encoded', 'deltas', 'timing', 'timing_header']
+)
+
+DELTA_VERSIONS = 30  # Versions a client may lag behind and still get a delta
+
+# Slowest /api/data requests and snapshot builds with their stages, at /api/debug/slow
+SLOW_LOG_SIZE = int(os.environ.get('SLOW_LOG_SIZE', 20))
+SLOW_LOG_WINDOW = int(os.environ.get('SLOW_LOG_WINDOW', 3600))  # Seconds an entry stays listed
+slow_requests = SlowLog(SLOW_LOG_SIZE, SLOW_LOG_WINDOW)
+slow_builds = SlowLog(SLOW_LOG_SIZE, SLOW_LOG_WINDOW)
+
+# Payload fields a new version is published for: the upstream data and
+# configuration, plus the countdown in whole minutes (the resolution the
+# dashboard shows). Everything else is derived from these and the clock
+# (velocity, projections inside the surge window), so it is republished at
+# least once a minute, while sub-minute churn such as cache ages is not.
+CONTENT_FIELDS = ('balance', 'transactions', 'hourly_activity', 'polymarket_odds', 'stale_sources',
+                  'sale_ended', 'config', 'minutes_remaining')
+
+def snapshot_content(payload, status):
+    """What a snapshot is compared on to decide whether it changed"""
+    if status != 200:
+        return status, {k: v for k, v in payload.items() if k != 'timestamp'}
+    return status, {k: payload.get(k) for k in CONTENT_FIELDS}
+
+class SnapshotCollector:
+    """
+    Background thread that polls upstream for one tracked sale (TrackerState)
+    on the adaptive `refresh_rate` schedule and publishes the latest Snapshot. Requests only read the published snapshot, so upstream
+    load does not grow with the number of viewers.
+
+    The snapshot version only moves when the upstream data or the minute of
+    the countdown changes (see CONTENT_FIELDS), and waiters in wait_for_update (the SSE stream) are
+    woken on each change.
+    With a live balance stream, every pushed balance triggers an immediate
+    rebuild from the cached transaction and Polymarket data.
+
+    Only the sale's writer process (TrackerState.writer) collects; it also
+    writes each published snapshot to the state's `snapshot_path`. In every
+    other process the collector republishes that file under the writer's
+    etags (follow), so all workers answer alike, and takes over collecting
+    once it can claim the writer role.
+    """
+
+    def __init__(self, state):
+        self.state = state
+        self.wallet = state.wallet
+        self.sale_end_time = state.sale_end_time
+        self.metric_labels = {'wallet': state.wallet, 'sale_end_time': state.sale_end_time.isoformat()}
+        self.snapshot = None
+        self.payload = None
+        self.next_poll = time.time()
+        self._instance = os.urandom(4).hex()
+        self._version = 0
+        self._content = None
+        self._recent = OrderedDict()  # snapshot etag -> payload, for deltas
+        self._changed = threading.Condition()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._pushed = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f'collector-{state.wallet[:8]}', daemon=True
+        )
+        self.stream = None
+
+    def start(self):
+        if self.state.writer:
+            self._start_stream()
+        self._thread.start()
+        return self
+
+    def _start_stream(self):
+        if STREAM_BALANCES:
+            stream = AccountStream(self.wallet, self._on_stream_balance)
+            if stream.start():
+                self.stream = stream
+
+    def stop(self):
+        self._stop.set()
+        self._pushed.set()
+        if self.stream is not None:
+            self.stream.stop()
+        COLLECTOR_TICK.remove(**self.metric_labels)
+
+    @property
+    def stopped(self):
+        return self._stop.is_set()
+
+    @property
+    def streaming(self):
+        return self.stream is not None and self.stream.connected
+
+    def _on_stream_balance(self, balance, timestamp, slot):
+        record_balance(balance, timestamp, slot, history=self.state.history)
+        self._pushed.set()
+
+    def latest(self, timeout=None):
+        """Return the newest snapshot, waiting up to `timeout` for the first one"""
+        self._ready.wait(timeout)
+        return self.snapshot
+
+    def wait_for_update(self, etag, timeout=None):
+        """
+        Block until a snapshot other than `etag` is published (or timeout).
+        ETags stay unique across collector restarts, unlike version counters.
+        """
+        with self._changed:
+            self._changed.wait_for(
+                lambda: self.snapshot is not None and self.snapshot.etag != etag, timeout
+            )
+            return self.snapshot
+
+    def delta(self, snapshot, since):
+        """
+        (body, encoded) of the fields of `snapshot` that changed since version
+        `since`, or None when that version is no longer kept (send it in full).
+        """
+        cached = snapshot.deltas.get(since)
+        CACHE_REQUESTS.inc(cache='delta', result='hit' if cached is not None else 'miss')
+        if cached is not None:
+            return cached
+
+        with self._changed:
+            base = self._recent.get(since)
+            current = self._recent.get(snapshot.etag)
+        if base is None or current is None:
+            return None
+
+        body = dumps_payload({
+            'delta': True,
+            'since': since,
+            'version': snapshot.etag,
+            'changed': {k: v for k, v in current.items() if k not in base or base[k] != v},
+            'removed': [k for k in base if k not in current],
+        })
+        cached = snapshot.deltas[since] = (body, {})
+        return cached
+
+    def payload_for(self, snapshot):
+        """The payload dict behind a published 200 snapshot, while it is still kept"""
+        with self._changed:
+            return self._recent.get(snapshot.etag)
+
+    def _log_build(self, timer, version, published):
+        total_ms = timer.total_ms()
+        if not self.stopped:  # A tick finishing after eviction must not bring its series back
+            COLLECTOR_TICK.observe(total_ms / 1000, **self.metric_labels)
+        for name, ms, _ in timer.stages:
+            SNAPSHOT_STAGE.observe(ms / 1000, stage=name)
+        if not slow_builds.admits(total_ms):
+            return
+        slow_builds.record(total_ms, {
+            'wallet': self.wallet,
+            'sale_end_time': self.sale_end_time.isoformat(),
+            'version': version,
+            'published': published,
+            'stages': server_timing.as_list(timer.stages),
+        })
+
+    def collect(self, pushed_balance=None):
+        """Build one snapshot and publish it if its content changed"""
+        timer = StageTimer()
+        upstream = None
+        if pushed_balance is not None:
+            upstream = cached_upstreams(self.state, pushed_balance)
+        payload, status = build_snapshot(self.state, record=not self.streaming, upstream=upstream, timer=timer)
+        refresh_rate = payload.get('refresh_rate') or get_refresh_rate(
+            max(0, (self.sale_end_time - datetime.utcnow()).total_seconds() / 3600)
+        )
+
+        # Time passing within the same minute is not a change worth publishing
+        content = snapshot_content(payload, status)
+        if self.snapshot is not None and content == self._content:
+            self._log_build(timer, self.snapshot.etag, published=False)
+            return self.snapshot
+
+        self._content = content
+        snapshot = self._publish(payload, status, refresh_rate, timer)
+        self._share(snapshot)
+        self._log_build(timer, snapshot.etag, published=True)
+        return snapshot
+
+    def _publish(self, payload, status, refresh_rate, timer, etag=None, body=None):
+        """Swap in a new snapshot of `payload` and wake the waiters"""
+        with self._changed:
+            self._version += 1
+            etag = etag or f'{self._instance}-{self._version}'
+            self.payload = payload
+            if status == 200:
+                payload['version'] = etag
+                self._recent[etag] = payload
+                while len(self._recent) > DELTA_VERSIONS:
+                    self._recent.popitem(last=False)
+            if body is None:
+                with timer.stage('json'):
+                    body = dumps_payload(payload)
+            # Swapping in a new tuple is atomic; readers never see a half-built snapshot
+            self.snapshot = Snapshot(
+                version=self._version,
+                created_at=time.time(),
+                status=status,
+                body=body,
+                refresh_rate=refresh_rate,
+                etag=etag,
+                encoded={},
+                deltas={},
+                timing=list(timer.stages),
+                # The build ran in the collector before any request; say so in devtools
+                timing_header=server_timing.header([
+                    (name, ms, f'snapshot build, {desc}' if desc else 'snapshot build')
+                    for name, ms, desc in timer.stages
+                ])
+            )
+            self._changed.notify_all()
+        self._ready.set()
+        return self.snapshot
+
+    def _share(self, snapshot):
+        """Leave `snapshot` for the other processes serving this sale (see follow)"""
+        path = self.state.snapshot_path
+        if path is None:
+            return
+        meta = {
+            'etag': snapshot.etag,
+            'status': snapshot.status,
+            'refresh_rate': snapshot.refresh_rate,
+            'next_poll': time.time() + snapshot.refresh_rate,
+            'timing': snapshot.timing,
         }
+        tmp = f'{path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp, 'w') as f:
+                f.write(json.dumps(meta) + '\n' + snapshot.body)
+            os.replace(tmp, path)  # Followers never see a half-written file
+        except OSError as e:
+            print(f"Could not share snapshot for {self.wallet[:8]}: {e}")
+
+    def follow(self):
+        """Publish the writer process's latest snapshot, if it is newer than ours"""
+        self.state.history.sync()
+        try:
+            with open(self.state.snapshot_path) as f:
+                meta = json.loads(f.readline())
+                if self.snapshot is not None and meta['etag'] == self.snapshot.etag:
+                    return self.snapshot
+                body = f.read()
+        except (OSError, ValueError):
+            return self.snapshot  # Not written yet
+        self.next_poll = meta['next_poll']
+        timer = StageTimer()
+        for name, ms, desc in meta['timing']:
+            timer.add(name, ms, desc)
+        return self._publish(json.loads(body), meta['status'], meta['refresh_rate'], timer,
+                             etag=meta['etag'], body=body)
+
+    def _run(self):
+        writer = self.state.writer
+        while not self._stop.is_set():
+            if not self.state.claim_writer():
+                try:
+                    self.follow()
+                except Exception as e:
+                    print(f"Collector error for {self.wallet[:8]}: {e}")
+                self._stop.wait(FOLLOW_INTERVAL)
+                continue
+            if not writer:
+                writer = True
+                print(f"Collector for {self.wallet[:8]} took over as the sale's writer")
+                self._start_stream()
+
+            started = time.monotonic()
+            refresh_rate = get_refresh_rate(0)
+            try:
+                refresh_rate = self.collect().refresh_rate
+            except Exception as e:
+                print(f"Collector error for {self.wallet[:8]}: {e}")
+
+            # Sleep until the next poll, rebuilding early on each pushed balance
+            deadline = started + refresh_rate
+            self.next_poll = time.time() + refresh_rate - (time.monotonic() - started)
+            while not self._stop.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._pushed.wait(remaining):
+                    break
+                self._pushed.clear()
+                if self._stop.is_set() or self.stream is None or self.stream.balance is None:
+                    continue
+                try:
+                    self.collect(pushed_balance=self.stream.balance)
+                except Exception as e:
+                    print(f"Collector error for {self.wallet[:8]}: {e}")
+
+FIRST_SNAPSHOT_TIMEOUT = 15  # Seconds a request waits for a new collector's first tick
+FOLLOW_INTERVAL = 1          # Seconds between checks for the writer process's next snapshot
+
+def start_collector(state):
+    state.collector = SnapshotCollector(state).start()
+
+# Tracked sales keyed by (wallet, sale_end_time), each with its own history,
+# upstream caches and collector; idle ones are evicted (see tracker_state)
+trackers = TrackerRegistry(start_collector)
+
+def get_collector(wallet, sale_end_time, polymarket_slug):
+    """Return the running collector for this sale, starting one if needed"""
+    return trackers.get(wallet, sale_end_time, polymarket_slug).collector
+
+# Every distinct (wallet, endTime) starts a tracker with its own history file,
+# so both are checked before anything is created for them
+WALLET_PATTERN = re.compile(r'^[1-9A-HJ-NP-Za-km-z]{32,44}$')  # base58 Solana public key
+MAX_END_TIME_PAST = timedelta(days=5 * 365)  # Past sales stay viewable
+MAX_END_TIME_FUTURE = timedelta(days=365)
+
+def parse_data_config(args):
+    """
+    Read wallet, sale end time and Polymarket slug from query params.
+    Raises ValueError for a wallet that is not a public key or an end time
+    outside MAX_END_TIME_PAST / MAX_END_TIME_FUTURE of now.
+    """
+    wallet = args.get('wallet', DEFAULT_WALLET)
+    end_time_str = args.get('endTime', None)
+    polymarket_slug = args.get('polymarketSlug', DEFAULT_POLYMARKET_SLUG)
+
+    if not WALLET_PATTERN.match(wallet):
+        raise ValueError('wallet must be a base58 Solana address')
+
+    # Parse end time
+    if end_time_str:
+        try:
+            sale_end_time = datetime.fromisoformat(end_time_str.replace('Z', '+00:00')).replace(tzinfo=None)
+        except:
+            sale_end_time = DEFAULT_SALE_END_TIME
+        # Whole seconds, as the history file is keyed
+        sale_end_time = sale_end_time.replace(microsecond=0)
+        now = datetime.utcnow()
+        if not now - MAX_END_TIME_PAST <= sale_end_time <= now + MAX_END_TIME_FUTURE:
+            raise ValueError(f'endTime must be within {MAX_END_TIME_PAST.days} days before '
+                             f'and {MAX_END_TIME_FUTURE.days} days after now')
+    else:
+        sale_end_time = DEFAULT_SALE_END_TIME
+
+    return wallet, sale_end_time, polymarket_slug
+
+COMPRESS_MIN_BYTES = 1024  # Smaller bodies are not worth compressing
+
+def negotiate_encoding(body):
+    """Best content encoding the client accepts for `body`: 'br', 'gzip' or None"""
+    if len(body) < COMPRESS_MIN_BYTES:
+        return None
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+def cached_json_response(body, etag, max_age, encoded=None):
+    """
+    JSON response with a strong ETag, Cache-Control max-age and gzip/brotli.
+
+    Answers 304 Not Modified when If-None-Match carries the ETag. `encoded`
+    is a per-body dict that caches compressed variants by encoding.
+    """
+    encoded = {} if encoded is None else encoded
+    encoding = negotiate_encoding(body)
+    data = encoded.get(encoding)
+    CACHE_REQUESTS.inc(cache='encoded_body', result='hit' if data is not None else 'miss')
+    if data is None:
+        data = body.encode()
+        if encoding == 'br':
+            data = brotli.compress(data, quality=5)
+        elif encoding == 'gzip':
+            data = gzip.compress(data, compresslevel=6)
+        encoded[encoding] = data
+
+    response = app.response_class(data, mimetype='application/json')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+        etag = f'{etag}-{encoding}'  # A strong ETag names one exact byte sequence
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f'public, max-age={max_age}'
+    response.vary.add('Accept-Encoding')
+    return response.make_conditional(request)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    started = g.get('request_started')
+    if started is not None:
+        # The URL rule, not the path, so query strings and bad URLs cannot explode the series
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        REQUEST_LATENCY.observe(
+            time.perf_counter() - started, route=route, method=request.method, status=response.status_code
+        )
+    return response
+
+@metrics.on_scrape
+def sample_tracker_metrics():
+    """Per-tracker gauges, sampled at scrape time (evicted trackers drop out)"""
+    now = time.time()
+    states = trackers.all()
+    TRACKERS.set(len(states))
+    for gauge in (HISTORY_SAMPLES, HISTORY_AGE, COLLECTOR_LAG, SNAPSHOT_AGE):
+        gauge.clear()
+    for state in states:
+        labels = {'wallet': state.wallet, 'sale_end_time': state.sale_end_time.isoformat()}
+        with state.history.lock:
+            newest = state.history.points[-1] if state.history.points else None
+            HISTORY_SAMPLES.set(len(state.history.points), **labels)
+        if newest is not None:
+            HISTORY_AGE.set(round(to_unix(datetime.utcnow()) - to_unix(newest[0]), 3), **labels)
+        collector = state.collector
+        if collector is not None:
+            COLLECTOR_LAG.set(round(max(0.0, now - collector.next_poll), 3), **labels)
+            if collector.snapshot is not None:
+                SNAPSHOT_AGE.set(round(now - collector.snapshot.created_at, 3), **labels)
+
+@app.route('/metrics')
+def get_metrics():
+    """Prometheus text exposition of request, upstream, cache and collector metrics"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/')
+def index():
+    return send_from_directory('static', 'index.html')
+
+def timed_response(response, timer, snapshot=None):
+    """
+    Add the Server-Timing header (the served snapshot's build stages, then
+    this request's) and log the request if it is among the slowest
+    """
+    total_ms = timer.total_ms()
+    own = server_timing.header(timer.stages + [('total', total_ms, 'request')])
+    response.headers['Server-Timing'] = f'{snapshot.timing_header}, {own}' if snapshot is not None else own
+    response.headers['Timing-Allow-Origin'] = '*'
+    if slow_requests.admits(total_ms):
+        slow_requests.record(total_ms, {
+            'path': request.full_path.rstrip('?'),
+            'status': response.status_code,
+            'version': snapshot.etag if snapshot is not None else None,
+            'stages': server_timing.as_list((snapshot.timing if snapshot is not None else []) + timer.stages),
+        })
+    return response
+
+@app.route('/api/data')
+def get_data():
+    timer = StageTimer()
+    # Get configuration from query params
+    try:
+        wallet, sale_end_time, polymarket_slug = parse_data_config(request.args)
+    except ValueError as e:
+        response = jsonify({'error': str(e)})
+        response.status_code = 400
+        return timed_response(response, timer)
+
+    with timer.stage('wait', 'collector lookup and first snapshot'):
+        collector = get_collector(wallet, sale_end_time, polymarket_slug)
+        snapshot = collector.latest(timeout=FIRST_SNAPSHOT_TIMEOUT)
+    if snapshot is None:
+        response = jsonify({'error': 'Data not collected yet', 'wallet': wallet})
+        response.status_code = 503
+        return timed_response(response, timer)
+
+    if snapshot.status != 200:
+        response = app.response_class(snapshot.body, status=snapshot.status, mimetype='application/json')
+        return timed_response(response, timer, snapshot)
+
+    # Opt-in (?debug=1): the full payload plus its stage timings, never cached
+    if request.args.get('debug') == '1':
+        payload = collector.payload_for(snapshot)
+        if payload is not None:
+            stages = snapshot.timing + timer.stages
+            with timer.stage('encode'):
+                body = dumps_payload(dict(payload, debug={'server_timing': server_timing.as_list(stages)}))
+            response = app.response_class(body, mimetype='application/json')
+            response.headers['Cache-Control'] = 'no-store'
+            return timed_response(response, timer, snapshot)
+
+    # Cacheable until the collector's next poll; a live balance stream can change it any time
+    max_age = 0 if collector.streaming else max(0, int(collector.next_poll - time.time()))
+
+    # A client that sends the version it holds gets only the changed fields
+    since = request.args.get('since')
+    delta = None
+    if since:
+        with timer.stage('delta'):
+            delta = collector.delta(snapshot, since)
+    with timer.stage('encode'):
+        if delta is not None:
+            body, encoded = delta
+            response = cached_json_response(body, f'{snapshot.etag}-since-{since}', max_age, encoded)
+        else:
+            response = cached_json_response(snapshot.body, snapshot.etag, max_age, snapshot.encoded)
+    return timed_response(response, timer, snapshot)
+
+@app.route('/api/debug/slow')
+def get_slow_log():
+    """The slowest recent /api/data requests and snapshot builds, with their stage timings"""
+    limit = request.args.get('limit', type=int)
+    return jsonify({
+        'window_seconds': SLOW_LOG_WINDOW,
+        'requests': slow_requests.entries(limit),
+        'snapshot_builds': slow_builds.entries(limit),
     })
 
+SSE_KEEPALIVE = 15  # Seconds between comment lines on an idle stream
+
+@app.route('/api/stream')
+def stream_data():
+    """
+    Server-Sent Events: push the /api/data payload each time it changes.
+
+    The first event carries the full payload and later ones only the changed
+    fields (the same delta format as /api/data?since=).
+    """
+    try:
+        wallet, sale_end_time, polymarket_slug = parse_data_config(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    collector = get_collector(wallet, sale_end_time, polymarket_slug)
+
+    def events():
+        nonlocal collector
+        seen = None  # etag of the last snapshot sent
+        sent = None  # etag of the last payload the client holds
+        while True:
+            # An open stream counts as a viewer; if the tracker was evicted anyway, rejoin
+            if collector.stopped:
+                collector = get_collector(wallet, sale_end_time, polymarket_slug)
+            collector.state.touch()
+            snapshot = collector.wait_for_update(seen, timeout=SSE_KEEPALIVE)
+            if snapshot is None or snapshot.etag == seen:
+                yield ': keepalive\n\n'
+                continue
+            seen = snapshot.etag
+            body = snapshot.body
+            delta = collector.delta(snapshot, sent) if sent else None
+            if delta is not None:
+                body = delta[0]
+            sent = snapshot.etag if snapshot.status == 200 else None
+            data = '\n'.join(f'data: {line}' for line in body.splitlines())
+            yield f'id: {seen}\nevent: data\n{data}\n\n'
+
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+CURVE_STEP_MINUTES = 5
+CURVE_MAX_POINTS = 1500  # The default step covers the longest (120h) backfilled curve
+
+@app.route('/api/curves')
+def get_curves():
+    """
+    Forward projection curves from the current balance to the end of the
+    sale: per-pattern and weighted balance paths and threshold probabilities
+    """
+    if engine is None:
+        return jsonify({'error': 'Projection curves need numpy'}), 501
+
+    try:
+        wallet, sale_end_time, polymarket_slug = parse_data_config(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    collector = get_collector(wallet, sale_end_time, polymarket_slug)
+    snapshot = collector.latest(timeout=FIRST_SNAPSHOT_TIMEOUT)
+    payload = collector.payload
+    if snapshot is None or payload is None or 'version' not in payload:
+        return jsonify({'error': 'Data not collected yet', 'wallet': wallet}), 503
+
+    step = max(1, request.args.get('step', CURVE_STEP_MINUTES, type=int))
+    try:
+        curves = engine.forward_curves(payload['balance'], payload['hours_remaining'], step_minutes=step,
+                                       max_points=CURVE_MAX_POINTS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    curves['version'] = payload['version']
+    max_age = 0 if collector.streaming else max(0, int(collector.next_poll - time.time()))
+    return cached_json_response(dumps_payload(curves), f'{snapshot.etag}-curves-{step}', max_age)
+
+HISTORICAL_MAX_AGE = 3600  # The patterns only change on deploy
+historical_response = None  # (body, etag, encoded), built on first request
+
 @app.route('/api/historical')
 def get_historical():
     """Return historical patterns data"""
-    return jsonify(HISTORICAL_PATTERNS)
+    global historical_response
+    if historical_response is None:
+        body = dumps_payload(HISTORICAL_PATTERNS)
+        etag = hashlib.sha1(body.encode()).hexdigest()[:16]
+        historical_response = (body, etag, {})
+    body, etag, encoded = historical_response
+    return cached_json_response(body, etag, HISTORICAL_MAX_AGE, encoded)
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=8080, debug=True)
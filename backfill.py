@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Backfill - Reconstructs past sales' inflow curves from their signature history
+"""
+
+import argparse
+import json
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import historical_curves
+import solana_rpc
+import whale_tracker
+from deposit_store import DepositStore
+from history_store import to_unix
+
+DEFAULT_SALES_PATH = os.path.expanduser('~/ranger-tracker/historical_sales.json')
+DEFAULT_DIR = os.environ.get('BACKFILL_DIR', os.path.expanduser('~/ranger-tracker/backfill'))
+PAGE_LIMIT = 1000       # getSignaturesForAddress maximum page size
+BATCH_SIZE = 50         # getTransaction calls per JSON-RPC batch request
+CONCURRENCY = 4         # Batch requests in flight per sale
+
+
+def load_sales(path):
+    """
+    Sales to backfill from a JSON file:
+    {name: {"wallet": ..., "sale_end_time": ISO, "sale_start_time": ISO (optional)}}.
+    Names should match HISTORICAL_PATTERNS so the app picks the curves up.
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+class SaleBackfill:
+    """
+    Resumable backfill of one sale's deposits.
+
+    Signature pages are walked back from the newest with `before` until they
+    pass the sale start; the cursor and the in-window signatures are
+    checkpointed to <dir>/<name>.signatures.json after every page.
+    Transactions are then fetched in concurrent JSON-RPC batches, and each
+    parsed batch is committed to the sale's DepositStore (<dir>/<name>.db),
+    which never fetches a stored signature again. Transactions the node
+    returns as null are recorded as unavailable in the checkpoint, so they
+    count as done instead of holding the curve back forever. An interrupted
+    run resumes at whichever stage it stopped.
+    """
+
+    def __init__(self, name, sale, directory=DEFAULT_DIR, horizon_hours=historical_curves.DEFAULT_HORIZON_HOURS,
+                 batch_size=BATCH_SIZE, concurrency=CONCURRENCY):
+        self.name = name
+        self.wallet = sale['wallet']
+        self.sale_end_time = sale['sale_end_time']
+        self.sale_end = to_unix(datetime.fromisoformat(sale['sale_end_time']))
+        if sale.get('sale_start_time'):
+            self.sale_start = to_unix(datetime.fromisoformat(sale['sale_start_time']))
+        else:
+            self.sale_start = self.sale_end - horizon_hours * 3600
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.checkpoint_path = os.path.join(directory, f'{name}.signatures.json')
+        self.store_path = os.path.join(directory, f'{name}.db')
+        os.makedirs(directory, exist_ok=True)
+        self.checkpoint = self._load_checkpoint()
+
+    def _load_checkpoint(self):
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as f:
+                checkpoint = json.load(f)
+            if checkpoint['wallet'] != self.wallet:
+                raise ValueError(f"{self.checkpoint_path} belongs to wallet {checkpoint['wallet']}")
+            checkpoint.setdefault('unavailable', [])
+            return checkpoint
+        # signatures: [signature, slot, blockTime] of successful in-window transactions
+        # unavailable: signatures the node returned no transaction for
+        return {'wallet': self.wallet, 'before': None, 'complete': False, 'signatures': [], 'unavailable': []}
+
+    def _save_checkpoint(self):
+        tmp = f"{self.checkpoint_path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self.checkpoint, f)
+        os.replace(tmp, self.checkpoint_path)
+
+    def collect_signatures(self):
+        """Page back through the wallet's signatures until the sale start, checkpointing each page"""
+        checkpoint = self.checkpoint
+        while not checkpoint['complete']:
+            options = {"limit": PAGE_LIMIT}
+            if checkpoint['before']:
+                options["before"] = checkpoint['before']
+            page = solana_rpc.rpc_call(
+                "getSignaturesForAddress", [self.wallet, options], timeout=30, priority=solana_rpc.PRIORITY_BULK
+            ) or []
+
+            for s in page:
+                block_time = s.get('blockTime') or 0
+                if s.get('err') is None and self.sale_start <= block_time <= self.sale_end:
+                    checkpoint['signatures'].append([s['signature'], s.get('slot'), block_time])
+            if page:
+                checkpoint['before'] = page[-1]['signature']
+            checkpoint['complete'] = len(page) < PAGE_LIMIT or (page[-1].get('blockTime') or 0) < self.sale_start
+            self._save_checkpoint()
+        return len(checkpoint['signatures'])
+
+    def fetch_transactions(self, max_txs=None):
+        """
+        Fetch and store transactions not yet in the store (up to `max_txs`).
+        Returns how many are left to fetch: neither stored nor unavailable.
+        """
+        store = DepositStore(self.store_path)
+        try:
+            signatures = self.checkpoint['signatures']
+            done = store.known_signatures(self.wallet, [s[0] for s in signatures])
+            done.update(self.checkpoint['unavailable'])
+            pending = [
+                {'signature': signature, 'slot': slot, 'blockTime': block_time, 'err': None}
+                for signature, slot, block_time in signatures if signature not in done
+            ]
+            if max_txs is not None:
+                pending = pending[:max_txs]
+
+            unavailable = []
+            try:
+                for parsed in whale_tracker.fetch_batched(self.wallet, pending, self.batch_size, self.concurrency,
+                                                          unavailable):
+                    store.save(self.wallet, parsed)
+                    done.update(s['signature'] for s, _ in parsed)
+            finally:
+                if unavailable:
+                    self.checkpoint['unavailable'].extend(s['signature'] for s in unavailable)
+                    self._save_checkpoint()
+            done.update(s['signature'] for s in unavailable)
+            return sum(1 for s in signatures if s[0] not in done)
+        finally:
+            store.close()
+
+    def curve(self):
+        """The sale's curve for historical_curves.save_curves, or None without deposits"""
+        store = DepositStore(self.store_path)
+        try:
+            deposits = store.deposits(self.wallet, since=self.sale_start)
+        finally:
+            store.close()
+        horizon_minutes = int(math.ceil((self.sale_end - self.sale_start) / 60))
+        built = historical_curves.build_curve(
+            [(d['timestamp'], d['amount']) for d in deposits], self.sale_end, horizon_minutes
+        )
+        if built is None:
+            return None
+        pct, final = built
+        return {
+            'pct': pct,
+            'final': round(final, 2),
+            'wallet': self.wallet,
+            'sale_end_time': self.sale_end_time,
+            'deposits': len(deposits),
+        }
+
+    def run(self, max_txs=None):
+        """Both stages; the curve is only built once every transaction is stored"""
+        signatures = self.collect_signatures()
+        remaining = self.fetch_transactions(max_txs)
+        return {
+            'name': self.name,
+            'signatures': signatures,
+            'remaining': remaining,
+            'unavailable': len(self.checkpoint['unavailable']),
+            'curve': self.curve() if remaining == 0 else None,
+        }
+
+
+def backfill(sales, directory=DEFAULT_DIR, max_txs=None, workers=None, **options):
+    """
+    Backfill several sales in parallel, one thread per sale (the shared RPC
+    client's rate limiter keeps the total within the endpoint's limits).
+    A sale that fails keeps its checkpoint and is reported with its error.
+    """
+    def run_one(item):
+        name, sale = item
+        try:
+            return SaleBackfill(name, sale, directory, **options).run(max_txs)
+        except Exception as e:
+            return {'name': name, 'error': str(e), 'curve': None}
+
+    with ThreadPoolExecutor(max_workers=workers or len(sales) or 1) as pool:
+        return list(pool.map(run_one, sales.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sales', default=DEFAULT_SALES_PATH, help='JSON file of sales to backfill')
+    parser.add_argument('--only', nargs='*', help='backfill only these sales')
+    parser.add_argument('--dir', default=DEFAULT_DIR, help='checkpoint directory')
+    parser.add_argument('--output', default=historical_curves.DEFAULT_CURVES_PATH, help='curves file to update')
+    parser.add_argument('--max-txs', type=int, default=None, help='transactions to fetch per sale this run')
+    parser.add_argument('--workers', type=int, default=None, help='sales backfilled at once')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--concurrency', type=int, default=CONCURRENCY)
+    args = parser.parse_args()
+
+    sales = load_sales(args.sales)
+    if args.only:
+        sales = {name: sale for name, sale in sales.items() if name in args.only}
+
+    results = backfill(sales, args.dir, args.max_txs, args.workers,
+                       batch_size=args.batch_size, concurrency=args.concurrency)
+
+    print("-" * 60)
+    curves = {}
+    for result in results:
+        if result.get('error'):
+            print(f"{result['name']:<12} failed: {result['error']} (re-run to resume)")
+        elif result['curve'] is None and result['remaining']:
+            print(f"{result['name']:<12} {result['remaining']} of {result['signatures']} transactions left (re-run to resume)")
+        elif result['curve'] is None:
+            print(f"{result['name']:<12} no deposits found")
+        else:
+            curve = result['curve']
+            curves[result['name']] = curve
+            print(f"{result['name']:<12} {curve['deposits']:>7} deposits, final ${curve['final']:,.0f}, "
+                  f"{len(curve['pct'])} minutes")
+            if result['unavailable']:
+                print(f"{'':<12} {result['unavailable']} transactions were not available from the node")
+    if curves:
+        historical_curves.save_curves(curves, args.output)
+        print(f"Wrote {len(curves)} curve(s) to {args.output}; restart the dashboard to load them")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Backtest - Replays recorded sale timelines through the projection pipeline
+"""
+
+import argparse
+import json
+import os
+import random
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import app
+import ranger_analysis
+from history_store import HistoryFile, from_unix, to_unix
+from projection_engine import ProjectionEngine
+from simulation import Simulator
+from tracker_state import BalanceHistory, TrackerState
+
+DEFAULT_STEP_MINUTES = 10    # Simulated time between replayed requests
+PROB_BUCKETS = 10            # Calibration bins over predicted probability
+
+# Pipelines to compare: the dashboard (/api/data) and the CLI script
+DEFAULT_CONFIGS = [
+    {'name': 'app'},
+    {'name': 'ranger_analysis', 'pipeline': 'ranger_analysis'},
+]
+
+# The tables configurations start from (apply_config swaps the app's own)
+BASE_PATTERNS = dict(app.HISTORICAL_PATTERNS)
+BASE_WEIGHTS = dict(app.PATTERN_WEIGHTS)
+
+
+def load_ranger_log(path, final=None):
+    """
+    Timeline from ranger_analysis.py's ranger_log.jsonl. The sale end is
+    taken from the entries' hours_remaining; without `final`, the last
+    logged balance stands in for the final raise. ranger_analysis does not
+    log Polymarket odds, so these timelines have none unless the entries
+    were given a `polymarket_odds` field by other means.
+    """
+    entries = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                entries.append(json.loads(line))
+    if not entries:
+        raise ValueError(f"{path} has no entries")
+
+    last = entries[-1]
+    sale_end_time = datetime.fromisoformat(last['timestamp']) + timedelta(hours=last['hours_remaining'])
+    return {
+        'name': os.path.splitext(os.path.basename(path))[0],
+        'sale_end_time': sale_end_time.isoformat(),
+        'final': final if final is not None else last['balance'],
+        'points': [(to_unix(datetime.fromisoformat(e['timestamp'])), e['balance']) for e in entries],
+        'odds': [
+            (to_unix(datetime.fromisoformat(e['timestamp'])), e['polymarket_odds'])
+            for e in entries if e.get('polymarket_odds')
+        ],
+    }
+
+
+def load_history_file(path, final=None):
+    """Timeline from a balance history file (<wallet>-<sale end unix>.bin, see history_store); no odds"""
+    store = HistoryFile(path, readonly=True)
+    try:
+        records = store.read(0)
+    finally:
+        store.close()
+    if not records:
+        raise ValueError(f"{path} has no records")
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    wallet, _, end = stem.rpartition('-')
+    return {
+        'name': wallet[:8] or stem,
+        'sale_end_time': from_unix(int(end)).isoformat(),
+        'final': final if final is not None else records[-1][1],
+        'points': [(to_unix(ts), balance) for ts, balance, _ in records],
+        'odds': [],
+    }
+
+
+def load_timeline(path, final=None):
+    """
+    Load a timeline from a .jsonl log, a .bin history file, or a .json dump
+    of {'name', 'sale_end_time', 'final', 'points': [[unix, balance]], 'odds': [[unix, {threshold: pct}]]}
+    """
+    if path.endswith('.jsonl'):
+        return load_ranger_log(path, final)
+    if path.endswith('.bin'):
+        return load_history_file(path, final)
+    with open(path) as f:
+        timeline = json.load(f)
+    if final is not None:
+        timeline['final'] = final
+    return timeline
+
+
+def _synthetic_pct(pct_at_5_5h, hours_remaining, hours):
+    """The app's surge curve, with a linear ramp from 0% before the 5.5h anchor"""
+    if hours_remaining >= 5.5:
+        return pct_at_5_5h * (hours - hours_remaining) / (hours - 5.5)
+    return app.estimate_pct_at_time(pct_at_5_5h, hours_remaining)
+
+
+def synthetic_timelines(patterns=None, hours=24, interval_minutes=2, noise=0.01, seed=1):
+    """
+    One timeline per historical pattern, following its estimated surge curve
+    with multiplicative noise (for smoke tests and timing, not for accuracy).
+    """
+    rng = random.Random(seed)
+    patterns = patterns or BASE_PATTERNS
+    end = datetime(2026, 1, 1)
+    timelines = []
+    for name, data in patterns.items():
+        points = []
+        for i in range(int(hours * 60 / interval_minutes) + 1):
+            hours_remaining = hours - i * interval_minutes / 60
+            pct = _synthetic_pct(data['pct_at_5_5h'], hours_remaining, hours)
+            balance = data['final'] * pct / 100 * (1 + rng.gauss(0, noise))
+            points.append((to_unix(end - timedelta(hours=hours_remaining)), balance))
+        timelines.append({
+            'name': name,
+            'sale_end_time': end.isoformat(),
+            'final': data['final'],
+            'points': points,
+            'odds': [],
+        })
+    return timelines
+
+
+def apply_config(config, timeline):
+    """Point the app's pattern tables and engines at this configuration"""
+    patterns = dict(config.get('patterns') or BASE_PATTERNS)
+    weights = dict(config.get('weights') or BASE_WEIGHTS)
+    # Leave the replayed sale out of its own reference patterns
+    if config.get('exclude_self', True):
+        patterns.pop(timeline['name'], None)
+        weights.pop(timeline['name'], None)
+        total = sum(weights.values())
+        weights = {k: v / total for k, v in weights.items()} if total else weights
+
+    app.HISTORICAL_PATTERNS = patterns
+    app.PATTERN_WEIGHTS = weights
+    if app.engine is not None:
+        app.engine = ProjectionEngine(patterns, weights, curves=app.HISTORICAL_CURVES)
+        simulate = app.SIMULATION and config.get('simulation', True)
+        app.simulator = Simulator(app.engine, workers=0) if simulate else None
+
+
+def _latest(series, times, t):
+    index = bisect_right(times, t)
+    return series[index - 1][1] if index else None
+
+
+def replay(timeline, config, step_minutes=DEFAULT_STEP_MINUTES):
+    """
+    Run the pipeline at simulated times over one timeline. Returns one row
+    per step with the projections and threshold probabilities that the
+    dashboard (or ranger_analysis) would have shown at that moment.
+    """
+    apply_config(config, timeline)
+    sale_end_time = datetime.fromisoformat(timeline['sale_end_time'])
+    points = sorted(timeline['points'])
+    odds = sorted(timeline.get('odds') or [], key=lambda o: o[0])
+    odds_times = [o[0] for o in odds]
+
+    history = BalanceHistory()
+    state = TrackerState(timeline['name'], sale_end_time, None, history=history)
+    pipeline = config.get('pipeline', 'app')
+
+    rows = []
+    fed = 0
+    t = points[0][0] + step_minutes * 60
+    end = min(points[-1][0], to_unix(sale_end_time))
+    while t <= end:
+        while fed < len(points) and points[fed][0] <= t:
+            history.record(points[fed][1], from_unix(points[fed][0]))
+            fed += 1
+        balance = points[fed - 1][1]
+        now = from_unix(t)
+        hours_remaining = max(0, (sale_end_time - now).total_seconds() / 3600)
+        pm_odds = {int(k): v for k, v in (_latest(odds, odds_times, t) or {}).items()}
+
+        if pipeline == 'ranger_analysis':
+            projections = ranger_analysis.calculate_projections(balance, hours_remaining)
+            values = sorted(p['projected'] for p in projections)
+            row = {
+                'projected': values[len(values) // 2],
+                'probabilities': ranger_analysis.analyze_polymarket_odds(projections),
+            }
+        else:
+            upstream = {'balance': balance, 'transactions': None,
+                        'polymarket': {'odds': pm_odds, 'source': 'recorded', 'age_seconds': None}}
+            payload, _ = app.build_snapshot(state, record=False, upstream=(upstream, []), now=now)
+            row = {
+                'projected': payload['combined_projection'],
+                'historical': payload['historical_projection'],
+                'velocity': payload['velocity']['weighted_projection'],
+                'probabilities': payload['model_probabilities'],
+            }
+            if payload.get('simulation'):
+                row['simulation'] = payload['simulation']['probabilities']
+
+        row.update({'hours_remaining': hours_remaining, 'balance': balance, 'odds': pm_odds})
+        rows.append(row)
+        t += step_minutes * 60
+    return rows
+
+
+def score(rows, final):
+    """
+    Error, calibration and trading edge of one replay.
+
+    - error: mean absolute % error of the projection per whole hour remaining
+    - calibration: per probability bin, [sum predicted, sum outcomes, count]
+    - brier: sum of squared probability errors and count
+    - edge: per-share profit from taking every BUY YES / BUY NO signal
+      (model at least 10 points from the recorded Polymarket price), or
+      None when the timeline has no recorded odds to trade against
+    """
+    error = {}
+    calibration = {}
+    brier = [0.0, 0]
+    edge = [0.0, 0]
+
+    for row in rows:
+        bucket = int(row['hours_remaining'])
+        total, count = error.get(bucket, (0.0, 0))
+        error[bucket] = (total + abs(row['projected'] - final) / final * 100, count + 1)
+
+        for threshold, prob in row['probabilities'].items():
+            threshold = int(threshold)
+            outcome = 1 if final >= threshold * 1_000_000 else 0
+            p = prob / 100
+            b = min(int(p * PROB_BUCKETS), PROB_BUCKETS - 1)
+            cell = calibration.setdefault(b, [0.0, 0, 0])
+            cell[0] += p
+            cell[1] += outcome
+            cell[2] += 1
+            brier[0] += (p - outcome) ** 2
+            brier[1] += 1
+
+            price = row['odds'].get(threshold)
+            if price is None:
+                continue
+            diff = prob - price
+            if diff > 10:
+                edge[0] += outcome - price / 100
+                edge[1] += 1
+            elif diff < -10:
+                edge[0] += (1 - outcome) - (1 - price / 100)
+                edge[1] += 1
+
+    return {
+        'error': {h: [total, count] for h, (total, count) in error.items()},
+        'calibration': calibration,
+        'brier': brier,
+        'edge': edge if any(row['odds'] for row in rows) else None,
+        'final_error_pct': abs(rows[-1]['projected'] - final) / final * 100 if rows else None,
+    }
+
+
+def run_job(job):
+    timeline, config, step_minutes = job
+    rows = replay(timeline, config, step_minutes)
+    return timeline['name'], config['name'], score(rows, timeline['final'])
+
+
+def merge_scores(scores):
+    """Combine score() results (e.g. all sales for one configuration)"""
+    merged = {'error': {}, 'calibration': {}, 'brier': [0.0, 0], 'edge': None}
+    for s in scores:
+        for h, (total, count) in s['error'].items():
+            cell = merged['error'].setdefault(h, [0.0, 0])
+            cell[0] += total
+            cell[1] += count
+        for b, (p, outcomes, count) in s['calibration'].items():
+            cell = merged['calibration'].setdefault(b, [0.0, 0, 0])
+            cell[0] += p
+            cell[1] += outcomes
+            cell[2] += count
+        merged['brier'][0] += s['brier'][0]
+        merged['brier'][1] += s['brier'][1]
+        if s['edge'] is not None:
+            merged['edge'] = merged['edge'] or [0.0, 0]
+            merged['edge'][0] += s['edge'][0]
+            merged['edge'][1] += s['edge'][1]
+    return merged
+
+
+def run_backtest(timelines, configs=None, step_minutes=DEFAULT_STEP_MINUTES, workers=None):
+    """
+    Replay every timeline under every configuration, spread over a process
+    pool (workers=0 runs in-process). Returns {config: {'sales': {...}, 'total': ...}}.
+    """
+    configs = configs or DEFAULT_CONFIGS
+    jobs = [(timeline, config, step_minutes) for config in configs for timeline in timelines]
+    if workers == 0:
+        saved = (app.HISTORICAL_PATTERNS, app.PATTERN_WEIGHTS, app.engine, app.simulator)
+        try:
+            results = [run_job(job) for job in jobs]
+        finally:
+            app.HISTORICAL_PATTERNS, app.PATTERN_WEIGHTS, app.engine, app.simulator = saved
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run_job, jobs))
+
+    report = {}
+    for sale, config_name, result in results:
+        report.setdefault(config_name, {'sales': {}})['sales'][sale] = result
+    for entry in report.values():
+        entry['total'] = merge_scores(entry['sales'].values())
+    return report
+
+
+def print_report(report):
+    for config_name, entry in report.items():
+        total = entry['total']
+        print("=" * 80)
+        print(f"CONFIG: {config_name}")
+        print("=" * 80)
+
+        print(f"{'Sale':<16} {'Final error':>12} {'Brier':>8} {'Trades':>7} {'Edge/share':>11}")
+        print("-" * 80)
+        for sale, s in entry['sales'].items():
+            brier = s['brier'][0] / s['brier'][1] if s['brier'][1] else 0
+            final_error = s['final_error_pct'] or 0
+            if s['edge'] is None:
+                print(f"{sale:<16} {final_error:>11.1f}% {brier:>8.3f} {'n/a':>7} {'no odds':>11}")
+                continue
+            edge = s['edge'][0] / s['edge'][1] if s['edge'][1] else 0
+            print(f"{sale:<16} {final_error:>11.1f}% {brier:>8.3f} {s['edge'][1]:>7} {edge:>+11.3f}")
+        print()
+
+        print("ERROR BY HOURS REMAINING (mean absolute % error):")
+        for h in sorted(total['error'], reverse=True):
+            err, count = total['error'][h]
+            print(f"  {h:>3}h  {err / count:>8.1f}%  ({count} points)")
+        print()
+
+        print("CALIBRATION (predicted vs observed):")
+        for b in sorted(total['calibration']):
+            p, outcomes, count = total['calibration'][b]
+            print(f"  {b * 100 // PROB_BUCKETS:>3}-{(b + 1) * 100 // PROB_BUCKETS:<3}%  "
+                  f"predicted {p / count * 100:>5.1f}%  observed {outcomes / count * 100:>5.1f}%  ({count})")
+        brier = total['brier'][0] / total['brier'][1] if total['brier'][1] else 0
+        print(f"  Brier score: {brier:.4f}")
+        if total['edge'] is None:
+            print("  Simulated edge: not available, no timeline has recorded Polymarket odds")
+        elif total['edge'][1]:
+            print(f"  Simulated edge: {total['edge'][0] / total['edge'][1]:+.3f} per share over {total['edge'][1]} trades")
+        else:
+            print("  Simulated edge: no trades (the model never differed from the odds by more than 10 points)")
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('timelines', nargs='*', help='ranger_log.jsonl, history .bin files or .json timeline dumps')
+    parser.add_argument('--final', type=float, help='final raise, for timelines recorded before the sale ended')
+    parser.add_argument('--synthetic', action='store_true', help='replay synthetic timelines of the historical patterns')
+    parser.add_argument('--configs', help='JSON file with a list of configurations')
+    parser.add_argument('--step', type=float, default=DEFAULT_STEP_MINUTES, help='minutes between replayed requests')
+    parser.add_argument('--workers', type=int, default=None, help='process pool size (0 runs in-process)')
+    parser.add_argument('--json', help='also write the full report to this file')
+    args = parser.parse_args()
+
+    timelines = [load_timeline(path, args.final) for path in args.timelines]
+    if args.synthetic:
+        timelines.extend(synthetic_timelines())
+    if not timelines:
+        parser.error('no timelines given (pass files or --synthetic)')
+    without_odds = [t['name'] for t in timelines if not t.get('odds')]
+    if without_odds:
+        print(f"WARNING: no recorded Polymarket odds for {', '.join(without_odds)}; their trading edge is not "
+              f"scored. ranger_log.jsonl and .bin histories do not record odds; pass a .json timeline with 'odds'.")
+        print()
+
+    configs = None
+    if args.configs:
+        with open(args.configs) as f:
+            configs = json.load(f)
+
+    report = run_backtest(timelines, configs, args.step, args.workers)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: historical backfill against recorded RPC fixtures
+
+Serves the transaction fixture (benchmarks/fixtures/transactions.json, or
+synthetic data when it is missing) from the local stub RPC and backfills it
+as one sale twice: in a single run, and interrupted every --chunk
+transactions and resumed from its checkpoint. Prints wall time and HTTP
+requests for each, checks that both produce the same curve, and times
+interpolating the curve in the projection engine.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import app
+import backfill
+import solana_rpc
+from fixtures import load_transactions
+from history_store import from_unix
+from projection_engine import ProjectionEngine
+from stub_rpc import StubRPC
+
+
+def sale_for(fixture):
+    """A sale spanning the fixture's signatures, named after a historical pattern"""
+    times = [s['blockTime'] for s in fixture['signatures'] if s.get('blockTime')]
+    return {
+        'wallet': fixture['wallet'],
+        'sale_start_time': from_unix(min(times) - 60).isoformat(),
+        'sale_end_time': from_unix(max(times) + 60).isoformat(),
+    }
+
+
+def timed_backfill(stub, sale, directory, chunk=None, **options):
+    """Run (and resume) the backfill until the curve is built; returns (seconds, requests, runs, curve)"""
+    before = stub.requests
+    runs = 0
+    remaining = None
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        while True:
+            runs += 1
+            # A fresh SaleBackfill each run, as after a restart
+            result = backfill.SaleBackfill('Solomon', sale, directory, **options).run(max_txs=chunk)
+            if not result['remaining']:
+                break
+            if result['remaining'] == remaining:
+                raise RuntimeError(f"backfill stuck with {remaining} transactions left after {runs} runs")
+            remaining = result['remaining']
+    return time.perf_counter() - start, stub.requests - before, runs, result['curve']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--txs', type=int, default=300, help='synthetic transactions when there is no fixture')
+    parser.add_argument('--latency', type=float, default=0.02, help='stub round trip in seconds')
+    parser.add_argument('--chunk', type=int, default=100, help='transactions per run when resuming')
+    parser.add_argument('--batch-size', type=int, default=backfill.BATCH_SIZE)
+    parser.add_argument('--concurrency', type=int, default=backfill.CONCURRENCY)
+    args = parser.parse_args()
+
+    fixture = load_transactions(count=args.txs)
+    sale = sale_for(fixture)
+    options = {'batch_size': args.batch_size, 'concurrency': args.concurrency}
+
+    with StubRPC(latency=args.latency, fixture=fixture) as stub:
+        solana_rpc.configure(url=stub.url, pool_size=max(args.concurrency, 4), rate_limits={})
+
+        print(f"Backfilling {len(fixture['signatures'])} {fixture.get('source', 'recorded')} transactions, "
+              f"{args.latency * 1000:.0f}ms stub latency")
+        print("-" * 60)
+        print(f"{'Mode':<30} {'Wall (s)':>10} {'Runs':>6} {'HTTP':>6}")
+        print("-" * 60)
+        with tempfile.TemporaryDirectory() as single_dir, tempfile.TemporaryDirectory() as resumed_dir:
+            elapsed, requests, runs, single = timed_backfill(stub, sale, single_dir, **options)
+            print(f"{'single run':<30} {elapsed:>10.2f} {runs:>6} {requests:>6}")
+            elapsed, requests, runs, resumed = timed_backfill(stub, sale, resumed_dir, args.chunk, **options)
+            print(f"{f'resumed every {args.chunk} txs':<30} {elapsed:>10.2f} {runs:>6} {requests:>6}")
+        print("-" * 60)
+
+    if single is None or resumed is None:
+        print("No deposits found in the fixture")
+        return
+    same = np.array_equal(single['pct'], resumed['pct']) and single['final'] == resumed['final']
+    print(f"Curves: {len(single['pct'])} minutes, {single['deposits']} deposits, identical: {same}")
+    if not same:
+        sys.exit("Resumed backfill built a different curve than the single run")
+
+    engine = ProjectionEngine(app.HISTORICAL_PATTERNS, app.PATTERN_WEIGHTS, curves={'Solomon': single})
+    grid = np.linspace(0, len(single['pct']) / 60, 1000)
+    iterations = 1000
+    start = time.perf_counter()
+    for _ in range(iterations):
+        engine.pct_at(grid)
+    per_call = (time.perf_counter() - start) / iterations * 1e6
+    print(f"pct_at over {len(grid)} time points: {per_call:.1f}us per call")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pure-Python projection functions vs the vectorized ProjectionEngine
+
+Times the per-request projection work (projections, model probabilities and
+historical snapshots, as build_snapshot used to run them) at a single time
+point, then a full forward curve, for the real patterns and for a larger
+synthetic pattern set.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+from projection_engine import ProjectionEngine
+
+BALANCE = 25_000_000
+HOURS_REMAINING = 3.0
+
+
+def synthetic_patterns(count, seed=7):
+    rng = random.Random(seed)
+    patterns, weights = {}, {}
+    for i in range(count):
+        final = rng.uniform(5e6, 2e8)
+        pct = rng.uniform(8, 35)
+        name = f'Sale{i:04d}'
+        patterns[name] = {
+            'final': final,
+            'sale_date': f'2025-{1 + i % 12:02d}-01',
+            'order': i,
+            'pct_at_5_5h': pct,
+            'snapshots': {5.5: final * pct / 100},
+        }
+        weights[name] = 1 / count
+    return patterns, weights
+
+
+def legacy_point(balance, hours):
+    projections = app.calculate_projections(balance, hours)
+    app.calculate_model_probabilities(projections)
+    app.calculate_confidence(projections, balance, hours)  # Recomputes the historical snapshots
+    app.get_historical_at_time(hours)
+
+
+def engine_point(engine, balance, hours):
+    projections, _, historical = engine.point(balance, hours)
+    app.calculate_confidence(projections, balance, hours, historical)
+
+
+def legacy_curve(balance, grid):
+    for hours in grid:
+        app.calculate_model_probabilities(app.calculate_projections(balance, hours))
+
+
+def per_call_ms(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run(label, patterns, weights, repeat, step_minutes):
+    # The pure-Python functions read the module-level tables
+    app.HISTORICAL_PATTERNS, app.PATTERN_WEIGHTS = patterns, weights
+    engine = ProjectionEngine(patterns, weights)
+    grid = [HOURS_REMAINING - i * step_minutes / 60 for i in range(int(HOURS_REMAINING * 60 / step_minutes) + 1)]
+
+    rows = [
+        ('point, python', per_call_ms(lambda: legacy_point(BALANCE, HOURS_REMAINING), repeat)),
+        ('point, engine', per_call_ms(lambda: engine_point(engine, BALANCE, HOURS_REMAINING), repeat)),
+        (f'curve x{len(grid)}, python', per_call_ms(lambda: legacy_curve(BALANCE, grid), max(1, repeat // 20))),
+        (f'curve x{len(grid)}, engine', per_call_ms(
+            lambda: engine.forward_curves(BALANCE, HOURS_REMAINING, step_minutes), max(1, repeat // 20))),
+    ]
+    for name, ms in rows:
+        print(f"{label:<18} {name:<26} {ms:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200, help='calls per measurement')
+    parser.add_argument('--patterns', type=int, default=200, help='size of the synthetic pattern set')
+    parser.add_argument('--step', type=int, default=5, help='forward curve step in minutes')
+    args = parser.parse_args()
+
+    real = (app.HISTORICAL_PATTERNS, app.PATTERN_WEIGHTS)
+    print(f"{'Patterns':<18} {'Mode':<26} {'ms/call':>10}")
+    print("-" * 56)
+    try:
+        run(f'real ({len(real[0])})', real[0], real[1], args.repeat, args.step)
+        run(f'synthetic ({args.patterns})', *synthetic_patterns(args.patterns), args.repeat, args.step)
+    finally:
+        app.HISTORICAL_PATTERNS, app.PATTERN_WEIGHTS = real
+    print("-" * 56)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: indexed token-delta decoder vs the original nested loops
+
+Decodes every transaction in the fixture with both implementations and
+prints time per transaction. Uses benchmarks/fixtures/transactions.json when
+recorded (see fixtures.py), synthetic transactions otherwise.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import whale_tracker
+from fixtures import TRANSACTIONS_FIXTURE, load_transactions
+
+USDC_MINT = whale_tracker.USDC_MINT
+
+
+def legacy_extract_deposits(tx, wallet, signature, block_time):
+    """The nested-loop decoder parse_usdc_deposits used before token_deltas"""
+    deposits = []
+    meta = tx.get('meta', {})
+    pre_balances = meta.get('preTokenBalances', [])
+    post_balances = meta.get('postTokenBalances', [])
+
+    for post in post_balances:
+        if post.get('mint') != USDC_MINT:
+            continue
+
+        owner = post.get('owner', '')
+        post_amount = float(post.get('uiTokenAmount', {}).get('uiAmount', 0) or 0)
+
+        pre_amount = 0
+        for pre in pre_balances:
+            if pre.get('mint') == USDC_MINT and pre.get('owner') == owner:
+                pre_amount = float(pre.get('uiTokenAmount', {}).get('uiAmount', 0) or 0)
+                break
+
+        if owner == wallet and post_amount > pre_amount:
+            deposit_amount = post_amount - pre_amount
+
+            sender = None
+            for pre in pre_balances:
+                if pre.get('mint') == USDC_MINT and pre.get('owner') != wallet:
+                    pre_bal = float(pre.get('uiTokenAmount', {}).get('uiAmount', 0) or 0)
+                    post_bal = 0
+                    for p in post_balances:
+                        if p.get('owner') == pre.get('owner') and p.get('mint') == USDC_MINT:
+                            post_bal = float(p.get('uiTokenAmount', {}).get('uiAmount', 0) or 0)
+                    if pre_bal > post_bal:
+                        sender = pre.get('owner')
+                        break
+
+            if deposit_amount > 0:
+                deposits.append({
+                    'amount': deposit_amount,
+                    'sender': sender,
+                    'timestamp': block_time,
+                    'signature': signature
+                })
+
+    return deposits
+
+
+def run(decoder, fixture, repeat):
+    wallet = fixture['wallet']
+    pairs = list(zip(fixture['signatures'], fixture['transactions']))
+    best = None
+    total = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        total = 0
+        for sig_info, tx in pairs:
+            for deposit in decoder(tx, wallet, sig_info['signature'], sig_info.get('blockTime', 0)):
+                total += deposit['amount']
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--fixtures', default=TRANSACTIONS_FIXTURE)
+    parser.add_argument('--count', type=int, default=300, help='synthetic transactions when no fixture is recorded')
+    parser.add_argument('--hops', type=int, default=40, help='extra token accounts in synthetic swaps')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    fixture = load_transactions(args.fixtures, args.count, args.hops)
+    count = len(fixture['transactions'])
+    entries = sum(len((tx.get('meta') or {}).get('postTokenBalances') or []) for tx in fixture['transactions'])
+
+    print(f"{count} transactions ({fixture['source']}), {entries / max(count, 1):.1f} token balances per tx")
+    print("-" * 60)
+    print(f"{'Decoder':<20} {'us/tx':>10} {'Total volume':>20}")
+    print("-" * 60)
+    for name, decoder in [('nested loops', legacy_extract_deposits), ('token_deltas', whale_tracker.extract_deposits)]:
+        elapsed, volume = run(decoder, fixture, args.repeat)
+        print(f"{name:<20} {elapsed / max(count, 1) * 1e6:>10.1f} {volume:>20,.2f}")
+    print("-" * 60)
+
+
+if __name__ == '__main__':
+    main()
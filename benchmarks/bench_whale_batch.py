@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark: serial vs batched getTransaction fetching in whale_tracker
+
+Runs parse_usdc_deposits against a local stub RPC server, once with the
+serial loop and once per batch configuration, and prints wall time for
+each. The stub has no rate limit, so client-side rate limiting is off.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import solana_rpc
+import whale_tracker
+from stub_rpc import StubRPC, WALLET
+
+
+def timed_parse(**kwargs):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        deposits, _ = whale_tracker.parse_usdc_deposits(WALLET, **kwargs)
+    return time.perf_counter() - start, len(deposits)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--txs', type=int, default=300, help='transactions to parse')
+    parser.add_argument('--latency', type=float, default=0.02, help='stub round trip in seconds')
+    parser.add_argument('--batch-sizes', default='10,50,100', help='comma separated batch sizes')
+    parser.add_argument('--concurrency', type=int, default=whale_tracker.BATCH_CONCURRENCY)
+    parser.add_argument('--skip-serial', action='store_true', help='only run the batched modes')
+    args = parser.parse_args()
+
+    with StubRPC(latency=args.latency, signature_count=args.txs) as stub:
+        solana_rpc.configure(url=stub.url, pool_size=max(args.concurrency, 4), rate_limits={})
+
+        print(f"Parsing {args.txs} transactions, {args.latency * 1000:.0f}ms stub latency")
+        print("-" * 60)
+        print(f"{'Mode':<30} {'Wall (s)':>10} {'Deposits':>10} {'HTTP':>6}")
+        print("-" * 60)
+
+        if not args.skip_serial:
+            before = stub.requests
+            elapsed, count = timed_parse(max_txs=args.txs)
+            print(f"{'serial':<30} {elapsed:>10.2f} {count:>10} {stub.requests - before:>6}")
+
+        for size in [int(s) for s in args.batch_sizes.split(',') if s]:
+            before = stub.requests
+            elapsed, count = timed_parse(max_txs=args.txs, batch_size=size, concurrency=args.concurrency)
+            label = f"batch={size} concurrency={args.concurrency}"
+            print(f"{label:<30} {elapsed:>10.2f} {count:>10} {stub.requests - before:>6}")
+
+        print("-" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Recorded RPC fixtures for benchmarks
+
+Fixtures are JSON files under benchmarks/fixtures/. Record them from a live
+RPC endpoint with:
+
+    python3 benchmarks/fixtures.py --wallet <address> --count 300
+
+When a fixture file is missing, benchmarks fall back to synthetic data from
+stub_rpc so they still run offline.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import solana_rpc
+from stub_rpc import WALLET, make_signatures, make_transaction
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+TRANSACTIONS_FIXTURE = os.path.join(FIXTURE_DIR, 'transactions.json')
+
+
+def synthetic_transactions(count, wallet=WALLET, hops=40):
+    """Stand-in transactions: two simple transfers for every multi-hop swap with `hops` extra accounts"""
+    return {
+        'wallet': wallet,
+        'source': 'synthetic',
+        'signatures': make_signatures(count, wallet),
+        'transactions': [
+            make_transaction(s['signature'], wallet, extra_accounts=(2 if i % 3 else hops))
+            for i, s in enumerate(make_signatures(count, wallet))
+        ],
+    }
+
+
+def load_transactions(path=TRANSACTIONS_FIXTURE, count=300, hops=40):
+    """Recorded getSignaturesForAddress + getTransaction results, or synthetic ones"""
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return synthetic_transactions(count, hops=hops)
+
+
+def record_transactions(wallet, count, path=TRANSACTIONS_FIXTURE, batch_size=50):
+    """Capture `count` recent transactions for `wallet` from the configured RPC"""
+    signatures = solana_rpc.rpc_call("getSignaturesForAddress", [wallet, {"limit": count}], timeout=30) or []
+    signatures = [s for s in signatures if s.get('err') is None]
+    transactions = []
+    for i in range(0, len(signatures), batch_size):
+        chunk = signatures[i:i + batch_size]
+        transactions.extend(solana_rpc.rpc_batch([
+            ("getTransaction", [s['signature'], {"encoding": "jsonParsed", "maxSupportedTransactionVersion": 0}])
+            for s in chunk
+        ], timeout=60))
+
+    kept = [(s, tx) for s, tx in zip(signatures, transactions) if tx]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({
+            'wallet': wallet,
+            'source': solana_rpc.get_client().url,
+            'signatures': [s for s, _ in kept],
+            'transactions': [tx for _, tx in kept],
+        }, f)
+    return len(kept)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record transaction fixtures from a live RPC endpoint')
+    parser.add_argument('--wallet', default=WALLET)
+    parser.add_argument('--count', type=int, default=300)
+    parser.add_argument('--output', default=TRANSACTIONS_FIXTURE)
+    args = parser.parse_args()
+
+    recorded = record_transactions(args.wallet, args.count, args.output)
+    print(f"Recorded {recorded} transactions to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Local stub Solana RPC server for benchmarks
+
+Answers getSignaturesForAddress, getTransaction and getTokenAccountsByOwner
+with deterministic synthetic data, including JSON-RPC batch arrays. Each HTTP
+request sleeps for `latency` seconds to stand in for the network round trip,
+and a `throttle` fraction of requests is answered with HTTP 429. With a
+recorded `fixture` (see fixtures.py) the signatures and transactions come
+from it instead. GET /events answers like the Polymarket gamma API, so the
+whole /api/data pipeline can run against the stub (see app.POLYMARKET_GAMMA_URL).
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WALLET = "9ApaAe39Z8GEXfqm7F7HL545N4J4tN7RhF8FhS88pRNp"
+USDC_MINT = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+BASE_BLOCK_TIME = 1768046400  # 2026-01-10 12:00 UTC
+ODDS_THRESHOLDS = [15, 20, 30, 40, 50, 60, 70, 80, 90, 100, 120, 140, 160, 180, 200]
+
+
+def make_signature(i):
+    return f"stubsig{i:06d}"
+
+
+def make_signatures(count, wallet=WALLET):
+    """Newest-first signature list like getSignaturesForAddress returns"""
+    return [
+        {
+            'signature': make_signature(i),
+            'slot': 300000000 - i,
+            'err': None,
+            'blockTime': BASE_BLOCK_TIME - i * 7,
+        }
+        for i in range(count)
+    ]
+
+
+def make_transaction(signature, wallet=WALLET, extra_accounts=2):
+    """Synthetic jsonParsed transaction moving USDC from one sender into `wallet`"""
+    rng = random.Random(signature)
+    i = int(signature[len("stubsig"):]) if signature.startswith("stubsig") else rng.randrange(10 ** 6)
+    amount = round(rng.choice([50, 250, 900, 2500, 12000, 75000]) * rng.uniform(0.8, 1.2), 6)
+    wallet_before = 1_000_000 + i * 10.0
+    sender = f"Sender{i % 97:04d}"
+    sender_before = amount * 3
+
+    def balance(index, owner, ui_amount, mint=USDC_MINT, decimals=6):
+        return {
+            'accountIndex': index,
+            'mint': mint,
+            'owner': owner,
+            'uiTokenAmount': {
+                'amount': str(int(round(ui_amount * 10 ** decimals))),
+                'decimals': decimals,
+                'uiAmount': ui_amount,
+                'uiAmountString': str(ui_amount),
+            },
+        }
+
+    pre = [balance(1, wallet, wallet_before), balance(2, sender, sender_before)]
+    post = [balance(1, wallet, wallet_before + amount), balance(2, sender, sender_before - amount)]
+
+    # Extra token accounts, as in swap/route transactions: USDC fee vaults
+    # that grow slightly, and pool accounts of other mints
+    for k in range(extra_accounts):
+        if k % 2 == 0:
+            pre.append(balance(3 + k, f"Vault{k:03d}", 5000.0 + k))
+            post.append(balance(3 + k, f"Vault{k:03d}", 5000.5 + k))
+        else:
+            other_mint = f"OtherMint{k:03d}"
+            pre.append(balance(3 + k, f"Pool{k:03d}", 5000.0 + k, mint=other_mint, decimals=9))
+            post.append(balance(3 + k, f"Pool{k:03d}", 4990.0 + k, mint=other_mint, decimals=9))
+
+    return {
+        'slot': 300000000 - i,
+        'blockTime': BASE_BLOCK_TIME - i * 7,
+        'meta': {'err': None, 'preTokenBalances': pre, 'postTokenBalances': post},
+        'transaction': {'signatures': [signature]},
+    }
+
+
+def make_gamma_event(slug):
+    """Polymarket gamma /events reply with one "over $XM" market per threshold"""
+    markets = [
+        {
+            'question': f"Will the sale raise over ${t}M?",
+            'outcomePrices': json.dumps([str(round(max(0.01, 1 - t / 220), 3)), str(round(min(0.99, t / 220), 3))]),
+        }
+        for t in ODDS_THRESHOLDS
+    ]
+    return [{'slug': slug, 'markets': markets}]
+
+
+class StubRPC:
+    """Threaded local RPC stand-in; use as a context manager"""
+
+    def __init__(self, latency=0.02, signature_count=1000, balance=12_345_678.9, throttle=0.0, retry_after=None,
+                 fixture=None):
+        self.latency = latency
+        self.throttle = throttle
+        self.retry_after = retry_after
+        self.throttled = 0
+        if fixture is not None:
+            self.signatures = list(fixture['signatures'])
+            self.transactions = {s['signature']: tx for s, tx in zip(fixture['signatures'], fixture['transactions'])}
+        else:
+            self.signatures = make_signatures(signature_count)
+            self.transactions = None
+        self.balance = balance
+        self.requests = 0
+        self.added = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add_signatures(self, count):
+        """Prepend `count` newer signatures, as if new transactions landed"""
+        newer = []
+        for _ in range(count):
+            self.added += 1
+            newer.append({
+                'signature': f"stubnew{self.added:06d}",
+                'slot': 300000000 + self.added,
+                'err': None,
+                'blockTime': BASE_BLOCK_TIME + self.added * 7,
+            })
+        self.signatures = list(reversed(newer)) + self.signatures
+
+    def answer(self, call):
+        method = call.get('method')
+        params = call.get('params') or []
+        if method == 'getSignaturesForAddress':
+            options = params[1] if len(params) > 1 else {}
+            index = {s['signature']: i for i, s in enumerate(self.signatures)}
+            start = index[options['before']] + 1 if options.get('before') in index else 0
+            end = index[options['until']] if options.get('until') in index else len(self.signatures)
+            result = self.signatures[start:end][:options.get('limit', 1000)]
+        elif method == 'getTransaction':
+            if self.transactions is not None:
+                result = self.transactions.get(params[0])
+            else:
+                result = make_transaction(params[0])
+        elif method == 'getTokenAccountsByOwner':
+            result = {'value': [{'account': {'data': {'parsed': {'info': {
+                'tokenAmount': {'uiAmount': self.balance}
+            }}}}}]}
+        else:
+            return {'jsonrpc': '2.0', 'id': call.get('id'), 'error': {'code': -32601, 'message': 'Method not found'}}
+        return {'jsonrpc': '2.0', 'id': call.get('id'), 'result': result}
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True  # Headers and body are separate writes; avoid delayed-ACK stalls
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with stub._lock:
+                    stub.requests += 1
+                    throttled = random.random() < stub.throttle
+                    if throttled:
+                        stub.throttled += 1
+                time.sleep(stub.latency)
+                if throttled:
+                    self.send_response(429)
+                    if stub.retry_after is not None:
+                        self.send_header('Retry-After', str(stub.retry_after))
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                if isinstance(body, list):
+                    reply = [stub.answer(call) for call in body]
+                else:
+                    reply = stub.answer(body)
+                data = json.dumps(reply).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                path, _, query = self.path.partition('?')
+                if path != '/events':
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                with stub._lock:
+                    stub.requests += 1
+                time.sleep(stub.latency)
+                slug = dict(p.split('=', 1) for p in query.split('&') if '=' in p).get('slug', '')
+                data = json.dumps(make_gamma_event(slug)).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
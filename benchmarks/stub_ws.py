@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Local stub of the Solana RPC WebSocket for account_stream tests
+
+Speaks just enough RFC 6455 (handshake, text/close/ping frames) to answer
+accountSubscribe and push accountNotification messages with notify().
+drop() closes every open connection, as a node restarting would.
+"""
+
+import base64
+import hashlib
+import json
+import socket
+import struct
+import threading
+import time
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OP_TEXT = 0x1
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+
+def _recv_exact(conn, size):
+    data = b''
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("client went away")
+        data += chunk
+    return data
+
+
+def _read_frame(conn):
+    """(opcode, payload) of the next client frame (clients always mask)"""
+    head, length = _recv_exact(conn, 2)
+    opcode, masked, length = head & 0x0F, length & 0x80, length & 0x7F
+    if length == 126:
+        length, = struct.unpack('!H', _recv_exact(conn, 2))
+    elif length == 127:
+        length, = struct.unpack('!Q', _recv_exact(conn, 8))
+    mask = _recv_exact(conn, 4) if masked else b'\0\0\0\0'
+    payload = _recv_exact(conn, length)
+    return opcode, bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+
+def _frame(opcode, payload):
+    """An unmasked server frame"""
+    if len(payload) < 126:
+        header = struct.pack('!BB', 0x80 | opcode, len(payload))
+    elif len(payload) < 1 << 16:
+        header = struct.pack('!BBH', 0x80 | opcode, 126, len(payload))
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, 127, len(payload))
+    return header + payload
+
+
+class StubAccountSocket:
+    """Threaded local accountSubscribe stand-in; use as a context manager"""
+
+    def __init__(self):
+        self.subscriptions = []  # accountSubscribe params, one per subscribe
+        self.connected_at = []   # time.monotonic() of every accepted handshake
+        self._clients = []
+        self._lock = threading.Lock()
+        self._subscribed = threading.Condition(self._lock)
+        self._server = None
+        self._running = False
+
+    @property
+    def url(self):
+        host, port = self._server.getsockname()[:2]
+        return f"ws://{host}:{port}"
+
+    def wait_for_subscriptions(self, count, timeout=5):
+        """Block until `count` subscriptions arrived in total; returns whether they did"""
+        with self._subscribed:
+            return self._subscribed.wait_for(lambda: len(self.subscriptions) >= count, timeout)
+
+    def notify(self, balance, slot):
+        """Push an accountNotification with `balance` to every subscribed client"""
+        message = {
+            "jsonrpc": "2.0",
+            "method": "accountNotification",
+            "params": {"subscription": 1, "result": {
+                "context": {"slot": slot},
+                "value": {"data": {"parsed": {"info": {"tokenAmount": {"uiAmount": balance}}}}},
+            }},
+        }
+        self._broadcast(_frame(OP_TEXT, json.dumps(message).encode()))
+
+    def drop(self):
+        """Close every connection without a close handshake"""
+        with self._lock:
+            clients, self._clients = self._clients, []
+        for conn in clients:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            conn.close()
+
+    def _broadcast(self, data):
+        with self._lock:
+            clients = list(self._clients)
+        for conn in clients:
+            try:
+                conn.sendall(data)
+            except OSError:
+                pass
+
+    def _handshake(self, conn):
+        request = b''
+        while b'\r\n\r\n' not in request:
+            chunk = conn.recv(4096)
+            if not chunk:
+                raise ConnectionError("client went away")
+            request += chunk
+        headers = dict(
+            line.split(': ', 1) for line in request.decode().split('\r\n')[1:] if ': ' in line
+        )
+        key = {k.lower(): v for k, v in headers.items()}['sec-websocket-key'].strip()
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        conn.sendall((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode())
+
+    def _serve(self, conn):
+        try:
+            self._handshake(conn)
+            with self._lock:
+                self._clients.append(conn)
+                self.connected_at.append(time.monotonic())
+            while True:
+                opcode, payload = _read_frame(conn)
+                if opcode == OP_CLOSE:
+                    conn.sendall(_frame(OP_CLOSE, payload[:2]))
+                    return
+                if opcode == OP_PING:
+                    conn.sendall(_frame(OP_PONG, payload))
+                elif opcode == OP_TEXT:
+                    call = json.loads(payload)
+                    if call.get('method') == 'accountSubscribe':
+                        with self._subscribed:
+                            self.subscriptions.append(call['params'])
+                            self._subscribed.notify_all()
+                        reply = {"jsonrpc": "2.0", "result": 1, "id": call.get('id')}
+                        conn.sendall(_frame(OP_TEXT, json.dumps(reply).encode()))
+        except (OSError, ConnectionError, ValueError):
+            pass
+        finally:
+            with self._lock:
+                if conn in self._clients:
+                    self._clients.remove(conn)
+            conn.close()
+
+    def _accept(self):
+        while self._running:
+            try:
+                conn, _ = self._server.accept()
+            except socket.timeout:
+                continue  # Recheck _running, so stop() is noticed
+            except OSError:
+                return
+            conn.settimeout(None)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def start(self):
+        self._server = socket.create_server(('127.0.0.1', 0))
+        self._server.settimeout(0.2)
+        self._running = True
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self._server.close()
+        self.drop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: the tracker's hot paths, with a baseline regression check
+
+Runs every benchmark against the local stub RPC (which also stands in for
+the Polymarket gamma API) and recorded fixtures, writes the timings as JSON
+and compares each median against a stored baseline:
+
+    python3 benchmarks/suite.py --save-baseline    # Record the baseline
+    python3 benchmarks/suite.py                    # Exits 1 on a regression
+
+Baselines are machine-specific; record one on the machine that compares.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['BALANCE_HISTORY_DIR'] = ''  # Keep benchmark histories out of ~/ranger-tracker
+
+import app
+import solana_rpc
+import whale_tracker
+from fixtures import load_transactions
+from stub_rpc import StubRPC, WALLET
+from tracker_state import BalanceHistory
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, 'results.json')
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+DEFAULT_THRESHOLD = 0.25     # Fractional slowdown of the median that counts as a regression
+BALANCE = 25_000_000
+HOURS_REMAINING = 3.0
+
+
+def full_history(points=app.balance_history.points.maxlen, now=None):
+    """A BalanceHistory filled to capacity with one sample every 10 seconds up to `now`"""
+    now = now or datetime.utcnow()
+    history = BalanceHistory()
+    rng = random.Random(3)
+    balance = 10_000_000.0
+    for i in range(points):
+        balance += rng.uniform(0, 5000)
+        history.record(balance, now - timedelta(seconds=10 * (points - 1 - i)))
+    return history
+
+
+def bench_api_data_request(stub):
+    """GET /api/data through Flask, served from the collector's snapshot"""
+    client = app.app.test_client()
+    end_time = (datetime.utcnow() + timedelta(hours=HOURS_REMAINING)).isoformat()
+    url = f'/api/data?wallet={WALLET}&endTime={end_time}'
+    headers = {'Accept-Encoding': 'gzip'}
+    client.get(url, headers=headers)  # Starts the collector and waits for its first snapshot
+    return lambda: client.get(url, headers=headers)
+
+
+def bench_api_data_collect(stub):
+    """One collector tick: upstream fetch from the stubs, build_snapshot and serialization"""
+    state = app.trackers.get(WALLET, datetime.utcnow() + timedelta(hours=HOURS_REMAINING), app.DEFAULT_POLYMARKET_SLUG)
+    collector = app.SnapshotCollector(state)
+
+    def tick():
+        # A new balance every tick, so the unchanged-content shortcut never
+        # skips the publish and the full path is timed
+        stub.balance += 1
+        return collector.collect()
+    return tick
+
+
+def bench_calculate_velocity(stub):
+    """calculate_velocity over a full balance history"""
+    now = datetime.utcnow()
+    history = full_history(now=now)
+    return lambda: app.calculate_velocity(30, history, now)
+
+
+def bench_projections_confidence(stub):
+    """calculate_projections plus calculate_confidence, as without numpy"""
+    def run():
+        projections = app.calculate_projections(BALANCE, HOURS_REMAINING)
+        app.calculate_confidence(projections, BALANCE, HOURS_REMAINING)
+    return run
+
+
+def bench_projections_confidence_engine(stub):
+    """The same through ProjectionEngine.point, as build_snapshot runs it with numpy"""
+    if app.engine is None:
+        return None
+
+    def run():
+        projections, _, historical = app.engine.point(BALANCE, HOURS_REMAINING)
+        app.calculate_confidence(projections, BALANCE, HOURS_REMAINING, historical)
+    return run
+
+
+def bench_parse_usdc_deposits(stub):
+    """whale_tracker.parse_usdc_deposits over the recorded transaction fixture, batched"""
+    count = len(stub.signatures)
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            whale_tracker.parse_usdc_deposits(WALLET, max_txs=count, batch_size=whale_tracker.BATCH_SIZE)
+    return run
+
+
+def bench_analyze_whale_activity(stub):
+    """whale_tracker.analyze_whale_activity on 100k synthetic deposits"""
+    rng = random.Random(5)
+    deposits = [
+        {
+            'amount': round(rng.lognormvariate(6.5, 1.8), 2),
+            'sender': f"Sender{rng.randrange(20000):05d}",
+            'timestamp': 1768046400 - i,
+            'signature': f"sig{i:06d}",
+            'slot': 300000000 - i,
+        }
+        for i in range(100_000)
+    ]
+    return lambda: whale_tracker.analyze_whale_activity(deposits)
+
+
+# (name, setup, samples); setup returns the callable to time, or None to skip
+BENCHMARKS = [
+    ('api_data_request', bench_api_data_request, 50),
+    ('api_data_collect', bench_api_data_collect, 20),
+    ('calculate_velocity_1000', bench_calculate_velocity, 50),
+    ('projections_confidence', bench_projections_confidence, 50),
+    ('projections_confidence_engine', bench_projections_confidence_engine, 50),
+    ('parse_usdc_deposits', bench_parse_usdc_deposits, 10),
+    ('analyze_whale_activity_100k', bench_analyze_whale_activity, 10),
+]
+
+
+def measure(fn, iterations, min_sample_ms=5.0):
+    """
+    Per-call wall time statistics in milliseconds. Like timeit, each of the
+    `iterations` samples times enough back-to-back calls to last at least
+    `min_sample_ms`, so sub-microsecond paths are not lost in timer noise.
+    """
+    start = time.perf_counter()
+    fn()  # Warm-up, and a first estimate of the call time
+    first_ms = (time.perf_counter() - start) * 1000
+    number = max(1, int(min_sample_ms / first_ms)) if first_ms > 0 else 1000
+
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) * 1000 / number)
+    samples.sort()
+    return {
+        'iterations': iterations,
+        'calls_per_sample': number,
+        'median_ms': round(statistics.median(samples), 5),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 5),
+        'min_ms': round(samples[0], 5),
+        'mean_ms': round(statistics.fmean(samples), 5),
+    }
+
+
+def run_suite(only=None, scale=1.0, latency=0.0):
+    """Run the benchmarks (all, or the names in `only`) and return the results document"""
+    fixture = load_transactions()
+    results = {}
+    with StubRPC(latency=latency, fixture=fixture) as stub:
+        solana_rpc.configure(url=stub.url, rate_limits={})
+        app.POLYMARKET_GAMMA_URL = stub.url
+        try:
+            for name, setup, iterations in BENCHMARKS:
+                if only and name not in only:
+                    continue
+                fn = setup(stub)
+                if fn is None:
+                    print(f"{name:<32} skipped")
+                    continue
+                results[name] = measure(fn, max(1, int(iterations * scale)))
+                print(f"{name:<32} {results[name]['median_ms']:>10.4f} {results[name]['p95_ms']:>10.4f}")
+        finally:
+            for state in app.trackers.all():
+                state.close()
+    return {
+        'created_at': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'fixture': fixture.get('source', 'recorded'),
+        'results': results,
+    }
+
+
+def compare(results, baseline):
+    """[(name, baseline_ms, current_ms, change)] for every benchmark in both; change is fractional"""
+    rows = []
+    for name, current in results['results'].items():
+        before = baseline.get('results', {}).get(name)
+        if before and before['median_ms'] > 0:
+            change = current['median_ms'] / before['median_ms'] - 1
+            rows.append((name, before['median_ms'], current['median_ms'], change))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--only', nargs='*', help='benchmarks to run (default: all)')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiply sample counts')
+    parser.add_argument('--latency', type=float, default=0.0, help='stub round trip in seconds')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='results JSON file')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON file')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='median slowdown counted as a regression (0.25 = 25%%)')
+    parser.add_argument('--save-baseline', action='store_true', help='write the results as the new baseline')
+    args = parser.parse_args()
+
+    print(f"{'Benchmark':<32} {'median ms':>10} {'p95 ms':>10}")
+    print("-" * 54)
+    results = run_suite(args.only, args.scale, args.latency)
+    print("-" * 54)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; record one with --save-baseline")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = 0
+    print(f"{'Benchmark':<32} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, before, current, change in compare(results, baseline):
+        flag = ''
+        if change > args.threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        print(f"{name:<32} {before:>10.4f} {current:>10.4f} {change * 100:>+7.1f}%{flag}")
+    if regressions:
+        print(f"{regressions} benchmark(s) slower than baseline by more than {args.threshold * 100:.0f}%")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Calibrate - Fits surge exponents and pattern weights to recorded sale timelines
+"""
+
+import argparse
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import count, product
+
+import numpy as np
+
+import app
+import backtest
+import model_params
+from history_store import to_unix
+from projection_engine import SURGE_EXPONENTS, SURGE_START_HOURS
+
+EXPONENT_GRID = '1.0:3.5:0.25'
+DECAY_GRID = '0.3:1.0:0.05'
+DEFAULT_STEP_MINUTES = 10
+
+# Curve evaluations per ((run, timeline), exponent), kept for the life of a
+# worker. The run id keeps a forked worker from serving another run's entries.
+_curve_cache = {}
+_runs = count()
+
+
+def parse_grid(spec):
+    """'start:stop:step' (inclusive) or a comma separated list"""
+    if ':' not in spec:
+        return [float(v) for v in spec.split(',')]
+    start, stop, step = (float(v) for v in spec.split(':'))
+    return [round(start + i * step, 6) for i in range(int(round((stop - start) / step)) + 1)]
+
+
+def recency_weights(names, orders, decay):
+    """Weights decaying by `decay` per sale going back from the newest, summing to 1"""
+    newest = max(orders)
+    raw = [decay ** (newest - order) for order in orders]
+    total = sum(raw)
+    return {name: w / total for name, w in zip(names, raw)}
+
+
+def prepare(timelines, patterns, step_minutes, run=0):
+    """
+    Evaluation points of each timeline (balance and hours remaining every
+    `step_minutes`, as the dashboard would have seen them), plus the mask
+    that leaves the sale itself out of its reference patterns. Entries are
+    keyed by (run, timeline index) for the curve cache.
+    """
+    names = sorted(patterns, key=lambda name: patterns[name]['order'])
+    prepared = []
+    for index, timeline in enumerate(timelines):
+        points = sorted(timeline['points'])
+        times = [p[0] for p in points]
+        end = to_unix(datetime.fromisoformat(timeline['sale_end_time']))
+        balances, hours = [], []
+        t = points[0][0] + step_minutes * 60
+        while t < min(points[-1][0] + 1, end):
+            balance = points[bisect_right(times, t) - 1][1]
+            if balance > 0:
+                balances.append(balance)
+                hours.append((end - t) / 3600)
+            t += step_minutes * 60
+        if balances:
+            prepared.append({
+                'key': (run, index),
+                'name': timeline['name'],
+                'final': float(timeline['final']),
+                'balance': np.array(balances),
+                'hours': np.array(hours),
+                'include': np.array([name != timeline['name'] for name in names]),
+            })
+    return names, prepared
+
+
+def pattern_arrays(patterns, names, bounds):
+    pct = np.array([patterns[name]['pct_at_5_5h'] for name in names], dtype=float)
+    bucket = np.array([
+        next(i for i, bound in enumerate(bounds) if bound is None or p < bound) for p in pct
+    ])
+    orders = [patterns[name]['order'] for name in names]
+    return pct, bucket, orders
+
+
+def projected_by_exponent(entry, pct_at_5_5h, exponent):
+    """Per-pattern projections (patterns x points) with every pattern on `exponent`, cached"""
+    key = (entry['key'], exponent)
+    cached = _curve_cache.get(key)
+    if cached is None:
+        ratio = np.clip((SURGE_START_HOURS - entry['hours']) / SURGE_START_HOURS, 0, 1)
+        p = pct_at_5_5h[:, None]
+        pct = p + (100 - p) * ratio[None, :] ** exponent
+        cached = _curve_cache[key] = entry['balance'][None, :] * 100 / pct
+    return cached
+
+
+def errors(prepared, pct_at_5_5h, bucket, exponents, weight_matrix):
+    """
+    Mean absolute % error of the weighted historical projection for each
+    row of `weight_matrix` (weight sets x patterns), averaged over sales.
+    """
+    totals = np.zeros(len(weight_matrix))
+    rows = np.arange(len(bucket))
+    for entry in prepared:
+        per_exponent = [projected_by_exponent(entry, pct_at_5_5h, e) for e in exponents]
+        projected = np.stack([per_exponent[b][i] for i, b in zip(rows, bucket)])
+
+        weights = weight_matrix * entry['include'][None, :]
+        sums = weights.sum(axis=1, keepdims=True)
+        weights = weights / np.where(sums > 0, sums, 1)
+        weighted = weights @ projected
+        totals += (np.abs(weighted - entry['final']) / entry['final']).mean(axis=1) * 100
+    return totals / len(prepared)
+
+
+def search_chunk(job):
+    """Best (error, exponents, decay) with the first exponent fixed to `first`"""
+    prepared, pct_at_5_5h, bucket, orders, names, first, exponent_grid, decays = job
+    weight_matrix = np.array([
+        [recency_weights(names, orders, d)[name] for name in names] for d in decays
+    ])
+    best = (float('inf'), None, None)
+    for rest in product(exponent_grid, repeat=int(bucket.max())):
+        exponents = (first,) + rest
+        errs = errors(prepared, pct_at_5_5h, bucket, exponents, weight_matrix)
+        i = int(np.argmin(errs))
+        if errs[i] < best[0]:
+            best = (float(errs[i]), exponents, decays[i])
+    return best
+
+
+def calibrate(timelines, patterns=None, weights=None, exponent_grid=None, decays=None,
+              step_minutes=DEFAULT_STEP_MINUTES, workers=None):
+    """
+    Grid-search surge exponents (one per SURGE_EXPONENTS step) and the
+    recency decay of the pattern weights, minimizing the mean absolute %
+    error of the weighted historical projection over all timelines.
+    Returns the params dict for model_params.save_params.
+    """
+    patterns = patterns or backtest.BASE_PATTERNS
+    weights = weights or backtest.BASE_WEIGHTS
+    exponent_grid = exponent_grid or parse_grid(EXPONENT_GRID)
+    decays = decays or parse_grid(DECAY_GRID)
+
+    bounds = [bound for bound, _ in SURGE_EXPONENTS]
+    _curve_cache.clear()
+    names, prepared = prepare(timelines, patterns, step_minutes, run=next(_runs))
+    if not prepared:
+        raise ValueError("no timeline has evaluation points")
+    pct_at_5_5h, bucket, orders = pattern_arrays(patterns, names, bounds)
+
+    # Only steps some pattern falls in are fitted; the rest keep their exponent
+    used = sorted(set(bucket.tolist()))
+    bucket = np.array([used.index(b) for b in bucket])
+    current = [SURGE_EXPONENTS[b][1] for b in used]
+    baseline = float(errors(
+        prepared, pct_at_5_5h, bucket, current, np.array([[weights.get(n, 0) for n in names]])
+    )[0])
+
+    jobs = [(prepared, pct_at_5_5h, bucket, orders, names, first, exponent_grid, decays) for first in exponent_grid]
+    if workers == 0:
+        results = [search_chunk(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(search_chunk, jobs))
+    error, exponents, decay = min(results, key=lambda r: r[0])
+
+    fitted = dict(zip(used, exponents))
+    return {
+        'surge_exponents': [[bound, fitted.get(i, exponent)] for i, (bound, exponent) in enumerate(SURGE_EXPONENTS)],
+        'pattern_weights': {name: round(w, 4) for name, w in recency_weights(names, orders, decay).items()},
+        'weight_decay': decay,
+        'objective': {'metric': 'mean_abs_pct_error', 'value': round(error, 3), 'baseline': round(baseline, 3)},
+        'calibrated_on': [entry['name'] for entry in prepared],
+        'step_minutes': step_minutes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('timelines', nargs='*', help='timeline files, as accepted by backtest.py')
+    parser.add_argument('--final', type=float, help='final raise, for timelines recorded before the sale ended')
+    parser.add_argument('--synthetic', action='store_true', help='fit against synthetic timelines of the historical patterns')
+    parser.add_argument('--exponents', default=EXPONENT_GRID, help='surge exponent grid, start:stop:step or a list')
+    parser.add_argument('--decays', default=DECAY_GRID, help='weight decay grid, start:stop:step or a list')
+    parser.add_argument('--step', type=float, default=DEFAULT_STEP_MINUTES, help='minutes between evaluation points')
+    parser.add_argument('--workers', type=int, default=None, help='process pool size (0 runs in-process)')
+    parser.add_argument('--output', default=model_params.DEFAULT_PARAMS_PATH, help='params file to write')
+    parser.add_argument('--dry-run', action='store_true', help='print the fit without writing it')
+    args = parser.parse_args()
+
+    timelines = [backtest.load_timeline(path, args.final) for path in args.timelines]
+    if args.synthetic:
+        timelines.extend(backtest.synthetic_timelines())
+    if not timelines:
+        parser.error('no timelines given (pass files or --synthetic)')
+
+    params = calibrate(timelines, exponent_grid=parse_grid(args.exponents), decays=parse_grid(args.decays),
+                       step_minutes=args.step, workers=args.workers)
+
+    objective = params['objective']
+    print(f"Calibrated on {len(params['calibrated_on'])} sales: {', '.join(params['calibrated_on'])}")
+    print(f"Mean absolute error: {objective['baseline']:.2f}% -> {objective['value']:.2f}%")
+    print("Surge exponents:")
+    for bound, exponent in params['surge_exponents']:
+        label = f"pct_at_5_5h < {bound}" if bound is not None else "otherwise"
+        print(f"  {label:<20} {exponent:.2f}")
+    print(f"Pattern weights (decay {params['weight_decay']:.2f}):")
+    for name, weight in sorted(params['pattern_weights'].items(), key=lambda kv: -kv[1]):
+        print(f"  {name:<12} {weight:.3f} (was {app.PATTERN_WEIGHTS.get(name, 0):.3f})")
+
+    if args.dry_run:
+        return
+    saved = model_params.save_params(params, args.output)
+    print(f"Wrote {args.output} (version {saved['version']}); restart the dashboard to load it")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Persistent local store of parsed deposits, keyed by transaction signature
+"""
+
+import os
+import sqlite3
+
+DEFAULT_DB_PATH = os.path.expanduser('~/ranger-tracker/whale_deposits.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    wallet      TEXT NOT NULL,
+    signature   TEXT NOT NULL,
+    slot        INTEGER,
+    block_time  INTEGER,
+    PRIMARY KEY (wallet, signature)
+);
+CREATE TABLE IF NOT EXISTS deposits (
+    id          INTEGER PRIMARY KEY,
+    wallet      TEXT NOT NULL,
+    signature   TEXT NOT NULL,
+    slot        INTEGER,
+    block_time  INTEGER,
+    sender      TEXT,
+    amount      REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_deposits_signature ON deposits (wallet, signature);
+CREATE INDEX IF NOT EXISTS idx_deposits_time ON deposits (wallet, block_time);
+CREATE INDEX IF NOT EXISTS idx_deposits_sender ON deposits (wallet, sender);
+"""
+
+
+class DepositStore:
+    """
+    SQLite store of every parsed transaction and the deposits found in it.
+
+    Finalized transactions never change, so once a signature is stored it is
+    never fetched again. Transactions without a deposit are recorded too.
+    Each save commits immediately, so an interrupted run resumes where it
+    stopped.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def known_signatures(self, wallet, signatures):
+        """Subset of `signatures` already parsed for this wallet"""
+        known = set()
+        signatures = list(signatures)
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(signatures), 500):
+            chunk = signatures[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT signature FROM transactions WHERE wallet = ? AND signature IN ({placeholders})",
+                [wallet, *chunk]
+            )
+            known.update(row[0] for row in rows)
+        return known
+
+    def save(self, wallet, parsed):
+        """
+        Store parsed transactions in one commit.
+
+        `parsed` is a list of (sig_info, deposits) pairs, where sig_info is a
+        getSignaturesForAddress entry and deposits come from extract_deposits.
+        """
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO transactions (wallet, signature, slot, block_time) VALUES (?, ?, ?, ?)",
+                [(wallet, s['signature'], s.get('slot'), s.get('blockTime')) for s, _ in parsed]
+            )
+            # Replace rather than append so a re-parsed signature never duplicates
+            self.conn.executemany(
+                "DELETE FROM deposits WHERE wallet = ? AND signature = ?",
+                [(wallet, s['signature']) for s, deposits in parsed if deposits]
+            )
+            self.conn.executemany(
+                "INSERT INTO deposits (wallet, signature, slot, block_time, sender, amount) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (wallet, d['signature'], d.get('slot'), d['timestamp'], d['sender'], d['amount'])
+                    for _, deposits in parsed for d in deposits
+                ]
+            )
+
+    def deposits(self, wallet, since=None):
+        """All stored deposits for a wallet, newest first"""
+        query = "SELECT signature, slot, block_time, sender, amount FROM deposits WHERE wallet = ?"
+        params = [wallet]
+        if since is not None:
+            query += " AND block_time >= ?"
+            params.append(since)
+        query += " ORDER BY block_time DESC, id"
+        return [
+            {'amount': amount, 'sender': sender, 'timestamp': block_time, 'signature': signature, 'slot': slot}
+            for signature, slot, block_time, sender, amount in self.conn.execute(query, params)
+        ]
+
+    def transaction_count(self, wallet):
+        return self.conn.execute("SELECT COUNT(*) FROM transactions WHERE wallet = ?", [wallet]).fetchone()[0]
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Per-sale inflow curves of past raises, written by backfill.py
+"""
+
+import io
+import json
+import os
+
+try:
+    import numpy as np
+except ImportError:  # Curves are only used by the numpy projection engine
+    np = None
+
+DEFAULT_CURVES_PATH = os.environ.get(
+    'HISTORICAL_CURVES_PATH', os.path.expanduser('~/ranger-tracker/historical_curves.npz')
+)
+DEFAULT_HORIZON_HOURS = 120  # Minutes before the end covered by a curve, in hours
+
+
+def build_curve(deposits, sale_end, horizon_minutes):
+    """
+    % of the final raise reached at each whole minute before `sale_end`
+    (index 0 is the end, index m is m minutes before it), from
+    (unix timestamp, amount) deposits. Returns (curve, final) or None
+    when there are no deposits before the end.
+    """
+    deposits = np.array(sorted((ts, amount) for ts, amount in deposits if ts <= sale_end), dtype=float)
+    if not len(deposits) or deposits[:, 1].sum() <= 0:
+        return None
+    cumulative = np.cumsum(deposits[:, 1])
+    total = float(cumulative[-1])
+
+    cutoffs = sale_end - np.arange(horizon_minutes + 1) * 60.0
+    index = np.searchsorted(deposits[:, 0], cutoffs, side='right')
+    curve = np.where(index > 0, cumulative[np.maximum(index - 1, 0)] / total * 100, 0.0)
+    return curve.astype(np.float32), total
+
+
+def load_curves(path=None):
+    """{name: {'pct', 'final', 'wallet', 'sale_end_time'}}, or None without a (valid) curves file"""
+    path = path or DEFAULT_CURVES_PATH
+    if np is None or not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            return {name: dict(info, pct=data[f'curve_{name}']) for name, info in meta.items()}
+    except Exception as e:
+        print(f"Ignoring historical curves {path}: {e}")
+        return None
+
+
+def save_curves(curves, path=None):
+    """Merge `curves` into the curves file, so sales can be backfilled one at a time"""
+    path = path or DEFAULT_CURVES_PATH
+    merged = dict(load_curves(path) or {})
+    merged.update(curves)
+
+    meta = {name: {k: v for k, v in curve.items() if k != 'pct'} for name, curve in merged.items()}
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, meta=np.array(json.dumps(meta)),
+                        **{f'curve_{name}': np.asarray(curve['pct'], dtype=np.float32) for name, curve in merged.items()})
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(buffer.getvalue())
+    os.replace(tmp, path)  # The dashboard never loads a half-written file
+    return merged
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Append-only, memory-mapped balance history file shared across processes
+"""
+
+import mmap
+import os
+import struct
+from datetime import datetime, timedelta
+
+try:
+    import fcntl
+except ImportError:  # Windows: single writer only
+    fcntl = None
+
+MAGIC = b'RNGHIST1'
+# magic, format version, record size, capacity (records), records ever written
+HEADER = struct.Struct('<8sIIQQ')
+HEADER_SIZE = 64            # Header padded so records stay 8-byte aligned
+COUNT_OFFSET = 24
+# timestamp (unix seconds), balance, slot (-1 when unknown); all doubles so the
+# record region can be viewed as a flat float64 array without copying
+RECORD = struct.Struct('<ddd')
+FIELDS = 3
+DEFAULT_CAPACITY = 86400    # One day of one-second samples, ~2 MB
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def to_unix(timestamp):
+    return (timestamp - EPOCH).total_seconds()
+
+
+def from_unix(seconds):
+    return EPOCH + timedelta(seconds=seconds)
+
+
+def claim_writer(path):
+    """
+    Become the one process that writes history file `path`: an exclusive
+    flock on <path>.lock, held until the returned file is closed. None when
+    another process holds it.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    lock = open(f'{path}.lock', 'a')
+    if fcntl is None:  # Windows: single writer only
+        return lock
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock.close()
+        return None
+    return lock
+
+
+class HistoryFile:
+    """
+    Fixed-width ring of (timestamp, balance, slot) records in one file.
+
+    Writers append under an exclusive flock and publish a record by bumping
+    the header count after it is written, so readers in any process can map
+    the same file and read up to `count` without locking. Once `capacity`
+    records are written the oldest are overwritten.
+    """
+
+    def __init__(self, path, capacity=DEFAULT_CAPACITY, readonly=False):
+        self.path = path
+        self.readonly = readonly
+        if not readonly:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._create(capacity)
+
+        self._file = open(path, 'rb' if readonly else 'r+b')
+        access = mmap.ACCESS_READ if readonly else mmap.ACCESS_WRITE
+        self._map = mmap.mmap(self._file.fileno(), 0, access=access)
+
+        magic, version, record_size, self.capacity, _ = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or record_size != RECORD.size:
+            raise ValueError(f"{path} is not a balance history file")
+
+    def _create(self, capacity):
+        """Preallocate the file once; losing a race to another process is fine"""
+        try:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            return
+        with os.fdopen(fd, 'r+b') as f:
+            f.truncate(HEADER_SIZE + capacity * RECORD.size)
+            f.write(HEADER.pack(MAGIC, 1, RECORD.size, capacity, 0))
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    @property
+    def count(self):
+        """Records ever appended (the newest is at index count - 1)"""
+        return struct.unpack_from('<Q', self._map, COUNT_OFFSET)[0]
+
+    def append(self, timestamp, balance, slot=None):
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        try:
+            count = self.count
+            offset = HEADER_SIZE + (count % self.capacity) * RECORD.size
+            RECORD.pack_into(self._map, offset, to_unix(timestamp), balance, -1 if slot is None else slot)
+            # Publish only after the record is in place
+            struct.pack_into('<Q', self._map, COUNT_OFFSET, count + 1)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+
+    def read(self, start, end=None):
+        """
+        Records with index in [start, end) as (datetime, balance, slot) tuples.
+
+        Indexes older than the ring still holds are skipped; one slot is kept
+        back so a concurrent writer wrapping around cannot tear a record.
+        """
+        end = self.count if end is None else end
+        start = max(start, end - self.capacity + 1, 0)
+        records = []
+        for index in range(start, end):
+            offset = HEADER_SIZE + (index % self.capacity) * RECORD.size
+            ts, balance, slot = RECORD.unpack_from(self._map, offset)
+            records.append((from_unix(ts), balance, None if slot < 0 else int(slot)))
+        return records
+
+    def view(self):
+        """
+        Zero-copy float64 view of the whole record ring (row i at [3i:3i+3]).
+
+        Rows are in ring order: index i of the history lives at row
+        i % capacity. The mapping cannot be closed while a view is alive.
+        """
+        return memoryview(self._map)[HEADER_SIZE:].cast('d')
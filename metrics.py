@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+In-process counters, gauges and histograms in the Prometheus text format
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Seconds; covers a cached /api/data hit (sub-ms) up to an RPC call near its timeout
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+REGISTRY = []
+_scrape_hooks = []
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _label_text(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """A named family of series, one per combination of label values"""
+    kind = None
+
+    def __init__(self, name, help, labels=(), registry=REGISTRY):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._series = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.append(self)
+
+    def _key(self, labels):
+        return tuple(labels.get(name, '') for name in self.labels)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def remove(self, **labels):
+        """Drop the series with these label values, e.g. when what it measures goes away"""
+        with self._lock:
+            self._series.pop(self._key(labels), None)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            series = sorted(self._series.items())
+            lines.extend(self._render_series(series))
+        return lines
+
+    def _render_series(self, series):
+        return [f'{self.name}{_label_text(self.labels, key)} {_number(value)}' for key, value in series]
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._series[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    """Fixed buckets; observe() is a bisect and three additions under a lock"""
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS, registry=REGISTRY):
+        super().__init__(name, help, labels, registry)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [per-bucket counts (last is +Inf), sum, count]
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def _render_series(self, series):
+        lines = []
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = f'le="{_number(float(bound))}"'
+                lines.append(f'{self.name}_bucket{_label_text(self.labels, key, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_label_text(self.labels, key)} {_number(total)}')
+            lines.append(f'{self.name}_count{_label_text(self.labels, key)} {count}')
+        return lines
+
+
+def on_scrape(hook):
+    """Run `hook()` before each render, to refresh gauges that are sampled rather than pushed"""
+    _scrape_hooks.append(hook)
+    return hook
+
+
+def render(registry=REGISTRY):
+    """All metrics in the Prometheus text exposition format"""
+    for hook in _scrape_hooks:
+        try:
+            hook()
+        except Exception as e:
+            print(f"Metrics hook failed: {e}")
+    lines = []
+    for metric in registry:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+# Calls to services we depend on, shared by the RPC client and the app
+UPSTREAM_LATENCY = Histogram(
+    'ranger_upstream_request_duration_seconds', 'Upstream request latency',
+    ('upstream', 'method', 'endpoint')
+)
+UPSTREAM_ERRORS = Counter(
+    'ranger_upstream_errors_total', 'Failed upstream requests (transport, HTTP or error replies)',
+    ('upstream', 'method', 'endpoint')
+)
+
+
+@contextmanager
+def timed_upstream(upstream, method, endpoint=''):
+    """Time the block as one upstream request; an exception counts as an error and propagates"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        UPSTREAM_ERRORS.inc(upstream=upstream, method=method, endpoint=endpoint)
+        raise
+    finally:
+        UPSTREAM_LATENCY.observe(time.perf_counter() - start, upstream=upstream, method=method, endpoint=endpoint)
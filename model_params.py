@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Versioned model parameters file written by calibrate.py
+"""
+
+import json
+import os
+from datetime import datetime
+
+import projection_engine
+
+DEFAULT_PARAMS_PATH = os.environ.get(
+    'MODEL_PARAMS_PATH', os.path.expanduser('~/ranger-tracker/model_params.json')
+)
+FORMAT_VERSION = 1
+
+
+def load_params(path=None):
+    """The calibrated parameters, or None when there is no (valid) params file"""
+    path = path or DEFAULT_PARAMS_PATH
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            params = json.load(f)
+        if params.get('format') != FORMAT_VERSION:
+            raise ValueError(f"unsupported format {params.get('format')}")
+        return params
+    except Exception as e:
+        print(f"Ignoring model params {path}: {e}")
+        return None
+
+
+def save_params(params, path=None):
+    """
+    Write `params` as the next version: the previous file's version + 1. Each
+    version is also kept as <name>.v<version>.json so a bad calibration can
+    be rolled back by copying it over the current file.
+    """
+    path = path or DEFAULT_PARAMS_PATH
+    previous = load_params(path)
+    params = dict(params, format=FORMAT_VERSION,
+                  version=(previous or {}).get('version', 0) + 1,
+                  created_at=datetime.utcnow().isoformat())
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    stem, ext = os.path.splitext(path)
+    with open(f"{stem}.v{params['version']}{ext}", 'w') as f:
+        json.dump(params, f, indent=2)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(params, f, indent=2)
+    os.replace(tmp, path)  # Readers never see a half-written file
+    return params
+
+
+def surge_table(params):
+    return [(bound, exponent) for bound, exponent in params['surge_exponents']]
+
+
+def apply_params(params, pattern_weights):
+    """
+    Install calibrated surge exponents and update `pattern_weights` in place.
+    Weights for patterns the params do not mention are left alone.
+    """
+    projection_engine.SURGE_EXPONENTS[:] = surge_table(params)
+    pattern_weights.update({
+        name: weight for name, weight in params['pattern_weights'].items() if name in pattern_weights
+    })
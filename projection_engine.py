@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Vectorized projection engine over historical patterns, thresholds and time
+"""
+
+try:
+    import numpy as np
+except ImportError:  # The app falls back to the pure-Python projections
+    np = None
+
+SURGE_START_HOURS = 5.5
+THRESHOLDS = [15, 20, 30, 40, 50, 60, 70, 80, 90, 100, 120, 140, 160, 180, 200]  # $M
+
+# (pct_at_5_5h upper bound, exponent), first match wins; None bounds the last step.
+# Replaced at startup by calibrated values when a params file exists (see model_params)
+SURGE_EXPONENTS = [(15, 2.5), (25, 2.0), (None, 1.5)]
+
+MIN_CURVE_PCT = 0.5  # Floor for backfilled curves, which start at 0% before the first deposit
+
+
+def surge_exponent(pct_at_5_5h, table=None):
+    """Back-loading of the surge: lower early share means a later, steeper surge"""
+    for bound, exponent in table or SURGE_EXPONENTS:
+        if bound is None or pct_at_5_5h < bound:
+            return exponent
+    return (table or SURGE_EXPONENTS)[-1][1]
+
+
+class ProjectionEngine:
+    """
+    Array-backed version of calculate_projections, calculate_model_probabilities
+    and get_historical_at_time.
+
+    The per-pattern curve parameters are packed into arrays once, so a whole
+    (patterns x time points) grid is evaluated in one pass and the threshold
+    probabilities come out as a (thresholds x time points) matrix. Scalar
+    `hours` give the same dicts the pure-Python functions return.
+
+    Patterns with a backfilled curve in `curves` (see historical_curves)
+    are interpolated from it instead of the surge power curve.
+    """
+
+    def __init__(self, patterns, weights, thresholds=THRESHOLDS, surge_exponents=None, curves=None):
+        if np is None:
+            raise RuntimeError("numpy is required for ProjectionEngine")
+
+        self.patterns = patterns
+        self.names = sorted(patterns, key=lambda name: patterns[name]['order'])
+        rows = [patterns[name] for name in self.names]
+        self.pct_at_5_5h = np.array([p.get('pct_at_5_5h', 20) for p in rows], dtype=float)
+        self.exponent = np.array([surge_exponent(p, surge_exponents) for p in self.pct_at_5_5h])
+        self.final = np.array([p['final'] for p in rows], dtype=float)
+        self.weight = np.array([weights.get(name, 0) for name in self.names], dtype=float)
+        self.thresholds = np.array(thresholds, dtype=float)
+        self.threshold_keys = list(thresholds)
+        # (pattern row, curve) for patterns with a backfilled curve; index = minutes before the end
+        self.curves = [
+            (i, np.asarray(curves[name]['pct'], dtype=float))
+            for i, name in enumerate(self.names) if curves and name in curves
+        ]
+        # Every pattern is flat further out than this (the surge window or the longest curve)
+        self.horizon_hours = max([SURGE_START_HOURS] + [len(curve) / 60 for _, curve in self.curves])
+
+    def pct_at(self, hours):
+        """Estimated % of final per pattern: shape (patterns,) or (patterns, len(hours))"""
+        hours = np.asarray(hours, dtype=float)
+        ratio = np.clip((SURGE_START_HOURS - hours) / SURGE_START_HOURS, 0, 1)
+        p = self.pct_at_5_5h.reshape((-1,) + (1,) * hours.ndim)
+        e = self.exponent.reshape(p.shape)
+        pct = p + (100 - p) * ratio ** e
+        if self.curves:
+            minutes = np.maximum(hours * 60, 0)
+            for i, curve in self.curves:
+                pct[i] = np.maximum(np.interp(minutes, np.arange(len(curve)), curve), MIN_CURVE_PCT)
+        return pct
+
+    def projected(self, balance, hours):
+        """Projected final raise per pattern, same shape as pct_at; `balance` may vary along hours"""
+        pct = self.pct_at(hours)
+        return np.round(balance * np.where(pct > 0, 100 / pct, 1))
+
+    def probabilities(self, balance, hours):
+        """Weighted share of patterns projecting at least each threshold, in %"""
+        projected = self.projected(balance, hours)
+        hits = projected[None] >= self.thresholds.reshape((-1,) + (1,) * projected.ndim) * 1_000_000
+        return np.tensordot(hits, self.weight, axes=([1], [0])) * 100
+
+    def point(self, balance, hours_remaining):
+        """(projections, model_probabilities, historical_at) from one curve evaluation"""
+        pct = self.pct_at(hours_remaining)
+        mult = np.where(pct > 0, 100 / pct, 1)
+        hits = np.round(balance * mult)[None] >= self.thresholds[:, None] * 1_000_000
+        probs = hits @ self.weight * 100
+        return (
+            self._projection_rows(balance, pct, mult),
+            {t: round(float(p), 1) for t, p in zip(self.threshold_keys, probs)},
+            self._historical_rows(pct),
+        )
+
+    def projections(self, balance, hours_remaining):
+        """calculate_projections(balance, hours_remaining)"""
+        pct = self.pct_at(hours_remaining)
+        return self._projection_rows(balance, pct, np.where(pct > 0, 100 / pct, 1))
+
+    def _projection_rows(self, balance, pct, mult):
+        result = []
+        for i, name in enumerate(self.names):
+            data = self.patterns[name]
+            result.append({
+                'name': name,
+                'multiplier': round(float(mult[i]), 2),
+                'projected': round(float(balance * mult[i]), 0),
+                'weight': float(self.weight[i]),
+                'sale_date': data.get('sale_date', ''),
+                'order': data.get('order', 0),
+                'final_raised': data['final'],
+                'pct_at_5_5h': data.get('pct_at_5_5h', 20),
+                'estimated_pct_now': round(float(pct[i]), 1)
+            })
+        return sorted(result, key=lambda x: x['projected'])
+
+    def model_probabilities(self, balance, hours_remaining):
+        """calculate_model_probabilities for the projections at one time point"""
+        probs = self.probabilities(balance, hours_remaining)
+        return {t: round(float(p), 1) for t, p in zip(self.threshold_keys, probs)}
+
+    def historical_at(self, hours_remaining):
+        """get_historical_at_time(hours_remaining)"""
+        return self._historical_rows(self.pct_at(hours_remaining))
+
+    def _historical_rows(self, pct):
+        amounts = self.final * pct / 100
+        return [
+            {
+                'name': name,
+                'amount': round(float(amounts[i]), 0),
+                'final': self.patterns[name]['final'],
+                'pct_of_final': round(float(pct[i]), 1),
+                'sale_date': self.patterns[name]['sale_date'],
+                'order': self.patterns[name]['order']
+            }
+            for i, name in enumerate(self.names)
+        ]
+
+    def forward_curves(self, balance, hours_remaining, step_minutes=5, max_points=None):
+        """
+        Expected balance path from now to the end of the sale under each
+        pattern, plus the weighted path and the threshold probabilities a
+        viewer would see at each point if the balance followed that path.
+
+        The paths are flat until `horizon_hours` before the end, so the grid
+        starts there at the latest. Raises ValueError when it would have
+        more than `max_points` points.
+        """
+        start = min(hours_remaining, self.horizon_hours)
+        points = int(np.ceil(start * 60 / step_minutes)) + 1 if start > 0 else 1
+        if max_points is not None and points > max_points:
+            raise ValueError(f"{points} curve points at a {step_minutes} minute step; the limit is {max_points}")
+        grid = np.append(np.arange(start, 0, -step_minutes / 60), 0.0)
+
+        pct_now = self.pct_at(hours_remaining)
+        paths = balance * self.pct_at(grid) / pct_now[:, None]
+        total_weight = self.weight.sum()
+        weighted = self.weight @ paths / total_weight if total_weight else paths.mean(axis=0)
+        probs = self.probabilities(weighted, grid)
+
+        return {
+            'hours_remaining': np.round(grid, 4).tolist(),
+            'patterns': {name: np.round(paths[i]).tolist() for i, name in enumerate(self.names)},
+            'weighted': np.round(weighted).tolist(),
+            'probabilities': {t: np.round(probs[k], 1).tolist() for k, t in enumerate(self.threshold_keys)},
+        }
@@ -5,10 +5,12 @@ Automatically analyzes raise progress and compares to historical MetaDAO raises
 """
 
 import json
-import subprocess
 import os
 from datetime import datetime, timedelta
 from collections import defaultdict
+import model_params
+import solana_rpc
+from projection_engine import SURGE_START_HOURS, surge_exponent
 
 # Configuration
 RANGER_WALLET = "9ApaAe39Z8GEXfqm7F7HL545N4J4tN7RhF8FhS88pRNp"
@@ -29,13 +31,30 @@ HISTORICAL_PATTERNS = {
     'Paystream': {'at_5_5h': 1319085, 'final': 6149247, 'pct_at_5_5h': 21.5},
 }
 
+# Probability weight of each pattern
+PATTERN_WEIGHTS = {
+    'Solomon': 0.30,  # Closest $ match
+    'Loyal': 0.25,
+    'Avici': 0.15,
+    'zkSOL': 0.15,
+    'Paystream': 0.10,
+    'Umbra': 0.05,
+}
+
+# Calibrated surge exponents and weights (calibrate.py) replace the defaults above
+model_params_data = model_params.load_params()
+if model_params_data:
+    model_params.apply_params(model_params_data, PATTERN_WEIGHTS)
+
 def get_ranger_balance():
     """Fetch current USDC balance from Solana RPC"""
-    cmd = f'''curl -s 'https://api.mainnet-beta.solana.com' -X POST -H "Content-Type: application/json" -d '{{"jsonrpc":"2.0","id":1,"method":"getTokenAccountsByOwner","params":["{RANGER_WALLET}",{{"mint":"{USDC_MINT}"}},{{"encoding":"jsonParsed"}}]}}'  '''
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
     try:
-        data = json.loads(result.stdout)
-        accounts = data.get('result', {}).get('value', [])
+        result = solana_rpc.rpc_call(
+            "getTokenAccountsByOwner",
+            [RANGER_WALLET, {"mint": USDC_MINT}, {"encoding": "jsonParsed"}],
+            timeout=10
+        )
+        accounts = (result or {}).get('value', [])
         if accounts:
             amount = accounts[0]['account']['data']['parsed']['info']['tokenAmount']['uiAmount']
             return amount
@@ -45,11 +64,8 @@ def get_ranger_balance():
 
 def get_transaction_count():
     """Fetch recent transaction signatures to estimate activity"""
-    cmd = f'''curl -s 'https://api.mainnet-beta.solana.com' -X POST -H "Content-Type: application/json" -d '{{"jsonrpc":"2.0","id":1,"method":"getSignaturesForAddress","params":["{RANGER_WALLET}",{{"limit":1000}}]}}'  '''
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
     try:
-        data = json.loads(result.stdout)
-        sigs = data.get('result', [])
+        sigs = solana_rpc.rpc_call("getSignaturesForAddress", [RANGER_WALLET, {"limit": 1000}], timeout=15) or []
         successful = [s for s in sigs if s.get('err') is None]
         
         # Get timestamps
@@ -84,10 +100,16 @@ def calculate_projections(current_balance, hours_remaining):
         # Calculate multiplier from current position to final
         mult = data['final'] / data['at_5_5h']
         
-        # Scale based on hours remaining (patterns were at 5.5h)
-        # Adjust multiplier based on time difference
-        time_factor = hours_remaining / 5.5
-        adjusted_mult = 1 + (mult - 1) * time_factor
+        if hours_remaining < SURGE_START_HOURS:
+            # Inside the surge window follow the (calibrated) surge curve
+            # from pct_at_5_5h at 5.5h to 100% at the end
+            ratio = min((SURGE_START_HOURS - hours_remaining) / SURGE_START_HOURS, 1)
+            pct = data['pct_at_5_5h'] + (100 - data['pct_at_5_5h']) * ratio ** surge_exponent(data['pct_at_5_5h'])
+            adjusted_mult = 100 / pct
+        else:
+            # Scale based on hours remaining (patterns were at 5.5h)
+            time_factor = hours_remaining / 5.5
+            adjusted_mult = 1 + (mult - 1) * time_factor
         
         projected = current_balance * adjusted_mult
         
@@ -105,22 +127,12 @@ def analyze_polymarket_odds(projections):
     """Compare projections against typical Polymarket thresholds"""
     thresholds = [15, 20, 30, 40, 50, 60, 70, 80, 90, 100, 120, 140, 160, 180, 200]
     
-    # Assign probability weights to each pattern
-    pattern_weights = {
-        'Solomon': 0.30,  # Closest $ match
-        'Loyal': 0.25,
-        'Avici': 0.15,
-        'zkSOL': 0.15,
-        'Paystream': 0.10,
-        'Umbra': 0.05,
-    }
-    
     threshold_probs = {}
     for t in thresholds:
         prob = 0
         for p in projections:
             if p['projected'] >= t * 1_000_000:
-                prob += pattern_weights.get(p['name'], 0)
+                prob += PATTERN_WEIGHTS.get(p['name'], 0)
         threshold_probs[t] = prob * 100
     
     return threshold_probs
@@ -225,6 +237,8 @@ def run_analysis():
     print("=" * 80)
     print()
     
+    solana_rpc.print_latency_stats()
+
     # Save to log file
     log_entry = {
         'timestamp': now.isoformat(),
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Per-stage request timing for the Server-Timing header and a slowest-N log
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """
+    Wall time of the named stages of one unit of work, in milliseconds.
+
+    Stages are kept in the order they finish as (name, ms, desc). Stages may
+    overlap (the upstream fetches run concurrently), so `total_ms` is the
+    wall time since the timer started, not their sum.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name, desc=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000, desc)
+
+    def add(self, name, ms, desc=None):
+        self.stages.append((name, round(ms, 2), desc))
+
+    def total_ms(self):
+        return round((time.perf_counter() - self.started) * 1000, 2)
+
+
+def header(stages):
+    """Server-Timing header value for (name, ms, desc) stages"""
+    parts = []
+    for name, ms, desc in stages:
+        part = f'{name};dur={ms}'
+        if desc:
+            part += ';desc="' + desc.replace('\\', '').replace('"', '') + '"'
+        parts.append(part)
+    return ', '.join(parts)
+
+
+def as_list(stages):
+    """JSON-friendly form of (name, ms, desc) stages"""
+    return [{'name': name, 'ms': ms, 'desc': desc} if desc else {'name': name, 'ms': ms} for name, ms, desc in stages]
+
+
+class SlowLog:
+    """
+    The `size` slowest entries recorded in the last `window` seconds.
+
+    A min-heap keyed on duration, so recording is O(log size) and a fast
+    entry is rejected with one comparison. Entries older than the window
+    are dropped on the next record or read, so a single old outlier does
+    not hide today's slow requests forever.
+    """
+
+    def __init__(self, size=20, window=3600):
+        self.size = size
+        self.window = window
+        self._heap = []     # (ms, sequence, recorded_at, entry)
+        self._oldest = None  # recorded_at of the oldest entry held
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def _expire(self, now):
+        if self._oldest is None or now - self._oldest <= self.window:
+            return
+        self._heap = [item for item in self._heap if now - item[2] <= self.window]
+        heapq.heapify(self._heap)
+        self._oldest = min((item[2] for item in self._heap), default=None)
+
+    def admits(self, ms):
+        """
+        Whether an entry taking `ms` would be kept. A cheap, lock-free check
+        that lets callers skip building entries for fast requests. A size of
+        0 or less turns the log off.
+        """
+        if self.size <= 0:
+            return False
+        heap = self._heap
+        return len(heap) < self.size or ms > heap[0][0] or (
+            self._oldest is not None and time.time() - self._oldest > self.window
+        )
+
+    def record(self, ms, entry):
+        if self.size <= 0:
+            return
+        now = time.time()
+        item = (ms, next(self._sequence), now, entry)
+        with self._lock:
+            self._expire(now)
+            if len(self._heap) < self.size:
+                heapq.heappush(self._heap, item)
+            elif ms > self._heap[0][0]:
+                heapq.heapreplace(self._heap, item)
+            else:
+                return
+            if self._oldest is None:
+                self._oldest = now
+
+    def entries(self, limit=None):
+        """Slowest first, each entry with its `total_ms` and `recorded_at` (unix seconds)"""
+        with self._lock:
+            self._expire(time.time())
+            items = sorted(self._heap, reverse=True)
+        return [
+            dict(entry, total_ms=ms, recorded_at=round(recorded_at, 3))
+            for ms, _, recorded_at, entry in items[:limit]
+        ]
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Incremental, cursor-based signature ingestion for transaction activity
+"""
+
+import threading
+from collections import defaultdict
+from datetime import datetime
+
+import solana_rpc
+
+PAGE_LIMIT = 1000       # getSignaturesForAddress maximum page size
+BACKFILL_PAGES = 2      # Older pages fetched per poll until history is complete
+
+
+def hour_key(block_time):
+    return datetime.utcfromtimestamp(block_time).strftime('%Y-%m-%d %H:00')
+
+
+class SignatureActivity:
+    """
+    Tracks successful transactions for one address without re-downloading.
+
+    Keeps two cursors: the newest signature seen (new activity is fetched
+    with `until`) and the oldest (history is backfilled with `before` a few
+    pages per poll). The hourly histogram is updated incrementally, so each
+    poll costs bandwidth proportional to new activity.
+
+    With a sale window (unix `sale_start`/`sale_end`) only transactions
+    inside it are counted, and the backfill stops at the first page that
+    reaches back past the sale start.
+    """
+
+    def __init__(self, address, sale_start=None, sale_end=None, page_limit=PAGE_LIMIT,
+                 backfill_pages=BACKFILL_PAGES):
+        self.address = address
+        self.sale_start = sale_start
+        self.sale_end = sale_end
+        self.page_limit = page_limit
+        self.backfill_pages = backfill_pages
+        self.newest_signature = None
+        self.oldest_signature = None
+        self.backfill_complete = False
+        self.total = 0
+        self.hourly = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def _page(self, before=None, until=None, priority=None):
+        options = {"limit": self.page_limit}
+        if before:
+            options["before"] = before
+        if until:
+            options["until"] = until
+        return solana_rpc.rpc_call(
+            "getSignaturesForAddress", [self.address, options], timeout=10, priority=priority
+        ) or []
+
+    def _in_window(self, ts):
+        if self.sale_start is not None and ts < self.sale_start:
+            return False
+        return self.sale_end is None or ts <= self.sale_end
+
+    def _before_start(self, page):
+        """Whether `page` (newest first) reaches back past the sale start"""
+        return self.sale_start is not None and (page[-1].get('blockTime') or 0) < self.sale_start
+
+    def _count(self, sigs):
+        for tx in sigs:
+            if tx.get('err') is not None:
+                continue
+            ts = tx.get('blockTime') or 0
+            if not self._in_window(ts):
+                continue
+            self.total += 1
+            if ts > 0:
+                self.hourly[hour_key(ts)] += 1
+
+    def _fetch_new(self):
+        """All signatures newer than the cursor, newest first"""
+        if self.newest_signature is None:
+            # First poll: take the newest page, older history comes from backfill
+            return self._page()
+
+        new = []
+        page = self._page(until=self.newest_signature)
+        while page:
+            new.extend(page)
+            if len(page) < self.page_limit:
+                break
+            page = self._page(before=page[-1]['signature'], until=self.newest_signature)
+        return new
+
+    def _backfill(self):
+        for _ in range(self.backfill_pages):
+            page = self._page(before=self.oldest_signature, priority=solana_rpc.PRIORITY_BULK)
+            if page:
+                self._count(page)
+                self.oldest_signature = page[-1]['signature']
+            if len(page) < self.page_limit or self._before_start(page):
+                self.backfill_complete = True
+                return
+
+    def poll(self):
+        """Fetch new activity (and a slice of backfill) and return the summary"""
+        with self._lock:
+            # Only advance the cursor once every new page arrived, so a failed
+            # poll is retried in full instead of leaving a gap
+            new = self._fetch_new()
+            if new:
+                self._count(new)
+                self.newest_signature = new[0]['signature']
+                if self.oldest_signature is None:
+                    self.oldest_signature = new[-1]['signature']
+                    self.backfill_complete = len(new) < self.page_limit or self._before_start(new)
+
+            if not self.backfill_complete and self.oldest_signature:
+                self._backfill()
+
+            return self.summary()
+
+    def summary(self):
+        return {
+            'total': self.total,
+            'hourly': dict(self.hourly),
+            'backfill_complete': self.backfill_complete,
+        }
+
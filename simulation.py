@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo simulation of the final raise
+"""
+
+import multiprocessing
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, wait
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from projection_engine import MIN_CURVE_PCT, SURGE_START_HOURS, THRESHOLDS
+
+SIMULATION_SAMPLES = int(os.environ.get('SIMULATION_SAMPLES', 50000))
+SIMULATION_BUDGET_MS = int(os.environ.get('SIMULATION_BUDGET_MS', 250))  # Stop sampling after this
+SIMULATION_WORKERS = int(os.environ.get('SIMULATION_WORKERS', 0))        # 0 samples in-process
+BATCH_SIZE = 10000
+QUANTILES = (5, 10, 25, 50, 75, 90, 95)
+
+PCT_NOISE = 3.0         # Std dev (percentage points) of a pattern's share at 5.5h
+EXPONENT_NOISE = 0.3    # Std dev of the surge exponent
+MIN_VELOCITY_SPREAD = 0.2  # Velocity std dev floor, as a share of the mean velocity
+VELOCITY_SHARE = 0.4    # Weight of the velocity path, as in combined_projection
+
+
+def simulate_batch(params, count, seed):
+    """
+    Final-raise samples for one batch.
+
+    Each path picks a historical pattern by weight and projects the current
+    balance through that pattern's share of its final right now
+    (`pct_now`, from ProjectionEngine.pct_at). Surge-curve patterns perturb
+    their share at 5.5h and their surge exponent; patterns with a backfilled
+    curve perturb the share itself, less as it nears 100%. When velocities
+    were observed, the path is blended with a velocity projection whose rate
+    is drawn from their spread.
+    """
+    rng = np.random.default_rng(seed)
+    pattern = rng.choice(len(params['weight']), size=count, p=params['weight'])
+    pct_now = params['pct_now'][pattern]
+
+    surge = ~params['curve'][pattern]
+    if surge.any():
+        n = int(surge.sum())
+        pct_5_5h = np.clip(params['pct_at_5_5h'][pattern[surge]] + rng.normal(0, PCT_NOISE, n), 2, 95)
+        exponent = np.clip(params['exponent'][pattern[surge]] + rng.normal(0, EXPONENT_NOISE, n), 1, 4)
+        ratio = min(max((SURGE_START_HOURS - params['hours_remaining']) / SURGE_START_HOURS, 0), 1)
+        pct_now[surge] = pct_5_5h + (100 - pct_5_5h) * ratio ** exponent
+    if not surge.all():
+        curve = ~surge
+        base = pct_now[curve]
+        noise = rng.normal(0, PCT_NOISE, base.size) * (100 - base) / 100
+        pct_now[curve] = np.clip(base + noise, MIN_CURVE_PCT, 100)
+
+    finals = params['balance'] * 100 / pct_now
+
+    if params['velocity_mean'] is not None:
+        velocity = rng.normal(params['velocity_mean'], params['velocity_std'], count)
+        by_velocity = params['balance'] + np.maximum(velocity, 0) * params['hours_remaining']
+        finals = finals * (1 - VELOCITY_SHARE) + by_velocity * VELOCITY_SHARE
+
+    return finals.astype(np.float32)
+
+
+def velocity_spread(velocity_data):
+    """Mean and std dev of the velocities observed over the different windows"""
+    rates = [v['velocity_per_hour'] for v in (velocity_data or {}).get('velocities', {}).values()]
+    if not rates:
+        return None, None
+    mean = float(np.mean(rates))
+    return mean, max(float(np.std(rates)), abs(mean) * MIN_VELOCITY_SPREAD)
+
+
+class Simulator:
+    """
+    Samples final-raise paths in NumPy batches until SIMULATION_SAMPLES are
+    drawn or SIMULATION_BUDGET_MS runs out, whichever comes first, so a run
+    fits in one collector tick. With SIMULATION_WORKERS > 0 batches run on a
+    process pool; batches still running at the deadline are dropped. The pool
+    spawns its workers instead of forking, since forking the threaded server
+    can copy held locks into the child.
+    """
+
+    def __init__(self, engine, samples=SIMULATION_SAMPLES, budget_ms=SIMULATION_BUDGET_MS,
+                 workers=SIMULATION_WORKERS):
+        if np is None:
+            raise RuntimeError("numpy is required for Simulator")
+        self.samples = samples
+        self.budget_ms = budget_ms
+        self.engine = engine
+        curve = np.zeros(len(engine.names), dtype=bool)
+        curve[[i for i, _ in engine.curves]] = True
+        self.base_params = {
+            'pct_at_5_5h': engine.pct_at_5_5h,
+            'exponent': engine.exponent,
+            'weight': engine.weight / engine.weight.sum(),
+            'curve': curve,
+        }
+        self.workers = workers
+        self.pool = None  # Started on first run
+        self.last_elapsed_ms = None
+
+    def run(self, balance, hours_remaining, velocity_data=None, thresholds=None):
+        started = time.perf_counter()
+        deadline = started + self.budget_ms / 1000
+
+        velocity_mean, velocity_std = velocity_spread(velocity_data)
+        params = dict(
+            self.base_params, balance=balance, hours_remaining=hours_remaining,
+            pct_now=self.engine.pct_at(hours_remaining),
+            velocity_mean=velocity_mean, velocity_std=velocity_std
+        )
+        # Same inputs, same samples: an unchanged sale keeps an unchanged snapshot
+        seed = zlib.crc32(repr((balance, hours_remaining, velocity_mean)).encode())
+        batches = [(min(BATCH_SIZE, self.samples - i), seed + i) for i in range(0, self.samples, BATCH_SIZE)]
+
+        results = []
+        if self.workers > 0 and self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+        if self.pool is not None:
+            futures = [self.pool.submit(simulate_batch, params, count, s) for count, s in batches]
+            done, pending = wait(futures, timeout=max(0, deadline - time.perf_counter()))
+            for future in pending:
+                future.cancel()
+            results = [f.result() for f in futures if f in done and f.exception() is None]
+        else:
+            for count, s in batches:
+                results.append(simulate_batch(params, count, s))
+                if time.perf_counter() >= deadline:
+                    break
+
+        self.last_elapsed_ms = (time.perf_counter() - started) * 1000
+        if not results:
+            return None
+        return self.summarize(np.concatenate(results), thresholds or THRESHOLDS)
+
+    @staticmethod
+    def summarize(finals, thresholds):
+        """Threshold probabilities (%), quantile band and mean of the sampled finals"""
+        thresholds = sorted(set(thresholds))
+        exceed = (finals[None, :] >= np.array(thresholds, dtype=float)[:, None] * 1_000_000).mean(axis=1)
+        quantiles = np.percentile(finals, QUANTILES)
+        return {
+            'probabilities': {t: round(float(p) * 100, 1) for t, p in zip(thresholds, exceed)},
+            'quantiles': {f'p{q}': round(float(v), 0) for q, v in zip(QUANTILES, quantiles)},
+            'mean': round(float(finals.mean()), 0),
+            'samples': int(finals.size),
+        }
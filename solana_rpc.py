@@ -0,0 +1,523 @@
+#!/usr/bin/env python3
+"""
+Shared Solana JSON-RPC client - pooled keep-alive connections for all trackers
+"""
+
+import itertools
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+import metrics
+
+DEFAULT_RPC_URL = os.environ.get('SOLANA_RPC_URL', "https://api.mainnet-beta.solana.com")
+# Comma separated list of endpoints to fail over between (SOLANA_RPC_URL if unset)
+DEFAULT_RPC_URLS = [u.strip() for u in os.environ.get('SOLANA_RPC_URLS', '').split(',') if u.strip()] or [DEFAULT_RPC_URL]
+DEFAULT_TIMEOUT = 10   # Seconds per call unless overridden
+POOL_SIZE = 16         # Keep-alive connections held open per host
+
+# Token buckets as (requests per second, burst). '*' covers the whole endpoint,
+# other keys a single method. Defaults fit the public mainnet endpoint
+# (100 requests / 10s per IP, 40 / 10s per method). A token is one HTTP
+# request, so a JSON-RPC batch costs one token.
+RATE_LIMITS = {
+    '*': (10, 100),
+    'getTransaction': (4, 40),
+    'getSignaturesForAddress': (4, 40),
+    'getTokenAccountsByOwner': (4, 40),
+}
+
+# Lower runs first: balance reads go ahead of activity polls and bulk backfill
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BULK = 2
+METHOD_PRIORITY = {
+    'getTokenAccountsByOwner': PRIORITY_HIGH,
+    'getSignaturesForAddress': PRIORITY_NORMAL,
+    'getTransaction': PRIORITY_BULK,
+}
+
+# Retries on HTTP 429/503: Retry-After when given, else jittered exponential backoff
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30
+RETRY_STATUS = (429, 503)
+
+# Endpoint health and hedging
+HEALTH_WINDOW = 50           # Recent calls kept per endpoint for latency/error rate
+HEDGE_MIN_DELAY = 0.05       # Never hedge sooner than this (seconds)
+HEDGE_DEFAULT_DELAY = 0.5    # Hedge delay before an endpoint has enough samples
+HEDGED_METHODS = {'getTokenAccountsByOwner'}
+
+
+class RPCError(Exception):
+    """Raised when the RPC answers with an error object or an unusable body"""
+
+
+class RateLimitedError(RPCError):
+    """Raised when the endpoint keeps throttling after every retry"""
+
+
+class TokenBucket:
+    """Classic token bucket; callers hold the RateLimiter lock"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, cost, now):
+        """Seconds until `cost` tokens are available (0 when they are now)"""
+        self.refill(now)
+        if now < self.paused_until:
+            return self.paused_until - now
+        cost = min(cost, self.burst)
+        if self.tokens >= cost:
+            return 0
+        return (cost - self.tokens) / self.rate
+
+    def take(self, cost):
+        self.tokens -= min(cost, self.burst)
+
+    def pause(self, seconds, now):
+        """Stop handing out tokens for `seconds` (after the server said 429)"""
+        self.paused_until = max(self.paused_until, now + seconds)
+        self.tokens = 0
+
+
+class RateLimiter:
+    """
+    Token buckets for one endpoint: one for the endpoint and one per method.
+
+    Waiters are served by priority. A request waits for a higher-priority
+    waiter only when both need the same bucket, and only while that waiter
+    is not still short of tokens in a bucket of its own.
+    """
+
+    def __init__(self, limits=None):
+        limits = RATE_LIMITS if limits is None else limits
+        self.buckets = {key: TokenBucket(rate, burst) for key, (rate, burst) in limits.items()}
+        self.throttled = 0
+        self._cond = threading.Condition()
+        self._waiting = []  # (priority, seq, buckets, cost) of every waiter
+        self._seq = itertools.count()
+
+    def _buckets_for(self, method):
+        return [b for b in (self.buckets.get('*'), self.buckets.get(method)) if b is not None]
+
+    def _blocked(self, ticket, now):
+        """Whether a higher-priority waiter should get the tokens `ticket` wants first"""
+        priority, _, buckets, _ = ticket
+        for other_priority, _, other_buckets, cost in self._waiting:
+            if other_priority >= priority or not any(b in buckets for b in other_buckets):
+                continue
+            # Held up by a bucket this request does not use, so taking tokens here cannot delay it
+            if any(b.wait_time(cost, now) > 0 for b in other_buckets if b not in buckets):
+                continue
+            return True
+        return False
+
+    def acquire(self, method, cost=1, priority=PRIORITY_NORMAL, max_wait=None):
+        """Block until `cost` tokens are free for `method`; False if max_wait ran out"""
+        buckets = self._buckets_for(method)
+        if not buckets:
+            return True
+
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        with self._cond:
+            ticket = (priority, next(self._seq), buckets, cost)
+            self._waiting.append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = max(b.wait_time(cost, now) for b in buckets)
+                    if wait == 0 and not self._blocked(ticket, now):
+                        for b in buckets:
+                            b.take(cost)
+                        return True
+                    if deadline is not None and now >= deadline:
+                        return False
+                    timeout = wait if wait > 0 else 0.05
+                    if deadline is not None:
+                        timeout = min(timeout, deadline - now)
+                    self._cond.wait(timeout)
+            finally:
+                self._waiting.remove(ticket)
+                self._cond.notify_all()
+
+    def pause(self, method, seconds):
+        """Back off every request to this endpoint (and method) for `seconds`"""
+        with self._cond:
+            self.throttled += 1
+            now = time.monotonic()
+            for b in self._buckets_for(method):
+                b.pause(seconds, now)
+
+
+class SolanaRPC:
+    """
+    Thin JSON-RPC client over a single requests.Session.
+
+    The session keeps TLS connections alive between calls, so a dashboard
+    refresh costs one round trip instead of a process spawn plus handshake.
+    Every call is timed and the latency is accumulated per RPC method.
+    Requests wait for the endpoint's rate-limit budget (see RATE_LIMITS) and
+    throttled requests are retried instead of dropped.
+    """
+
+    def __init__(self, url=DEFAULT_RPC_URL, timeout=DEFAULT_TIMEOUT, pool_size=POOL_SIZE, rate_limits=None):
+        self.url = url
+        self.host = urlparse(url).netloc or url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({'Content-Type': 'application/json'})
+        self._ids = itertools.count(1)
+        self.limiter = RateLimiter(rate_limits)
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    def _payload(self, method, params):
+        return {
+            "jsonrpc": "2.0",
+            "id": next(self._ids),
+            "method": method,
+            "params": params or []
+        }
+
+    def call(self, method, params=None, timeout=None, priority=None):
+        """Send one JSON-RPC request and return its `result` field"""
+        data = self._post(method, method, self._payload(method, params), 1, timeout, priority)
+        if not isinstance(data, dict):
+            raise RPCError(f"{method}: unexpected reply {data!r:.200}")
+        if 'error' in data:
+            metrics.UPSTREAM_ERRORS.inc(upstream='rpc', method=method, endpoint=self.host)
+            raise RPCError(f"{method}: {data['error']}")
+        return data.get('result')
+
+    def batch(self, calls, timeout=None, priority=None):
+        """
+        Send several (method, params) calls as one JSON-RPC batch array.
+
+        Returns the results in call order; entries the node answered with an
+        error (or left out of the reply) come back as None and are counted
+        as errors of their method. Callers retry those on their own.
+        """
+        if not calls:
+            return []
+
+        method = calls[0][0]
+        payload = [self._payload(m, params) for m, params in calls]
+        data = self._post(f"batch:{method}", method, payload, 1, timeout, priority)
+        if not isinstance(data, list):
+            # Whole batch rejected (batch size cap, ...)
+            metrics.UPSTREAM_ERRORS.inc(upstream='rpc', method=f"batch:{method}", endpoint=self.host)
+            raise RPCError(f"batch:{method}: {data.get('error', data) if isinstance(data, dict) else data}")
+        by_id = {item.get('id'): item for item in data if isinstance(item, dict)}
+        errors = sum(1 for p in payload if 'error' in by_id.get(p['id'], {'error': 'missing'}))
+        if errors:
+            metrics.UPSTREAM_ERRORS.inc(errors, upstream='rpc', method=method, endpoint=self.host)
+        return [by_id.get(p['id'], {}).get('result') for p in payload]
+
+    def _post(self, label, method, payload, cost, timeout, priority):
+        """
+        POST with rate limiting and retries; returns the decoded JSON body.
+
+        Waits for tokens at the method's priority, and on HTTP 429/503 pauses
+        the endpoint's buckets for Retry-After (or a jittered exponential
+        backoff) before trying again.
+        """
+        timeout = timeout or self.timeout
+        if priority is None:
+            priority = METHOD_PRIORITY.get(method, PRIORITY_NORMAL)
+
+        for attempt in range(MAX_RETRIES + 1):
+            if not self.limiter.acquire(method, cost, priority, max_wait=BACKOFF_MAX + timeout):
+                raise RateLimitedError(f"{label}: no rate-limit budget within {BACKOFF_MAX + timeout}s")
+
+            start = time.perf_counter()
+            ok = False
+            try:
+                response = self.session.post(self.url, json=payload, timeout=timeout)
+                if response.status_code in RETRY_STATUS:
+                    delay = _retry_after(response) or _backoff(attempt)
+                    self.limiter.pause(method, delay)
+                    if attempt == MAX_RETRIES:
+                        raise RateLimitedError(f"{label}: HTTP {response.status_code} after {attempt + 1} attempts")
+                    continue
+                data = response.json()
+                ok = True
+                return data
+            finally:
+                self._record(label, time.perf_counter() - start, ok)
+
+    def _record(self, method, elapsed, ok):
+        metrics.UPSTREAM_LATENCY.observe(elapsed, upstream='rpc', method=method, endpoint=self.host)
+        if not ok:
+            metrics.UPSTREAM_ERRORS.inc(upstream='rpc', method=method, endpoint=self.host)
+        with self._stats_lock:
+            stats = self._stats.get(method)
+            if stats is None:
+                stats = self._stats[method] = {
+                    'calls': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'last_ms': 0.0
+                }
+            elapsed_ms = elapsed * 1000
+            stats['calls'] += 1
+            stats['total_ms'] += elapsed_ms
+            stats['last_ms'] = elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            if not ok:
+                stats['errors'] += 1
+
+    def latency_stats(self):
+        """Per-method call counts and latency summary in milliseconds"""
+        with self._stats_lock:
+            return {
+                method: {
+                    'calls': s['calls'],
+                    'errors': s['errors'],
+                    'avg_ms': round(s['total_ms'] / s['calls'], 1) if s['calls'] else 0,
+                    'max_ms': round(s['max_ms'], 1),
+                    'last_ms': round(s['last_ms'], 1)
+                }
+                for method, s in self._stats.items()
+            }
+
+
+def _retry_after(response):
+    """Seconds from a Retry-After header, if present and numeric"""
+    try:
+        return max(0.0, float(response.headers.get('Retry-After')))
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(attempt):
+    """Jittered exponential backoff for retry number `attempt`"""
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+
+class EndpointHealth:
+    """Rolling latency and error rate for one endpoint"""
+
+    def __init__(self, url):
+        self.url = url
+        self.latencies = deque(maxlen=HEALTH_WINDOW)
+        self.outcomes = deque(maxlen=HEALTH_WINDOW)
+        self._lock = threading.Lock()
+
+    def record(self, elapsed, ok):
+        with self._lock:
+            self.outcomes.append(ok)
+            if ok:
+                self.latencies.append(elapsed)
+
+    def error_rate(self):
+        with self._lock:
+            return (self.outcomes.count(False) / len(self.outcomes)) if self.outcomes else 0.0
+
+    def percentile(self, q):
+        with self._lock:
+            if not self.latencies:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def score(self):
+        """Lower is healthier: median latency inflated by the error rate"""
+        p50 = self.percentile(0.5) or 0.0
+        errors = self.error_rate()
+        return (p50 + 0.01) * (1 + 10 * errors) + errors
+
+    def hedge_delay(self):
+        """How long to wait on this endpoint before hedging: its p95 latency"""
+        with self._lock:
+            enough = len(self.latencies) >= 5
+        if not enough:
+            return HEDGE_DEFAULT_DELAY
+        return max(HEDGE_MIN_DELAY, self.percentile(0.95))
+
+    def summary(self):
+        p50 = self.percentile(0.5)
+        p95 = self.percentile(0.95)
+        return {
+            'url': self.url,
+            'samples': len(self.outcomes),
+            'p50_ms': round(p50 * 1000, 1) if p50 is not None else None,
+            'p95_ms': round(p95 * 1000, 1) if p95 is not None else None,
+            'error_rate': round(self.error_rate(), 3),
+        }
+
+
+class RPCPool:
+    """
+    One SolanaRPC client per configured endpoint, used as a single client.
+
+    Reads go to the healthiest endpoint (rolling latency and error rate) and
+    fail over down the ranking on errors. Methods in `hedged_methods` are
+    hedged: if the best endpoint has not answered within its p95 latency,
+    the same read is sent to the next one and the first answer wins.
+    """
+
+    def __init__(self, urls=None, timeout=DEFAULT_TIMEOUT, pool_size=POOL_SIZE, rate_limits=None,
+                 hedged_methods=HEDGED_METHODS):
+        urls = urls or DEFAULT_RPC_URLS
+        self.clients = [SolanaRPC(url, timeout=timeout, pool_size=pool_size, rate_limits=rate_limits) for url in urls]
+        self.health = {client.url: EndpointHealth(client.url) for client in self.clients}
+        self.hedged_methods = set(hedged_methods)
+        self.hedges = 0
+        self._hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='hedge') if len(self.clients) > 1 else None
+
+    @property
+    def url(self):
+        """URL of the currently healthiest endpoint"""
+        return self.ranked()[0].url
+
+    def ranked(self):
+        if len(self.clients) == 1:
+            return self.clients
+        return sorted(self.clients, key=lambda client: self.health[client.url].score())
+
+    def call(self, method, params=None, timeout=None, priority=None, hedge=None):
+        """Send one JSON-RPC request and return its `result` field"""
+        def send(client):
+            return client.call(method, params, timeout=timeout, priority=priority)
+
+        if hedge is None:
+            hedge = method in self.hedged_methods
+        if hedge and len(self.clients) > 1:
+            return self._hedged(send)
+        return self._failover(send, self.ranked())
+
+    def batch(self, calls, timeout=None, priority=None):
+        """Send a JSON-RPC batch to the healthiest endpoint, failing over on errors"""
+        return self._failover(lambda client: client.batch(calls, timeout=timeout, priority=priority), self.ranked())
+
+    def _attempt(self, client, send):
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = send(client)
+            ok = True
+            return result
+        finally:
+            self.health[client.url].record(time.perf_counter() - start, ok)
+
+    def _failover(self, send, clients):
+        last_error = None
+        for client in clients:
+            try:
+                return self._attempt(client, send)
+            except Exception as e:
+                last_error = e
+        raise last_error
+
+    def _hedged(self, send):
+        ranked = self.ranked()
+        primary, backup = ranked[0], ranked[1]
+
+        first = self._hedge_pool.submit(self._attempt, primary, send)
+        done, _ = wait([first], timeout=self.health[primary.url].hedge_delay())
+        if first in done and first.exception() is None:
+            return first.result()
+
+        # Slow or failed: race the same read on the next endpoint
+        self.hedges += 1
+        pending = {self._hedge_pool.submit(self._attempt, backup, send)}
+        if first not in done:
+            pending.add(first)
+
+        last_error = first.exception() if first in done else None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                last_error = future.exception()
+
+        if len(ranked) > 2:
+            return self._failover(send, ranked[2:])
+        raise last_error
+
+    def latency_stats(self):
+        """Per-method latency summary; keyed 'method @ host' with several endpoints"""
+        if len(self.clients) == 1:
+            return self.clients[0].latency_stats()
+        stats = {}
+        for client in self.clients:
+            host = urlparse(client.url).netloc or client.url
+            for method, s in client.latency_stats().items():
+                stats[f"{method} @ {host}"] = s
+        return stats
+
+    def endpoint_health(self):
+        """Rolling health per endpoint, healthiest first"""
+        return [self.health[client.url].summary() for client in self.ranked()]
+
+
+# Process-wide shared client so every caller reuses the same connection pools
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the shared RPC client, creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = RPCPool()
+    return _client
+
+
+def configure(url=None, urls=None, timeout=DEFAULT_TIMEOUT, pool_size=POOL_SIZE, rate_limits=None):
+    """Replace the shared client, e.g. to point every caller at other endpoints"""
+    global _client
+    with _client_lock:
+        _client = RPCPool(urls or [url or DEFAULT_RPC_URL], timeout=timeout, pool_size=pool_size,
+                          rate_limits=rate_limits)
+    return _client
+
+
+def rpc_call(method, params=None, timeout=None, priority=None):
+    """Call a method on the shared client"""
+    return get_client().call(method, params, timeout=timeout, priority=priority)
+
+
+def rpc_batch(calls, timeout=None, priority=None):
+    """Send a batch of (method, params) calls on the shared client"""
+    return get_client().batch(calls, timeout=timeout, priority=priority)
+
+
+def latency_stats():
+    """Latency summary for the shared client"""
+    return get_client().latency_stats()
+
+
+def print_latency_stats():
+    """Print a per-method latency table for CLI runs"""
+    stats = latency_stats()
+    if not stats:
+        return
+    print("RPC LATENCY:")
+    print("-" * 80)
+    width = max(28, max(len(method) for method in stats))
+    print(f"{'Method':<{width}} {'Calls':>7} {'Errors':>7} {'Avg ms':>10} {'Max ms':>10} {'Last ms':>10}")
+    print("-" * 80)
+    for method, s in sorted(stats.items()):
+        print(f"{method:<{width}} {s['calls']:>7} {s['errors']:>7} {s['avg_ms']:>10.1f} {s['max_ms']:>10.1f} {s['last_ms']:>10.1f}")
+    print("-" * 80)
+    print()
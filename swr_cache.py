@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Keyed TTL cache with stale-while-revalidate refresh
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+# value plus where it came from: 'live' (loaded by this call), 'cache'
+# (within TTL) or 'stale' (expired, refresh running in the background)
+CacheResult = namedtuple('CacheResult', ['value', 'age_seconds', 'source'])
+
+
+class SWRCache:
+    """
+    Caches loader(key) results for `ttl` seconds.
+
+    Only the first lookup of a key waits for the loader. After expiry the
+    cached value keeps being served while a single background thread per key
+    reloads it; a failed reload keeps the old value and is retried one TTL
+    later.
+    """
+
+    def __init__(self, loader, ttl):
+        self.loader = loader
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}      # key -> (value, loaded_at)
+        self._attempts = {}     # key -> monotonic time of last refresh attempt
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return a CacheResult; raises whatever the loader raises on a cold miss"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                value, loaded_at = entry
+                age = now - loaded_at
+                if age <= self.ttl:
+                    return CacheResult(value, age, 'cache')
+                retry_due = now - self._attempts.get(key, loaded_at) > self.ttl
+                if retry_due and key not in self._refreshing:
+                    self._refreshing.add(key)
+                    self._attempts[key] = now
+                    threading.Thread(target=self._refresh, args=(key,), daemon=True).start()
+                return CacheResult(value, age, 'stale')
+            self.misses += 1
+
+        value = self.loader(key)
+        self.set(key, value)
+        return CacheResult(value, 0.0, 'live')
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+
+    def _refresh(self, key):
+        try:
+            self.set(key, self.loader(key))
+        except Exception as e:
+            print(f"Background refresh failed for {key}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
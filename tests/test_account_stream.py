@@ -0,0 +1,86 @@
+"""
+account_stream.AccountStream against a local accountSubscribe stand-in
+(benchmarks/stub_ws.py): subscription, notifications and reconnects.
+"""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+os.environ['BALANCE_HISTORY_DIR'] = ''  # Keep test histories out of ~/ranger-tracker
+
+import pytest
+
+pytest.importorskip('websocket')
+
+import account_stream
+import app
+from stub_rpc import WALLET
+from stub_ws import StubAccountSocket
+from tracker_state import BalanceHistory
+
+TOKEN_ACCOUNT = "StubTokenAccount1111111111111111111111111111"
+BACKOFF = 0.2
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(account_stream, 'BACKOFF_INITIAL', BACKOFF)
+    with StubAccountSocket() as server:
+        yield server
+
+
+@pytest.fixture
+def history():
+    return BalanceHistory()
+
+
+@pytest.fixture
+def stream(server, history):
+    def on_balance(balance, timestamp, slot):
+        app.record_balance(balance, timestamp, slot, history=history)
+
+    stream = account_stream.AccountStream(WALLET, on_balance, ws_url=server.url, token_account=TOKEN_ACCOUNT)
+    assert stream.start()
+    assert wait_until(lambda: stream.connected)
+    yield stream
+    stream.stop()
+
+
+def test_subscribes_to_the_token_account(server, stream):
+    assert server.subscriptions == [[TOKEN_ACCOUNT, {"encoding": "jsonParsed", "commitment": "confirmed"}]]
+
+
+def test_notification_reaches_record_balance(server, stream, history):
+    server.notify(1234.5, slot=42)
+
+    assert wait_until(lambda: len(history.points) == 1)
+    _, balance, slot = history.points[0]
+    assert (balance, slot) == (1234.5, 42)
+    assert stream.balance == 1234.5 and stream.last_slot == 42
+
+
+def test_reconnects_with_backoff_after_the_server_drops(server, stream, history):
+    dropped_at = time.monotonic()
+    server.drop()
+
+    assert server.wait_for_subscriptions(2)
+    # Jittered between half and all of the initial backoff
+    assert server.connected_at[1] - dropped_at >= BACKOFF * 0.5
+    assert wait_until(lambda: stream.connected)
+
+    server.notify(99.0, slot=7)
+    assert wait_until(lambda: stream.balance == 99.0)
+    assert history.points[-1][1:] == (99.0, 7)
@@ -0,0 +1,84 @@
+"""
+Replays benchmarks/fixtures/transactions.json (synthetic transactions when
+none is recorded, see benchmarks/fixtures.py) through the stub RPC and checks
+that the optimized paths agree with their reference implementations.
+"""
+
+import contextlib
+import copy
+import io
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+os.environ['BALANCE_HISTORY_DIR'] = ''  # Keep test histories out of ~/ranger-tracker
+
+import numpy as np
+import pytest
+
+import backfill
+import solana_rpc
+import whale_tracker
+from bench_backfill import sale_for, timed_backfill
+from bench_token_deltas import legacy_extract_deposits
+from fixtures import load_transactions
+from stub_rpc import StubRPC
+
+
+@pytest.fixture(scope='module')
+def fixture():
+    return load_transactions(count=200)
+
+
+@pytest.fixture
+def stub(fixture):
+    with StubRPC(latency=0, fixture=fixture) as stub:
+        solana_rpc.configure(url=stub.url, rate_limits={})
+        yield stub
+
+
+def test_resumed_backfill_builds_the_same_curve(fixture, stub, tmp_path):
+    sale = sale_for(fixture)
+    _, _, single_runs, single = timed_backfill(stub, sale, str(tmp_path / 'single'))
+    _, _, resumed_runs, resumed = timed_backfill(stub, sale, str(tmp_path / 'resumed'), chunk=60)
+
+    assert single is not None and resumed is not None
+    assert single_runs == 1 and resumed_runs > 1
+    assert np.array_equal(single['pct'], resumed['pct'])
+    assert single['final'] == resumed['final']
+    assert single['deposits'] == resumed['deposits']
+
+
+def test_backfill_finishes_when_the_node_returns_null(fixture, tmp_path):
+    broken = copy.deepcopy(fixture)
+    broken['transactions'][3] = None
+    with StubRPC(latency=0, fixture=broken) as stub:
+        solana_rpc.configure(url=stub.url, rate_limits={})
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = backfill.SaleBackfill('Solomon', sale_for(broken), str(tmp_path)).run()
+
+    assert result['remaining'] == 0
+    assert result['unavailable'] == 1
+    assert result['curve'] is not None
+
+
+def test_token_deltas_match_the_legacy_decoder(fixture):
+    wallet = fixture['wallet']
+    for sig_info, tx in zip(fixture['signatures'], fixture['transactions']):
+        signature, block_time = sig_info['signature'], sig_info.get('blockTime', 0)
+        expected = sum(d['amount'] for d in legacy_extract_deposits(tx, wallet, signature, block_time))
+        actual = sum(d['amount'] for d in whale_tracker.extract_deposits(tx, wallet, signature, block_time))
+        assert actual == pytest.approx(expected, abs=1e-6), signature
+
+
+def test_batched_fetch_matches_serial(fixture, stub):
+    wallet = fixture['wallet']
+    count = len(fixture['signatures'])
+    with contextlib.redirect_stdout(io.StringIO()):
+        serial, _ = whale_tracker.parse_usdc_deposits(wallet, max_txs=count)
+        batched, _ = whale_tracker.parse_usdc_deposits(wallet, max_txs=count, batch_size=whale_tracker.BATCH_SIZE)
+
+    assert serial
+    assert batched == serial
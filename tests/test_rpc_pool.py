@@ -0,0 +1,74 @@
+"""
+Hedging and failover of solana_rpc.RPCPool across two stub RPC endpoints
+with injected latency.
+"""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import pytest
+
+import solana_rpc
+from stub_rpc import USDC_MINT, WALLET, StubRPC
+
+HEDGE_DELAY = 0.1
+SLOW = 0.5
+
+
+def balance(pool):
+    result = pool.call("getTokenAccountsByOwner", [WALLET, {"mint": USDC_MINT}, {"encoding": "jsonParsed"}])
+    return result['value'][0]['account']['data']['parsed']['info']['tokenAmount']['uiAmount']
+
+
+@pytest.fixture(autouse=True)
+def short_hedge_delay(monkeypatch):
+    monkeypatch.setattr(solana_rpc, 'HEDGE_DEFAULT_DELAY', HEDGE_DELAY)
+
+
+@pytest.fixture
+def dead_url():
+    """URL of an endpoint that refuses connections"""
+    with StubRPC(latency=0) as stub:
+        url = stub.url
+    return url
+
+
+def test_hedge_fires_after_the_delay_and_the_faster_answer_wins():
+    with StubRPC(latency=SLOW, balance=1.0) as slow, StubRPC(latency=0, balance=2.0) as fast:
+        pool = solana_rpc.RPCPool([slow.url, fast.url], rate_limits={})
+        start = time.perf_counter()
+        result = balance(pool)
+        elapsed = time.perf_counter() - start
+
+    assert result == 2.0
+    assert pool.hedges == 1
+    assert slow.requests == 1 and fast.requests == 1
+    assert HEDGE_DELAY <= elapsed < SLOW
+
+
+def test_no_hedge_when_the_primary_answers_in_time():
+    with StubRPC(latency=0, balance=1.0) as primary, StubRPC(latency=0, balance=2.0) as backup:
+        pool = solana_rpc.RPCPool([primary.url, backup.url], rate_limits={})
+        result = balance(pool)
+
+    assert result == 1.0
+    assert pool.hedges == 0
+    assert backup.requests == 0
+
+
+def test_dead_primary_fails_over(dead_url):
+    with StubRPC(latency=0, balance=2.0) as backup:
+        pool = solana_rpc.RPCPool([dead_url, backup.url], rate_limits={})
+        hedged = balance(pool)
+        signatures = pool.call("getSignaturesForAddress", [WALLET, {"limit": 10}])
+
+    assert hedged == 2.0
+    assert len(signatures) == 10
+    assert pool.health[dead_url].error_rate() > 0
+    # The failing endpoint drops behind the one that answers
+    assert pool.ranked()[0].url == backup.url
@@ -0,0 +1,68 @@
+"""
+One writer per sale across processes: the history file's lock decides which
+TrackerState collects, the others serve its snapshots read-only.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+os.environ['BALANCE_HISTORY_DIR'] = ''  # Keep test histories out of ~/ranger-tracker
+
+import pytest
+
+import app
+import solana_rpc
+import tracker_state
+from stub_rpc import WALLET, StubRPC
+from tracker_state import TrackerState
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    with StubRPC(latency=0) as stub:
+        solana_rpc.configure(url=stub.url, rate_limits={})
+        monkeypatch.setattr(app, 'POLYMARKET_GAMMA_URL', stub.url)
+        yield stub
+
+
+@pytest.fixture
+def sale(tmp_path, monkeypatch):
+    # flock is per open file, so two states in one process contend like two workers
+    monkeypatch.setattr(tracker_state, 'HISTORY_DIR', str(tmp_path))
+    end = (datetime.utcnow() + timedelta(hours=3)).replace(microsecond=0)
+    states = [TrackerState(WALLET, end, app.DEFAULT_POLYMARKET_SLUG) for _ in range(2)]
+    yield states
+    for state in states:
+        state.close()
+
+
+def test_follower_serves_the_writers_snapshot_without_polling(stub, sale):
+    writer, follower = sale
+    assert writer.writer and not follower.writer
+    assert follower.history.readonly
+
+    published = app.SnapshotCollector(writer).collect()
+    polled = stub.requests
+    followed = app.SnapshotCollector(follower).follow()
+
+    assert stub.requests == polled
+    assert (followed.etag, followed.body, followed.status) == (published.etag, published.body, published.status)
+    assert len(follower.history) == len(writer.history) == 1
+
+
+def test_follower_takes_over_when_the_writer_exits(stub, sale):
+    writer, follower = sale
+    app.SnapshotCollector(writer).collect()
+    assert not follower.claim_writer()
+
+    writer.close()
+    assert follower.claim_writer()
+    assert not follower.history.readonly
+
+    stub.balance += 1
+    app.SnapshotCollector(follower).collect()
+    assert len(follower.history) == 2
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Token-balance delta decoder for parsed Solana transactions
+"""
+
+USDC_MINT = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+
+
+def _base_units(entry):
+    """Integer amount and decimals of a pre/post token balance entry"""
+    token_amount = entry.get('uiTokenAmount') or {}
+    decimals = token_amount.get('decimals', 0)
+    try:
+        return int(token_amount['amount']), decimals
+    except (KeyError, TypeError, ValueError):
+        # Fall back to the float field if the raw amount is missing or malformed
+        return int(round(float(token_amount.get('uiAmount') or 0) * 10 ** decimals)), decimals
+
+
+def token_deltas(meta, mint=USDC_MINT):
+    """
+    Per-account balance changes of `mint` in one transaction.
+
+    Pre balances are indexed by accountIndex once, so the cost is linear in
+    the number of token-balance entries. Returns a list of
+    (owner, delta, decimals) with delta in integer base units; accounts whose
+    balance did not change are left out.
+    """
+    pre = {
+        entry.get('accountIndex'): entry
+        for entry in meta.get('preTokenBalances') or ()
+        if entry.get('mint') == mint
+    }
+
+    deltas = []
+    for entry in meta.get('postTokenBalances') or ():
+        if entry.get('mint') != mint:
+            continue
+        before = pre.pop(entry.get('accountIndex'), None)
+        if before is not None and before.get('uiTokenAmount') == entry.get('uiTokenAmount'):
+            continue  # Unchanged; skip the integer parse
+        post_amount, decimals = _base_units(entry)
+        pre_amount = _base_units(before)[0] if before is not None else 0
+        if post_amount != pre_amount:
+            deltas.append((entry.get('owner') or (before or {}).get('owner'), post_amount - pre_amount, decimals))
+
+    # Accounts present before but closed by the transaction
+    for entry in pre.values():
+        amount, decimals = _base_units(entry)
+        if amount:
+            deltas.append((entry.get('owner'), -amount, decimals))
+
+    return deltas
+
+
+def decode_deposits(tx, wallet, mint=USDC_MINT):
+    """
+    Deposits of `mint` into `wallet` from one parsed transaction.
+
+    The amount received is the net increase across all of the wallet's token
+    accounts. Every other owner whose balance fell is a sender; with several
+    senders the received amount is split between them in proportion to what
+    each sent. Returns a list of {'amount', 'sender'} dicts (sender None when
+    no outflow is visible), amounts in UI units.
+    """
+    deltas = token_deltas(tx.get('meta') or {}, mint)
+    if not deltas:
+        return []
+
+    received = 0
+    decimals = deltas[0][2]
+    outflows = {}
+    for owner, delta, dec in deltas:
+        if owner == wallet:
+            received += delta
+            decimals = dec
+        elif delta < 0:
+            outflows[owner] = outflows.get(owner, 0) - delta
+
+    if received <= 0:
+        return []
+
+    scale = 10 ** decimals
+    if not outflows:
+        return [{'amount': received / scale, 'sender': None}]
+
+    total_out = sum(outflows.values())
+    senders = sorted(outflows.items(), key=lambda item: item[1], reverse=True)
+    shares = [(owner, received * sent // total_out) for owner, sent in senders]
+
+    # Integer division leaves a few base units over; give them to the largest sender
+    remainder = received - sum(share for _, share in shares)
+    shares[0] = (shares[0][0], shares[0][1] + remainder)
+
+    return [{'amount': share / scale, 'sender': owner} for owner, share in shares if share > 0]
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Per-sale tracker state: balance history, upstream caches and collector
+"""
+
+import os
+import re
+import threading
+import time
+from collections import deque
+
+import historical_curves
+from history_store import HistoryFile, claim_writer, to_unix
+from signature_activity import SignatureActivity
+from velocity import VelocityEstimator
+
+HISTORY_SIZE = 1000          # Balance samples kept per tracked sale
+# Balance histories are persisted here, one file per sale, so they survive
+# restarts and can be read by other processes. Empty keeps them in memory.
+HISTORY_DIR = os.environ.get('BALANCE_HISTORY_DIR', os.path.expanduser('~/ranger-tracker/history'))
+MAX_HISTORY_FILES = 32       # History files kept on disk; those of evicted trackers go first, oldest first
+MAX_TRACKERS = 8             # Trackers kept alive at once; least recently used go first
+IDLE_TRACKER_SECONDS = 900   # Trackers nobody asked for in this long are evicted
+
+
+def history_path(wallet, sale_end_time, directory=None):
+    directory = HISTORY_DIR if directory is None else directory
+    if not directory:
+        return None
+    # Only base58 characters reach the file name, so it always stays inside `directory`
+    name = re.sub(r'[^1-9A-HJ-NP-Za-km-z]', '_', wallet)[:44]
+    return os.path.join(directory, f"{name}-{int(to_unix(sale_end_time))}.bin")
+
+
+def snapshot_path(history_file):
+    """Where the writer of `history_file` leaves its latest snapshot for the other processes"""
+    return f"{os.path.splitext(history_file)[0]}.snapshot.json"
+
+
+def prune_history_files(keep=MAX_HISTORY_FILES, live=(), directory=None):
+    """
+    Delete the least recently written history files beyond `keep` (with their
+    lock and snapshot files), never one in `live` or one another process is
+    still writing
+    """
+    directory = HISTORY_DIR if directory is None else directory
+    if not directory or not os.path.isdir(directory):
+        return []
+    files = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith('.bin'):
+            try:
+                files.append((entry.stat().st_mtime, entry.path))
+            except OSError:
+                continue  # Removed by another process meanwhile
+    if len(files) <= keep:
+        return []
+    live = set(live)
+    candidates = sorted((mtime, path) for mtime, path in files if path not in live)
+    removed = []
+    for _, path in candidates[:len(files) - keep]:
+        lock = claim_writer(path)
+        if lock is None:
+            continue
+        try:
+            os.remove(path)
+            removed.append(path)
+            for companion in (snapshot_path(path), f'{path}.lock'):
+                if os.path.exists(companion):
+                    os.remove(companion)
+        except OSError as e:
+            print(f"Could not remove history file {path}: {e}")
+        finally:
+            lock.close()
+    return removed
+
+
+class BalanceHistory:
+    """
+    Balance samples as (timestamp, balance, slot) tuples, oldest first.
+
+    With a `path` the samples live in a shared HistoryFile: record() appends
+    to the file and sync() pulls in whatever any process appended since the
+    last call, so `points` always mirrors the newest `maxlen` records on disk.
+    A `readonly` history maps the file read-only (a process that is not the
+    sale's writer) and picks it up once the writer has created it.
+    Every sample also feeds `velocity`, the windowed estimator behind
+    calculate_velocity.
+    """
+
+    def __init__(self, maxlen=HISTORY_SIZE, path=None, readonly=False):
+        self.points = deque(maxlen=maxlen)
+        self.velocity = VelocityEstimator(maxlen)
+        self.lock = threading.Lock()
+        self.path = path
+        self.readonly = readonly
+        self.store = None
+        self._seen = 0
+        self.closed = False
+        self.sync()
+
+    def _store(self):
+        """The shared file, opened on first use; None until a writer created it"""
+        if self.store is None and self.path and not self.closed:
+            try:
+                self.store = HistoryFile(self.path, readonly=self.readonly)
+            except (OSError, ValueError):
+                if not self.readonly:
+                    raise
+        return self.store
+
+    def record(self, balance, timestamp, slot=None):
+        with self.lock:
+            if self.path is None:
+                self._add((timestamp, balance, slot))
+                return
+            store = self._store()
+            if store is None:
+                return
+            store.append(timestamp, balance, slot)
+        self.sync()
+
+    def make_writable(self):
+        """Reopen the file for appending, once this process became its writer"""
+        with self.lock:
+            if self.store is not None:
+                self.store.close()
+                self.store = None
+            self.readonly = False
+        self.sync()
+
+    def sync(self):
+        """Catch up on records appended to the shared file (cheap when none are new)"""
+        with self.lock:
+            store = self._store()
+            if store is None:
+                return
+            count = store.count
+            if count > self._seen:
+                for point in store.read(max(self._seen, count - self.points.maxlen), count):
+                    self._add(point)
+                self._seen = count
+
+    def _add(self, point):
+        self.points.append(point)
+        self.velocity.add(to_unix(point[0]), point[1])
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            if self.store is not None:
+                self.store.close()
+                self.store = None
+
+    def __len__(self):
+        return len(self.points)
+
+
+class TrackerState:
+    """
+    Everything tracked for one sale, keyed by (wallet, sale_end_time).
+
+    Each sale gets its own balance history, signature cursor, last-good
+    upstream values and collector, so dashboards watching different sales
+    never mix samples.
+
+    With a history file, one process per sale is its writer (claim_writer):
+    only it polls upstream and appends samples, and it leaves its latest
+    snapshot at `snapshot_path`. Every other process maps the history
+    read-only and serves that snapshot until it can claim the writer role.
+    """
+
+    def __init__(self, wallet, sale_end_time, polymarket_slug, history=None):
+        self.wallet = wallet
+        self.sale_end_time = sale_end_time
+        self.polymarket_slug = polymarket_slug
+        self.history_path = None
+        self.snapshot_path = None
+        self.writer_lock = None
+        if history is None:
+            self.history_path = history_path(wallet, sale_end_time)
+            if self.history_path:
+                self.snapshot_path = snapshot_path(self.history_path)
+                self.writer_lock = claim_writer(self.history_path)
+            history = BalanceHistory(path=self.history_path, readonly=not self.writer)
+        self.history = history
+        # Activity is counted over the same window the historical curves cover
+        sale_end = to_unix(sale_end_time)
+        self.activity = SignatureActivity(
+            wallet, sale_start=sale_end - historical_curves.DEFAULT_HORIZON_HOURS * 3600, sale_end=sale_end
+        )
+        self.last_good = {}  # upstream source -> last successful value
+        self.last_good_lock = threading.Lock()
+        self.collector = None
+        self.last_access = time.monotonic()
+
+    @property
+    def key(self):
+        return (self.wallet, self.sale_end_time)
+
+    @property
+    def writer(self):
+        """Whether this process polls upstream and writes the history"""
+        return self.history_path is None or self.writer_lock is not None
+
+    def claim_writer(self):
+        """Try to take over as the sale's writer (e.g. after the previous one exited)"""
+        if self.writer:
+            return True
+        if self.history.closed:
+            return False  # Closing released the lock for another process, not for us
+        self.writer_lock = claim_writer(self.history_path)
+        if self.writer_lock is None:
+            return False
+        self.history.make_writable()
+        return True
+
+    def touch(self):
+        self.last_access = time.monotonic()
+
+    def remember(self, source, value):
+        with self.last_good_lock:
+            self.last_good[source] = value
+
+    def last_good_value(self, source):
+        with self.last_good_lock:
+            return self.last_good.get(source)
+
+    def close(self):
+        if self.collector is not None:
+            self.collector.stop()
+        self.history.close()
+        if self.writer_lock is not None:
+            self.writer_lock.close()  # Lets another process take over
+            self.writer_lock = None
+
+
+class TrackerRegistry:
+    """
+    Live TrackerStates, created on first request through `start(state)`.
+
+    Bounded by MAX_TRACKERS: trackers idle for IDLE_TRACKER_SECONDS are
+    evicted, and when the cap is reached the least recently used one goes.
+    Once evicted trackers are closed, history files beyond MAX_HISTORY_FILES
+    are deleted, so the histories on disk stay bounded too.
+    """
+
+    def __init__(self, start, max_trackers=MAX_TRACKERS, idle_seconds=IDLE_TRACKER_SECONDS,
+                 max_history_files=MAX_HISTORY_FILES):
+        self.start = start
+        self.max_trackers = max_trackers
+        self.idle_seconds = idle_seconds
+        self.max_history_files = max_history_files
+        self.evictions = 0
+        self._trackers = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+
+    def get(self, wallet, sale_end_time, polymarket_slug):
+        """Return the tracker for this sale, creating (and starting) it if needed"""
+        with self._lock:
+            state = self._trackers.get((wallet, sale_end_time))
+            if state is not None:
+                state.touch()
+            evicted = self._evict(reserve=0 if state is not None else 1)
+            if state is None:
+                state = TrackerState(wallet, sale_end_time, polymarket_slug)
+                self._trackers[state.key] = state
+                self.start(state)
+                self._start_reaper()
+            else:
+                # The sale is identified by wallet + end time; follow the latest slug asked for
+                state.polymarket_slug = polymarket_slug
+
+        self._close(evicted)
+        return state
+
+    def _evict(self, reserve=0):
+        now = time.monotonic()
+        evicted = [s for s in self._trackers.values() if now - s.last_access > self.idle_seconds]
+        by_age = sorted(
+            (s for s in self._trackers.values() if s not in evicted), key=lambda s: s.last_access
+        )
+        overflow = len(by_age) + reserve - self.max_trackers
+        if overflow > 0:
+            evicted.extend(by_age[:overflow])
+
+        for state in evicted:
+            del self._trackers[state.key]
+        self.evictions += len(evicted)
+        return evicted
+
+    def evict_idle(self):
+        with self._lock:
+            evicted = self._evict()
+        self._close(evicted)
+
+    def _close(self, evicted):
+        for old in evicted:
+            old.close()
+        if evicted:
+            prune_history_files(self.max_history_files, live={s.history_path for s in self.all()})
+
+    def _start_reaper(self):
+        """Evict idle trackers even when no new requests arrive"""
+        if self._reaper is not None:
+            return
+
+        def reap():
+            while True:
+                time.sleep(max(1, self.idle_seconds / 4))
+                self.evict_idle()
+
+        self._reaper = threading.Thread(target=reap, name='tracker-reaper', daemon=True)
+        self._reaper.start()
+
+    def all(self):
+        with self._lock:
+            return list(self._trackers.values())
+
+    def __len__(self):
+        return len(self._trackers)
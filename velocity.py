@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Sliding-window least-squares velocity and acceleration estimator
+"""
+
+from collections import deque
+from itertools import islice
+
+VELOCITY_WINDOWS = (5, 10, 30, 60, 120)  # Minutes; the periods calculate_velocity_projection uses
+REBASE_SECONDS = 600  # Re-center the fit origin on the newest sample this often
+
+
+class _Window:
+    """Running sums of x^k and x^k * y over the samples a window covers"""
+
+    __slots__ = ('start', 'n', 'sx', 'sx2', 'sx3', 'sx4', 'sy', 'sxy', 'sx2y')
+
+    def __init__(self, start):
+        self.reset(start)
+
+    def reset(self, start):
+        self.start = start  # Absolute index of the oldest sample in the window
+        self.n = 0
+        self.sx = self.sx2 = self.sx3 = self.sx4 = 0.0
+        self.sy = self.sxy = self.sx2y = 0.0
+
+    def add(self, x, y, sign=1):
+        x2 = x * x
+        self.n += sign
+        self.sx += sign * x
+        self.sx2 += sign * x2
+        self.sx3 += sign * x2 * x
+        self.sx4 += sign * x2 * x2
+        self.sy += sign * y
+        self.sxy += sign * x * y
+        self.sx2y += sign * x2 * y
+
+    def slope(self):
+        """Least-squares slope of y over x, or None when x does not vary"""
+        d = self.n * self.sx2 - self.sx * self.sx
+        if d <= 0:
+            return None
+        return (self.n * self.sxy - self.sx * self.sy) / d
+
+    def curvature(self):
+        """Second derivative of the least-squares quadratic, or None with fewer than 3 usable points"""
+        if self.n < 3:
+            return None
+        # Normal equations for y = a + b*x + c*x^2, solved for c by Cramer's rule
+        n, s1, s2, s3, s4 = self.n, self.sx, self.sx2, self.sx3, self.sx4
+        t0, t1, t2 = self.sy, self.sxy, self.sx2y
+        det = n * (s2 * s4 - s3 * s3) - s1 * (s1 * s4 - s3 * s2) + s2 * (s1 * s3 - s2 * s2)
+        if abs(det) < 1e-12:
+            return None
+        det_c = n * (s2 * t2 - t1 * s3) - s1 * (s1 * t2 - t1 * s2) + t0 * (s1 * s3 - s2 * s2)
+        return 2 * det_c / det
+
+
+class VelocityEstimator:
+    """
+    Balance velocity (least-squares slope) and acceleration over trailing
+    time windows, answered from one sample buffer without copying it.
+
+    Every window keeps running sums that are updated as samples enter and
+    leave it, so adding a sample and asking for a window are O(1) amortized.
+    x is hours and y is balance, both measured from an origin that is moved
+    to the newest sample every REBASE_SECONDS; each rebase recomputes the
+    sums from the buffer, which keeps float error from piling up.
+    """
+
+    def __init__(self, maxlen, windows=VELOCITY_WINDOWS):
+        self.maxlen = maxlen
+        self.samples = deque()  # (unix seconds, balance), oldest first
+        self.base = 0           # Absolute index of samples[0]
+        self.origin = None      # (unix seconds, balance) that x and y are measured from
+        self.windows = {minutes: _Window(0) for minutes in windows}
+        self.all = _Window(0)   # Every buffered sample, the fallback for sparse windows
+
+    def _xy(self, sample):
+        return (sample[0] - self.origin[0]) / 3600, sample[1] - self.origin[1]
+
+    def _each_window(self):
+        yield self.all
+        yield from self.windows.values()
+
+    def add(self, unix_time, balance):
+        sample = (unix_time, balance)
+        if self.origin is None or unix_time - self.origin[0] > REBASE_SECONDS:
+            self.samples.append(sample)
+            self._rebase()
+        else:
+            self.samples.append(sample)
+            x, y = self._xy(sample)
+            for window in self._each_window():
+                window.add(x, y)
+
+        # Past maxlen the oldest sample leaves every window still holding it
+        if len(self.samples) > self.maxlen:
+            x, y = self._xy(self.samples.popleft())
+            for window in self._each_window():
+                if window.start == self.base:
+                    window.add(x, y, -1)
+                    window.start += 1
+            self.base += 1
+
+    def _rebase(self):
+        self.origin = self.samples[-1]
+        for window in self._each_window():
+            window.reset(max(window.start, self.base))
+            for sample in islice(self.samples, window.start - self.base, None):
+                window.add(*self._xy(sample))
+
+    def _window(self, minutes, now):
+        window = self.windows.get(minutes)
+        if window is None:
+            # First ask for an unconfigured period: seed it from the buffer once
+            window = self.windows[minutes] = _Window(self.base)
+            for sample in self.samples:
+                window.add(*self._xy(sample))
+
+        cutoff = now - minutes * 60
+        end = self.base + len(self.samples)
+        while window.start < end and self.samples[window.start - self.base][0] < cutoff:
+            window.add(*self._xy(self.samples[window.start - self.base]), -1)
+            window.start += 1
+        return window
+
+    def estimate(self, minutes, now):
+        """
+        calculate_velocity-shaped dict for the trailing `minutes` before
+        `now` (unix seconds), or None. Falls back to every buffered sample
+        when the window holds fewer than two.
+        """
+        if len(self.samples) < 2:
+            return None
+
+        window = self._window(minutes, now)
+        if window.n < 2:
+            window = self.all
+
+        oldest = self.samples[window.start - self.base]
+        newest = self.samples[-1]
+        time_diff_hours = (newest[0] - oldest[0]) / 3600
+        if time_diff_hours < 0.001:  # Less than 3.6 seconds
+            return None
+
+        velocity_per_hour = window.slope()
+        if velocity_per_hour is None:
+            return None
+
+        return {
+            'velocity_per_hour': velocity_per_hour,
+            'velocity_per_minute': velocity_per_hour / 60,
+            'acceleration_per_hour2': window.curvature(),
+            'time_span_minutes': time_diff_hours * 60,
+            'balance_change': newest[1] - oldest[1],
+            'start_balance': oldest[1],
+            'end_balance': newest[1],
+            'data_points': window.n
+        }
@@ -4,10 +4,12 @@ Whale Tracker - Analyzes large deposits for MetaDAO sales
 """
 
 import json
-import requests
 from datetime import datetime, timedelta
 from collections import defaultdict
-import time
+from concurrent.futures import ThreadPoolExecutor
+import solana_rpc
+from deposit_store import DepositStore
+from token_deltas import decode_deposits
 
 RANGER_WALLET = "9ApaAe39Z8GEXfqm7F7HL545N4J4tN7RhF8FhS88pRNp"
 USDC_MINT = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
@@ -18,6 +20,10 @@ WHALE_THRESHOLD = 10000      # $10k+ is a whale
 MEDIUM_THRESHOLD = 1000      # $1k-$10k is medium
 MEGA_WHALE_THRESHOLD = 50000 # $50k+ is mega whale
 
+# Batched transaction fetching
+BATCH_SIZE = 50              # getTransaction calls per JSON-RPC batch request
+BATCH_CONCURRENCY = 4        # Batch requests in flight at once
+
 # Historical whale patterns (estimated from final amounts)
 # Based on typical MetaDAO sale distribution patterns
 HISTORICAL_WHALE_PATTERNS = {
@@ -72,114 +78,189 @@ HISTORICAL_WHALE_PATTERNS = {
 }
 
 
-def get_transaction_signatures(wallet, limit=1000):
-    """Get transaction signatures for a wallet"""
-    url = "https://api.mainnet-beta.solana.com"
-    payload = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "getSignaturesForAddress",
-        "params": [wallet, {"limit": limit}]
-    }
-
-    response = requests.post(url, json=payload)
-    data = response.json()
-    return data.get('result', [])
+def get_transaction_signatures(wallet, limit=1000, before=None):
+    """Get transaction signatures for a wallet, newest first (older than `before` if given)"""
+    options = {"limit": limit}
+    if before:
+        options["before"] = before
+    return solana_rpc.rpc_call("getSignaturesForAddress", [wallet, options], timeout=30) or []
 
 
 def get_transaction_details(signature):
     """Get parsed transaction details"""
-    url = "https://api.mainnet-beta.solana.com"
-    payload = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "getTransaction",
-        "params": [signature, {"encoding": "jsonParsed", "maxSupportedTransactionVersion": 0}]
-    }
-
-    response = requests.post(url, json=payload)
-    data = response.json()
-    return data.get('result')
-
-
-def parse_usdc_deposits(wallet, max_txs=200):
-    """Parse USDC deposits to a wallet"""
+    return solana_rpc.rpc_call(
+        "getTransaction",
+        [signature, {"encoding": "jsonParsed", "maxSupportedTransactionVersion": 0}],
+        timeout=15
+    )
+
+
+def get_transaction_details_batch(signatures):
+    """Get parsed transaction details for several signatures in one HTTP request"""
+    calls = [
+        ("getTransaction", [sig, {"encoding": "jsonParsed", "maxSupportedTransactionVersion": 0}])
+        for sig in signatures
+    ]
+    return solana_rpc.rpc_batch(calls, timeout=30)
+
+
+def extract_deposits(tx, wallet, signature, block_time):
+    """Extract USDC deposits into `wallet` from one parsed transaction (one entry per sender)"""
+    return [
+        {
+            'amount': deposit['amount'],
+            'sender': deposit['sender'],
+            'timestamp': block_time,
+            'signature': signature,
+            'slot': tx.get('slot')
+        }
+        for deposit in decode_deposits(tx, wallet, USDC_MINT)
+    ]
+
+
+def parse_usdc_deposits(wallet, max_txs=200, batch_size=None, concurrency=BATCH_CONCURRENCY, store=None):
+    """
+    Parse USDC deposits to a wallet.
+
+    With `batch_size` set, getTransaction calls are grouped into JSON-RPC
+    batch arrays of that size and up to `concurrency` batches are in flight
+    at once. Without it, transactions are fetched one at a time.
+
+    With a DepositStore, only signatures not already in the store are
+    fetched (up to `max_txs` per run, paging back through history), each
+    parsed batch is saved as it completes, and the return value covers every
+    deposit stored for the wallet.
+    """
     print(f"Fetching transactions for {wallet[:8]}...")
     signatures = get_transaction_signatures(wallet)
 
+    if store is not None:
+        pending = _unseen_signatures(wallet, signatures, store, max_txs)
+        print(f"Found {len(pending)} new transactions ({store.transaction_count(wallet)} already stored)...")
+    else:
+        pending = signatures[:max_txs]
+        print(f"Found {len(signatures)} transactions, parsing up to {max_txs}...")
+
+    if batch_size:
+        parsed_chunks = fetch_batched(wallet, pending, batch_size, concurrency)
+    else:
+        parsed_chunks = _fetch_serial(wallet, pending)
+
     deposits = []
-    unique_wallets = set()
+    for parsed in parsed_chunks:
+        if store is not None:
+            store.save(wallet, parsed)
+        for _, found in parsed:
+            deposits.extend(found)
+
+    if store is not None:
+        deposits = store.deposits(wallet)
 
-    print(f"Found {len(signatures)} transactions, parsing up to {max_txs}...")
+    unique_wallets = {d['sender'] for d in deposits if d['sender']}
+    return deposits, unique_wallets
+
+
+def _unseen_signatures(wallet, signatures, store, max_txs):
+    """Signatures missing from the store, newest first, paging back until `max_txs` are found"""
+    unseen = []
+    page = signatures
+    while page:
+        known = store.known_signatures(wallet, [s['signature'] for s in page])
+        unseen.extend(s for s in page if s['signature'] not in known)
+        if len(unseen) >= max_txs or len(page) < 1000:
+            break
+        page = get_transaction_signatures(wallet, before=page[-1]['signature'])
+    return unseen[:max_txs]
+
+
+def _fetch_one(wallet, sig_info, unavailable=None):
+    """
+    Fetch and decode one transaction: (sig_info, deposits), or None when it
+    could not be fetched. A transaction the node returns as null is also
+    appended to `unavailable`.
+    """
+    signature = sig_info['signature']
+    try:
+        tx = get_transaction_details(signature)
+    except Exception as e:
+        # Not stored, so a run with a DepositStore picks it up next time
+        print(f"  Failed to fetch {signature[:16]}...: {e}")
+        return None
+    if not tx:
+        print(f"  Transaction {signature[:16]}... not available from the node")
+        if unavailable is not None:
+            unavailable.append(sig_info)
+        return None
+    return sig_info, extract_deposits(tx, wallet, signature, sig_info.get('blockTime', 0))
 
-    for i, sig_info in enumerate(signatures[:max_txs]):
+
+def _fetch_serial(wallet, signatures, unavailable=None):
+    """Fetch and decode transactions one at a time. Yields [(sig_info, deposits)] per transaction"""
+    for i, sig_info in enumerate(signatures):
         if sig_info.get('err') is not None:
+            # Failed transactions never carry a deposit; yield them so they are stored as seen
+            yield [(sig_info, [])]
             continue
 
-        signature = sig_info['signature']
-        block_time = sig_info.get('blockTime', 0)
-
-        # Rate limit
+        # Rate limiting and 429 retries happen in the shared RPC client
         if i > 0 and i % 10 == 0:
-            time.sleep(0.5)
-            print(f"  Parsed {i}/{min(len(signatures), max_txs)}...")
-
-        try:
-            tx = get_transaction_details(signature)
-            if not tx:
-                continue
-
-            # Look for USDC transfers
-            meta = tx.get('meta', {})
-            pre_balances = meta.get('preTokenBalances', [])
-            post_balances = meta.get('postTokenBalances', [])
-
-            # Find USDC balance changes
-            for post in post_balances:
-                if post.get('mint') != USDC_MINT:
+            print(f"  Parsed {i}/{len(signatures)}...")
+
+        parsed = _fetch_one(wallet, sig_info, unavailable)
+        if parsed is not None:
+            yield [parsed]
+
+
+def fetch_batched(wallet, signatures, batch_size, concurrency, unavailable=None):
+    """
+    Batched, concurrent variant of _fetch_serial, also used by backfill.py.
+    Yields [(sig_info, deposits), ...] per batch.
+
+    Transactions a batch did not return (a per-item error, a null result or
+    the whole batch failing) are retried one at a time. Those still missing
+    are reported and left unstored; the ones the node returned as null are
+    also appended to `unavailable`.
+    """
+    failed = [s for s in signatures if s.get('err') is not None]
+    if failed:
+        yield [(s, []) for s in failed]
+
+    successful = [s for s in signatures if s.get('err') is None]
+    chunks = [successful[i:i + batch_size] for i in range(0, len(successful), batch_size)]
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            (pool.submit(get_transaction_details_batch, [s['signature'] for s in chunk]), chunk)
+            for chunk in chunks
+        ]
+
+        # Walk the batches in submission order so deposits keep signature order
+        parsed = 0
+        missing = 0
+        for future, chunk in futures:
+            try:
+                txs = future.result()
+            except Exception as e:
+                print(f"  Batch of {len(chunk)} failed, retrying one at a time: {e}")
+                txs = [None] * len(chunk)
+
+            batch = []
+            for sig_info, tx in zip(chunk, txs):
+                if tx:
+                    batch.append((sig_info, extract_deposits(tx, wallet, sig_info['signature'], sig_info.get('blockTime', 0))))
                     continue
+                retried = _fetch_one(wallet, sig_info, unavailable)
+                if retried is None:
+                    missing += 1
+                else:
+                    batch.append(retried)
+            yield batch
 
-                owner = post.get('owner', '')
-                post_amount = float(post.get('uiTokenAmount', {}).get('uiAmount', 0) or 0)
-
-                # Find matching pre-balance
-                pre_amount = 0
-                for pre in pre_balances:
-                    if pre.get('mint') == USDC_MINT and pre.get('owner') == owner:
-                        pre_amount = float(pre.get('uiTokenAmount', {}).get('uiAmount', 0) or 0)
-                        break
-
-                # If this is the target wallet and balance increased
-                if owner == wallet and post_amount > pre_amount:
-                    deposit_amount = post_amount - pre_amount
-
-                    # Find the sender
-                    sender = None
-                    for pre in pre_balances:
-                        if pre.get('mint') == USDC_MINT and pre.get('owner') != wallet:
-                            pre_bal = float(pre.get('uiTokenAmount', {}).get('uiAmount', 0) or 0)
-                            post_bal = 0
-                            for p in post_balances:
-                                if p.get('owner') == pre.get('owner') and p.get('mint') == USDC_MINT:
-                                    post_bal = float(p.get('uiTokenAmount', {}).get('uiAmount', 0) or 0)
-                            if pre_bal > post_bal:
-                                sender = pre.get('owner')
-                                break
-
-                    if deposit_amount > 0:
-                        deposits.append({
-                            'amount': deposit_amount,
-                            'sender': sender,
-                            'timestamp': block_time,
-                            'signature': signature
-                        })
-                        if sender:
-                            unique_wallets.add(sender)
-
-        except Exception as e:
-            continue
+            parsed += len(chunk)
+            print(f"  Parsed {parsed}/{len(successful)}...")
 
-    return deposits, unique_wallets
+        if missing:
+            print(f"  {missing} of {len(successful)} transactions could not be fetched and were not stored")
 
 
 def analyze_whale_activity(deposits):
@@ -292,8 +373,12 @@ def main():
     print(f"\nTime remaining: {hours_remaining:.2f} hours")
     print(f"\nFetching deposit data (this may take a minute)...")
 
-    # Parse deposits
-    deposits, unique_wallets = parse_usdc_deposits(RANGER_WALLET, max_txs=300)
+    # Parse deposits (previously parsed transactions come from the local store)
+    store = DepositStore()
+    deposits, unique_wallets = parse_usdc_deposits(
+        RANGER_WALLET, max_txs=1000, batch_size=BATCH_SIZE, store=store
+    )
+    store.close()
 
     if not deposits:
         print("No deposits found!")
@@ -342,6 +427,9 @@ def main():
     for proj in sorted(projections, key=lambda x: x['projected_final']):
         print(f"{proj['name']:<12} -> ${proj['projected_final']/1e6:>6.1f}M (whale ratio: {proj['whale_ratio']:.2f})")
 
+    print()
+    solana_rpc.print_latency_stats()
+
     # Return data for API use
     return {
         'whale_data': whale_data,